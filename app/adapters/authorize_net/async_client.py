@@ -0,0 +1,212 @@
+"""Non-blocking Authorize.Net client adapter"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.core.metrics import GATEWAY_REQUEST_DURATION
+from app.adapters.authorize_net.connection_pool import AsyncGatewayConnectionPool
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.models import (
+    PurchaseRequest,
+    TransactionResponse,
+    CaptureRequest,
+    VoidRequest,
+    RefundRequest,
+    SubscriptionRequest,
+    SubscriptionResponse,
+    SettledBatchListRequest,
+    SettledBatchListResponse,
+    TransactionListRequest,
+    TransactionListResponse,
+    TransactionDetailsRequest,
+    TransactionDetailsResponse,
+)
+from app.adapters.authorize_net.exceptions import (
+    AuthorizeNetConnectionError,
+    AuthorizeNetValidationError,
+)
+import structlog
+
+logger = structlog.get_logger()
+
+TRANSPORT_EXECUTOR = "executor"
+TRANSPORT_HTTPX = "httpx"
+
+# authorize_net_request_duration_seconds children by operation and result code, bound once
+GATEWAY_OPERATIONS = (
+    "purchase",
+    "authorize",
+    "capture",
+    "void",
+    "refund",
+    "create_subscription",
+    "get_settled_batch_list",
+    "get_transaction_list",
+    "get_transaction_details",
+)
+_REQUEST_DURATION = {
+    operation: {
+        result_code: GATEWAY_REQUEST_DURATION.labels(operation=operation, result_code=result_code)
+        for result_code in ("Ok", "Error", "exception")
+    }
+    for operation in GATEWAY_OPERATIONS
+}
+
+
+class AsyncAuthorizeNetClient:
+    """
+    Awaitable counterpart of AuthorizeNetClient.
+
+    Two transports, selected by AUTHORIZE_NET_ASYNC_TRANSPORT:
+    - "executor": runs the synchronous client (and its shared keep-alive pool)
+      on a dedicated thread pool whose size is the concurrency limit.
+    - "httpx": posts the serialized request over an async keep-alive pool whose
+      connection limit (AUTHORIZE_NET_POOL_SIZE) is the concurrency limit.
+
+    The application builds one instance at startup (see app.main lifespan) and
+    hands it out through the get_authorize_net_client dependency.
+    """
+
+    def __init__(
+        self,
+        client: AuthorizeNetClient | None = None,
+        transport: str | None = None,
+        max_concurrency: int | None = None,
+        pool: AsyncGatewayConnectionPool | None = None,
+    ):
+        # Without an injected client, share the process-wide keep-alive pool (not closed here)
+        self.client = client or AuthorizeNetClient()
+        self.transport = (transport or settings.AUTHORIZE_NET_ASYNC_TRANSPORT).lower()
+        self.max_concurrency = max_concurrency or settings.AUTHORIZE_NET_MAX_CONCURRENCY
+        self._executor: ThreadPoolExecutor | None = None
+        self._pool: AsyncGatewayConnectionPool | None = None
+
+        if self.transport == TRANSPORT_EXECUTOR:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="authorize-net",
+            )
+        elif self.transport == TRANSPORT_HTTPX:
+            self._pool = pool or AsyncGatewayConnectionPool()
+        else:
+            raise AuthorizeNetValidationError(
+                f"Unsupported Authorize.Net transport: {self.transport}"
+            )
+
+    async def _offload(self, func, request):
+        """Run a blocking client call on the bounded executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, request)
+
+    async def _post(self, render, request, parse):
+        """Render, post and parse a request without leaving the event loop"""
+        try:
+            payload = render(request)
+            return parse(await self._pool.post(self.client.endpoint, payload))
+        except AuthorizeNetValidationError:
+            raise
+        except Exception as e:
+            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
+            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
+
+    async def _call(self, operation, sync_call, render, request, parse):
+        durations = _REQUEST_DURATION[operation]
+        started = time.perf_counter()
+        try:
+            if self._executor:
+                response = await self._offload(sync_call, request)
+            else:
+                response = await self._post(render, request, parse)
+        except Exception:
+            durations["exception"].observe(time.perf_counter() - started)
+            raise
+        result_code = "Ok" if response.result_code == "Ok" else "Error"
+        durations[result_code].observe(time.perf_counter() - started)
+        return response
+
+    async def _transaction(self, operation, sync_call, render, request) -> TransactionResponse:
+        return await self._call(
+            operation, sync_call, render, request, self.client.parse_transaction_response
+        )
+
+    async def purchase(self, request: PurchaseRequest) -> TransactionResponse:
+        """Process a purchase transaction (auth + capture)"""
+        return await self._transaction(
+            "purchase", self.client.purchase, self.client.render_purchase_request, request
+        )
+
+    async def authorize(self, request: PurchaseRequest) -> TransactionResponse:
+        """Authorize a transaction without capturing"""
+        return await self._transaction(
+            "authorize", self.client.authorize, self.client.render_authorize_request, request
+        )
+
+    async def capture(self, request: CaptureRequest) -> TransactionResponse:
+        """Capture a previously authorized transaction"""
+        return await self._transaction(
+            "capture", self.client.capture, self.client.render_capture_request, request
+        )
+
+    async def void(self, request: VoidRequest) -> TransactionResponse:
+        """Void (cancel) a previously authorized/unsettled transaction"""
+        return await self._transaction(
+            "void", self.client.void, self.client.render_void_request, request
+        )
+
+    async def refund(self, request: RefundRequest) -> TransactionResponse:
+        """Refund a captured/settled transaction"""
+        return await self._transaction(
+            "refund", self.client.refund, self.client.render_refund_request, request
+        )
+
+    async def create_subscription(self, request: SubscriptionRequest) -> SubscriptionResponse:
+        """Create a recurring subscription (ARB)"""
+        return await self._call(
+            "create_subscription",
+            self.client.create_subscription,
+            self.client.render_subscription_request,
+            request,
+            self.client.parse_subscription_response,
+        )
+
+    async def get_settled_batch_list(
+        self, request: SettledBatchListRequest
+    ) -> SettledBatchListResponse:
+        """List settled batches in a date range (Transaction Reporting API)"""
+        return await self._call(
+            "get_settled_batch_list",
+            self.client.get_settled_batch_list,
+            self.client.render_settled_batch_list_request,
+            request,
+            self.client.parse_settled_batch_list_response,
+        )
+
+    async def get_transaction_list(self, request: TransactionListRequest) -> TransactionListResponse:
+        """Fetch one page of the transactions in a settled batch"""
+        return await self._call(
+            "get_transaction_list",
+            self.client.get_transaction_list,
+            self.client.render_transaction_list_request,
+            request,
+            self.client.parse_transaction_list_response,
+        )
+
+    async def get_transaction_details(
+        self, request: TransactionDetailsRequest
+    ) -> TransactionDetailsResponse:
+        """Fetch the details of a single transaction"""
+        return await self._call(
+            "get_transaction_details",
+            self.client.get_transaction_details,
+            self.client.render_transaction_details_request,
+            request,
+            self.client.parse_transaction_details_response,
+        )
+
+    async def aclose(self) -> None:
+        """Release the thread pool or HTTP connections"""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        if self._pool:
+            await self._pool.aclose()
@@ -1,8 +1,26 @@
 """Authorize.Net client adapter"""
+from functools import wraps
+
 from authorizenet import apicontractsv1, constants
-from authorizenet.apicontrollers import createTransactionController, ARBCreateSubscriptionController
 
 from app.core.config import settings
+from app.adapters.authorize_net.connection_pool import (
+    GatewayConnectionPool,
+    get_connection_pool,
+)
+from app.adapters.authorize_net.responses import (
+    read_transaction_response,
+    read_subscription_response,
+    read_settled_batch_list_response,
+    read_transaction_list_response,
+    read_transaction_details_response,
+)
+from app.adapters.authorize_net.templates import (
+    TransactionTemplates,
+    ReportingTemplates,
+    normalize_card_number,
+    normalize_expiration_date,
+)
 from app.adapters.authorize_net.models import (
     PurchaseRequest,
     TransactionResponse,
@@ -11,9 +29,14 @@ from app.adapters.authorize_net.models import (
     RefundRequest,
     SubscriptionRequest,
     SubscriptionResponse,
+    SettledBatchListRequest,
+    SettledBatchListResponse,
+    TransactionListRequest,
+    TransactionListResponse,
+    TransactionDetailsRequest,
+    TransactionDetailsResponse,
 )
 from app.adapters.authorize_net.exceptions import (
-    AuthorizeNetAPIError,
     AuthorizeNetConnectionError,
     AuthorizeNetValidationError,
 )
@@ -21,16 +44,51 @@ import structlog
 
 logger = structlog.get_logger()
 
+CREATE_TRANSACTION_REQUEST = "createTransactionRequest"
+ARB_CREATE_SUBSCRIPTION_REQUEST = "ARBCreateSubscriptionRequest"
+
+
+def _translate_errors(func):
+    """Re-raise anything but validation errors as AuthorizeNetConnectionError"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except AuthorizeNetValidationError:
+            raise
+        except Exception as e:
+            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
+            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
+
+    return wrapper
+
 
 class AuthorizeNetClient:
     """Client wrapper for Authorize.Net API"""
 
-    def __init__(self):
-        """Initialize the client with credentials from settings"""
+    def __init__(
+        self,
+        endpoint_url: str | None = None,
+        pool: GatewayConnectionPool | None = None,
+    ):
+        """
+        Initialize the client with credentials from settings.
+
+        Meant to be built once per process: the endpoint, merchant auth and
+        transaction settings are immutable and shared by every request.
+        """
         self.api_login_id = settings.AUTHORIZE_NET_API_LOGIN_ID
         self.transaction_key = settings.AUTHORIZE_NET_TRANSACTION_KEY
         self.environment = settings.AUTHORIZE_NET_ENVIRONMENT
+        self.endpoint_url = endpoint_url or settings.AUTHORIZE_NET_ENDPOINT_URL
+        self.pool = pool or get_connection_pool()
         self.max_ref_id_length = 20
+        self.endpoint = self._get_environment()
+        self._merchant_auth = self._create_merchant_auth()
+        self._transaction_settings: dict[int, apicontractsv1.ArrayOfSetting] = {}
+        self.templates = TransactionTemplates(self.api_login_id, self.transaction_key)
+        self.reporting_templates = ReportingTemplates(self.api_login_id, self.transaction_key)
 
     def _create_merchant_auth(self):
         """Create merchant authentication object"""
@@ -41,6 +99,8 @@ class AuthorizeNetClient:
 
     def _get_environment(self):
         """Map configured environment to Authorize.Net constant"""
+        if self.endpoint_url:
+            return self.endpoint_url
         env = (self.environment or "").lower()
         env_map = {
             "sandbox": constants.constants.SANDBOX,
@@ -52,6 +112,18 @@ class AuthorizeNetClient:
             )
         return env_map[env]
 
+    def _get_transaction_settings(self, duplicate_window: int):
+        """Get the (cached) transactionSettings array for a duplicate window"""
+        settings_array = self._transaction_settings.get(duplicate_window)
+        if settings_array is None:
+            duplicate_window_setting = apicontractsv1.settingType()
+            duplicate_window_setting.settingName = "duplicateWindow"
+            duplicate_window_setting.settingValue = str(duplicate_window)
+            settings_array = apicontractsv1.ArrayOfSetting()
+            settings_array.setting.append(duplicate_window_setting)
+            self._transaction_settings[duplicate_window] = settings_array
+        return settings_array
+
     def _sanitize_ref_id(self, ref_id: str | None) -> str | None:
         """Ensure refId meets Authorize.Net length constraints (max 20)"""
         if not ref_id:
@@ -64,454 +136,310 @@ class AuthorizeNetClient:
             )
         return ref_id[: self.max_ref_id_length]
 
-    def purchase(self, request: PurchaseRequest) -> TransactionResponse:
-        """Process a purchase transaction (auth + capture)"""
-        try:
-            # Create merchant authentication
-            merchant_auth = self._create_merchant_auth()
-
-            # Create credit card payment
-            credit_card = apicontractsv1.creditCardType()
-            credit_card.cardNumber = request.credit_card.card_number.replace(" ", "").replace("-", "")
-            # Convert expiration date format (YYYY-MM or MM/YY) to MM/YY
-            exp_date = request.credit_card.expiration_date
-            if len(exp_date) == 7 and "-" in exp_date:  # YYYY-MM format
-                year, month = exp_date.split("-")
-                exp_date = f"{month}/{year[-2:]}"  # Convert to MM/YY
-            credit_card.expirationDate = exp_date
-            if request.credit_card.card_code:
-                credit_card.cardCode = request.credit_card.card_code
-
-            payment = apicontractsv1.paymentType()
-            payment.creditCard = credit_card
-
-            # Create order information
-            order = apicontractsv1.orderType()
-            if request.invoice_number:
-                order.invoiceNumber = request.invoice_number
-            if request.description:
-                order.description = request.description
-
-            # Create customer address
-            customer_address = apicontractsv1.customerAddressType()
-            customer_address.firstName = request.customer_address.first_name
-            customer_address.lastName = request.customer_address.last_name
-            if request.customer_address.company:
-                customer_address.company = request.customer_address.company
-            customer_address.address = request.customer_address.address
-            customer_address.city = request.customer_address.city
-            customer_address.state = request.customer_address.state
-            customer_address.zip = request.customer_address.zip
-            customer_address.country = request.customer_address.country
-
-            # Create customer data
-            customer_data = apicontractsv1.customerDataType()
-            customer_data.type = request.customer_data.customer_type
-            customer_data.id = request.customer_data.customer_id
-            customer_data.email = request.customer_data.email
-
-            # Create transaction settings
-            duplicate_window_setting = apicontractsv1.settingType()
-            duplicate_window_setting.settingName = "duplicateWindow"
-            duplicate_window_setting.settingValue = str(request.duplicate_window)
-            settings_array = apicontractsv1.ArrayOfSetting()
-            settings_array.setting.append(duplicate_window_setting)
+    def _create_credit_card(self, card):
+        """Create credit card object, normalizing number and expiration date"""
+        credit_card = apicontractsv1.creditCardType()
+        credit_card.cardNumber = normalize_card_number(card.card_number)
+        credit_card.expirationDate = normalize_expiration_date(card.expiration_date)
+        if card.card_code:
+            credit_card.cardCode = card.card_code
+        return credit_card
+
+    def _wrap_transaction(self, transaction_request, ref_id: str | None):
+        """Wrap a transaction request with merchant auth and refId"""
+        create_transaction_request = apicontractsv1.createTransactionRequest()
+        create_transaction_request.merchantAuthentication = self._merchant_auth
+        sanitized_ref = self._sanitize_ref_id(ref_id)
+        if sanitized_ref:
+            create_transaction_request.refId = sanitized_ref
+        create_transaction_request.transactionRequest = transaction_request
+        return create_transaction_request
+
+    def _build_card_transaction(self, request: PurchaseRequest, transaction_type: str):
+        """Build a card-present-style transaction (purchase or auth only)"""
+        payment = apicontractsv1.paymentType()
+        payment.creditCard = self._create_credit_card(request.credit_card)
+
+        # Create order information
+        order = apicontractsv1.orderType()
+        if request.invoice_number:
+            order.invoiceNumber = request.invoice_number
+        if request.description:
+            order.description = request.description
+
+        # Create customer address
+        customer_address = apicontractsv1.customerAddressType()
+        customer_address.firstName = request.customer_address.first_name
+        customer_address.lastName = request.customer_address.last_name
+        if request.customer_address.company:
+            customer_address.company = request.customer_address.company
+        customer_address.address = request.customer_address.address
+        customer_address.city = request.customer_address.city
+        customer_address.state = request.customer_address.state
+        customer_address.zip = request.customer_address.zip
+        customer_address.country = request.customer_address.country
+
+        # Create customer data
+        customer_data = apicontractsv1.customerDataType()
+        customer_data.type = request.customer_data.customer_type
+        customer_data.id = request.customer_data.customer_id
+        customer_data.email = request.customer_data.email
+
+        # Create line items if provided
+        line_items = None
+        if request.line_items:
+            line_items = apicontractsv1.ArrayOfLineItem()
+            for item in request.line_items:
+                line_item = apicontractsv1.lineItemType()
+                line_item.itemId = item.item_id
+                line_item.name = item.name
+                line_item.description = item.description
+                line_item.quantity = item.quantity
+                line_item.unitPrice = item.unit_price
+                line_items.lineItem.append(line_item)
+
+        # Create transaction request
+        transaction_request = apicontractsv1.transactionRequestType()
+        transaction_request.transactionType = transaction_type
+        transaction_request.amount = str(request.amount)
+        transaction_request.payment = payment
+        transaction_request.order = order
+        transaction_request.billTo = customer_address
+        transaction_request.customer = customer_data
+        transaction_request.transactionSettings = self._get_transaction_settings(
+            request.duplicate_window
+        )
+        if line_items:
+            transaction_request.lineItems = line_items
+
+        return self._wrap_transaction(transaction_request, request.ref_id)
+
+    def build_purchase_request(self, request: PurchaseRequest):
+        """Build createTransactionRequest for a purchase (auth + capture)"""
+        return self._build_card_transaction(request, "authCaptureTransaction")
+
+    def build_authorize_request(self, request: PurchaseRequest):
+        """Build createTransactionRequest for an auth only transaction"""
+        return self._build_card_transaction(request, "authOnlyTransaction")
+
+    def build_capture_request(self, request: CaptureRequest):
+        """Build createTransactionRequest for a prior auth capture"""
+        transaction_request = apicontractsv1.transactionRequestType()
+        transaction_request.transactionType = "priorAuthCaptureTransaction"
+        transaction_request.refTransId = request.transaction_id
+        transaction_request.amount = str(request.amount)
+        return self._wrap_transaction(transaction_request, request.ref_id)
+
+    def build_void_request(self, request: VoidRequest):
+        """Build createTransactionRequest for a void"""
+        transaction_request = apicontractsv1.transactionRequestType()
+        transaction_request.transactionType = "voidTransaction"
+        transaction_request.refTransId = request.transaction_id
+        return self._wrap_transaction(transaction_request, request.ref_id)
+
+    def build_refund_request(self, request: RefundRequest):
+        """Build createTransactionRequest for a refund"""
+        credit_card = apicontractsv1.creditCardType()
+        credit_card.cardNumber = request.card_number_last4
+        credit_card.expirationDate = "XXXX"  # per Authorize.Net sample for refunds
+
+        payment = apicontractsv1.paymentType()
+        payment.creditCard = credit_card
+
+        transaction_request = apicontractsv1.transactionRequestType()
+        transaction_request.transactionType = "refundTransaction"
+        transaction_request.amount = str(request.amount)
+        transaction_request.refTransId = request.transaction_id
+        transaction_request.payment = payment
+        return self._wrap_transaction(transaction_request, request.ref_id)
+
+    def build_subscription_request(self, request: SubscriptionRequest):
+        """Build ARBCreateSubscriptionRequest"""
+        # payment schedule
+        schedule = apicontractsv1.paymentScheduleType()
+        interval = apicontractsv1.paymentScheduleTypeInterval()
+        interval.length = request.schedule.interval_length
+        unit = request.schedule.interval_unit.lower()
+        if unit == "days":
+            interval.unit = apicontractsv1.ARBSubscriptionUnitEnum.days
+        elif unit == "months":
+            interval.unit = apicontractsv1.ARBSubscriptionUnitEnum.months
+        else:
+            raise AuthorizeNetValidationError("interval_unit must be 'days' or 'months'")
+        schedule.interval = interval
+        schedule.startDate = request.schedule.start_date
+        schedule.totalOccurrences = request.schedule.total_occurrences
+        schedule.trialOccurrences = request.schedule.trial_occurrences
+
+        # payment info
+        payment = apicontractsv1.paymentType()
+        payment.creditCard = self._create_credit_card(request.credit_card)
+
+        bill_to = apicontractsv1.nameAndAddressType()
+        bill_to.firstName = request.customer_address.first_name
+        bill_to.lastName = request.customer_address.last_name
+        if request.customer_address.company:
+            bill_to.company = request.customer_address.company
+        bill_to.address = request.customer_address.address
+        bill_to.city = request.customer_address.city
+        bill_to.state = request.customer_address.state
+        bill_to.zip = request.customer_address.zip
+        bill_to.country = request.customer_address.country
+
+        subscription = apicontractsv1.ARBSubscriptionType()
+        subscription.name = request.name
+        subscription.paymentSchedule = schedule
+        subscription.amount = float(request.amount)
+        subscription.trialAmount = float(request.schedule.trial_amount)
+        subscription.billTo = bill_to
+        subscription.payment = payment
+
+        arb_request = apicontractsv1.ARBCreateSubscriptionRequest()
+        arb_request.merchantAuthentication = self._merchant_auth
+        sanitized_ref = self._sanitize_ref_id(request.ref_id)
+        if sanitized_ref:
+            arb_request.refId = sanitized_ref
+        arb_request.subscription = subscription
+        return arb_request
+
+    def serialize(self, api_request, element_name: str) -> bytes:
+        """Serialize a request to XML exactly as the SDK controllers post it"""
+        api_request.clientId = constants.constants.clientId
+        xml_request = api_request.toxml(
+            encoding=constants.constants.xml_encoding, element_name=element_name
+        )
+        xml_request = xml_request.replace(constants.constants.nsNamespace1, b"")
+        return xml_request.replace(constants.constants.nsNamespace2, b"")
 
-            # Create line items if provided
-            line_items = None
-            if request.line_items:
-                line_items = apicontractsv1.ArrayOfLineItem()
-                for item in request.line_items:
-                    line_item = apicontractsv1.lineItemType()
-                    line_item.itemId = item.item_id
-                    line_item.name = item.name
-                    line_item.description = item.description
-                    line_item.quantity = item.quantity
-                    line_item.unitPrice = item.unit_price
-                    line_items.lineItem.append(line_item)
-
-            # Create transaction request
-            transaction_request = apicontractsv1.transactionRequestType()
-            transaction_request.transactionType = "authCaptureTransaction"
-            transaction_request.amount = str(request.amount)
-            transaction_request.payment = payment
-            transaction_request.order = order
-            transaction_request.billTo = customer_address
-            transaction_request.customer = customer_data
-            transaction_request.transactionSettings = settings_array
-            if line_items:
-                transaction_request.lineItems = line_items
-
-            # Create complete transaction request
-            create_transaction_request = apicontractsv1.createTransactionRequest()
-            create_transaction_request.merchantAuthentication = merchant_auth
-            sanitized_ref = self._sanitize_ref_id(request.ref_id)
-            if sanitized_ref:
-                create_transaction_request.refId = sanitized_ref
-            create_transaction_request.transactionRequest = transaction_request
-
-            # Execute transaction
-            controller = createTransactionController(create_transaction_request)
-            controller.setenvironment(self._get_environment())
-            controller.execute()
-
-            # Get response
-            response = controller.getresponse()
-
-            return self._parse_response(response)
+    def render_purchase_request(self, request: PurchaseRequest) -> bytes:
+        """Render createTransactionRequest XML for a purchase (auth + capture)"""
+        return self.templates.card_transaction(
+            request, "authCaptureTransaction", self._sanitize_ref_id(request.ref_id)
+        )
 
-        except AuthorizeNetValidationError:
-            raise
-        except Exception as e:
-            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
-            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
+    def render_authorize_request(self, request: PurchaseRequest) -> bytes:
+        """Render createTransactionRequest XML for an auth only transaction"""
+        return self.templates.card_transaction(
+            request, "authOnlyTransaction", self._sanitize_ref_id(request.ref_id)
+        )
 
-    def authorize(self, request: PurchaseRequest) -> TransactionResponse:
-        """Authorize a transaction without capturing"""
-        try:
-            merchant_auth = self._create_merchant_auth()
-
-            credit_card = apicontractsv1.creditCardType()
-            credit_card.cardNumber = request.credit_card.card_number.replace(" ", "").replace("-", "")
-            exp_date = request.credit_card.expiration_date
-            if len(exp_date) == 7 and "-" in exp_date:
-                year, month = exp_date.split("-")
-                exp_date = f"{month}/{year[-2:]}"
-            credit_card.expirationDate = exp_date
-            if request.credit_card.card_code:
-                credit_card.cardCode = request.credit_card.card_code
-
-            payment = apicontractsv1.paymentType()
-            payment.creditCard = credit_card
-
-            order = apicontractsv1.orderType()
-            if request.invoice_number:
-                order.invoiceNumber = request.invoice_number
-            if request.description:
-                order.description = request.description
-
-            customer_address = apicontractsv1.customerAddressType()
-            customer_address.firstName = request.customer_address.first_name
-            customer_address.lastName = request.customer_address.last_name
-            if request.customer_address.company:
-                customer_address.company = request.customer_address.company
-            customer_address.address = request.customer_address.address
-            customer_address.city = request.customer_address.city
-            customer_address.state = request.customer_address.state
-            customer_address.zip = request.customer_address.zip
-            customer_address.country = request.customer_address.country
-
-            customer_data = apicontractsv1.customerDataType()
-            customer_data.type = request.customer_data.customer_type
-            customer_data.id = request.customer_data.customer_id
-            customer_data.email = request.customer_data.email
+    def render_capture_request(self, request: CaptureRequest) -> bytes:
+        """Render createTransactionRequest XML for a prior auth capture"""
+        return self.templates.capture(request, self._sanitize_ref_id(request.ref_id))
 
-            duplicate_window_setting = apicontractsv1.settingType()
-            duplicate_window_setting.settingName = "duplicateWindow"
-            duplicate_window_setting.settingValue = str(request.duplicate_window)
-            settings_array = apicontractsv1.ArrayOfSetting()
-            settings_array.setting.append(duplicate_window_setting)
+    def render_void_request(self, request: VoidRequest) -> bytes:
+        """Render createTransactionRequest XML for a void"""
+        return self.templates.void(request, self._sanitize_ref_id(request.ref_id))
 
-            line_items = None
-            if request.line_items:
-                line_items = apicontractsv1.ArrayOfLineItem()
-                for item in request.line_items:
-                    line_item = apicontractsv1.lineItemType()
-                    line_item.itemId = item.item_id
-                    line_item.name = item.name
-                    line_item.description = item.description
-                    line_item.quantity = item.quantity
-                    line_item.unitPrice = item.unit_price
-                    line_items.lineItem.append(line_item)
-
-            transaction_request = apicontractsv1.transactionRequestType()
-            transaction_request.transactionType = "authOnlyTransaction"
-            transaction_request.amount = str(request.amount)
-            transaction_request.payment = payment
-            transaction_request.order = order
-            transaction_request.billTo = customer_address
-            transaction_request.customer = customer_data
-            transaction_request.transactionSettings = settings_array
-            if line_items:
-                transaction_request.lineItems = line_items
-
-            create_transaction_request = apicontractsv1.createTransactionRequest()
-            create_transaction_request.merchantAuthentication = merchant_auth
-            sanitized_ref = self._sanitize_ref_id(request.ref_id)
-            if sanitized_ref:
-                create_transaction_request.refId = sanitized_ref
-            create_transaction_request.transactionRequest = transaction_request
-
-            controller = createTransactionController(create_transaction_request)
-            controller.setenvironment(self._get_environment())
-            controller.execute()
-
-            response = controller.getresponse()
-            return self._parse_response(response)
+    def render_refund_request(self, request: RefundRequest) -> bytes:
+        """Render createTransactionRequest XML for a refund"""
+        return self.templates.refund(request, self._sanitize_ref_id(request.ref_id))
 
-        except AuthorizeNetValidationError:
-            raise
-        except Exception as e:
-            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
-            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
+    def render_subscription_request(self, request: SubscriptionRequest) -> bytes:
+        """Render ARBCreateSubscriptionRequest XML (via the SDK contract classes)"""
+        return self.serialize(
+            self.build_subscription_request(request), ARB_CREATE_SUBSCRIPTION_REQUEST
+        )
 
-    def capture(self, request: CaptureRequest) -> TransactionResponse:
-        """Capture a previously authorized transaction"""
-        try:
-            merchant_auth = self._create_merchant_auth()
+    def render_settled_batch_list_request(self, request: SettledBatchListRequest) -> bytes:
+        """Render getSettledBatchListRequest XML"""
+        return self.reporting_templates.settled_batch_list(request)
 
-            transaction_request = apicontractsv1.transactionRequestType()
-            transaction_request.transactionType = "priorAuthCaptureTransaction"
-            transaction_request.refTransId = request.transaction_id
-            transaction_request.amount = str(request.amount)
+    def render_transaction_list_request(self, request: TransactionListRequest) -> bytes:
+        """Render getTransactionListRequest XML"""
+        return self.reporting_templates.transaction_list(request)
 
-            create_transaction_request = apicontractsv1.createTransactionRequest()
-            create_transaction_request.merchantAuthentication = merchant_auth
-            sanitized_ref = self._sanitize_ref_id(request.ref_id)
-            if sanitized_ref:
-                create_transaction_request.refId = sanitized_ref
-            create_transaction_request.transactionRequest = transaction_request
+    def render_transaction_details_request(self, request: TransactionDetailsRequest) -> bytes:
+        """Render getTransactionDetailsRequest XML"""
+        return self.reporting_templates.transaction_details(request)
 
-            controller = createTransactionController(create_transaction_request)
-            controller.setenvironment(self._get_environment())
-            controller.execute()
+    def parse_transaction_response(self, content: bytes | None) -> TransactionResponse:
+        """Parse raw createTransactionResponse bytes"""
+        return read_transaction_response(content)
 
-            response = controller.getresponse()
-            return self._parse_response(response)
+    def parse_subscription_response(self, content: bytes | None) -> SubscriptionResponse:
+        """Parse raw ARBCreateSubscriptionResponse bytes"""
+        return read_subscription_response(content)
 
-        except AuthorizeNetValidationError:
-            raise
-        except Exception as e:
-            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
-            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
+    def parse_settled_batch_list_response(self, content: bytes | None) -> SettledBatchListResponse:
+        """Parse raw getSettledBatchListResponse bytes"""
+        return read_settled_batch_list_response(content)
 
-    def void(self, request: VoidRequest) -> TransactionResponse:
-        """Void (cancel) a previously authorized/unsettled transaction"""
-        try:
-            merchant_auth = self._create_merchant_auth()
+    def parse_transaction_list_response(self, content: bytes | None) -> TransactionListResponse:
+        """Parse raw getTransactionListResponse bytes"""
+        return read_transaction_list_response(content)
 
-            transaction_request = apicontractsv1.transactionRequestType()
-            transaction_request.transactionType = "voidTransaction"
-            transaction_request.refTransId = request.transaction_id
+    def parse_transaction_details_response(
+        self, content: bytes | None
+    ) -> TransactionDetailsResponse:
+        """Parse raw getTransactionDetailsResponse bytes"""
+        return read_transaction_details_response(content)
 
-            create_transaction_request = apicontractsv1.createTransactionRequest()
-            create_transaction_request.merchantAuthentication = merchant_auth
-            sanitized_ref = self._sanitize_ref_id(request.ref_id)
-            if sanitized_ref:
-                create_transaction_request.refId = sanitized_ref
-            create_transaction_request.transactionRequest = transaction_request
+    def _execute(self, payload: bytes) -> bytes | None:
+        """Post a request over the shared keep-alive pool and return the raw reply"""
+        return self.pool.post(self.endpoint, payload)
 
-            controller = createTransactionController(create_transaction_request)
-            controller.setenvironment(self._get_environment())
-            controller.execute()
+    @_translate_errors
+    def purchase(self, request: PurchaseRequest) -> TransactionResponse:
+        """Process a purchase transaction (auth + capture)"""
+        return self.parse_transaction_response(
+            self._execute(self.render_purchase_request(request))
+        )
 
-            response = controller.getresponse()
-            return self._parse_response(response)
+    @_translate_errors
+    def authorize(self, request: PurchaseRequest) -> TransactionResponse:
+        """Authorize a transaction without capturing"""
+        return self.parse_transaction_response(
+            self._execute(self.render_authorize_request(request))
+        )
 
-        except AuthorizeNetValidationError:
-            raise
-        except Exception as e:
-            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
-            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
+    @_translate_errors
+    def capture(self, request: CaptureRequest) -> TransactionResponse:
+        """Capture a previously authorized transaction"""
+        return self.parse_transaction_response(
+            self._execute(self.render_capture_request(request))
+        )
 
+    @_translate_errors
+    def void(self, request: VoidRequest) -> TransactionResponse:
+        """Void (cancel) a previously authorized/unsettled transaction"""
+        return self.parse_transaction_response(
+            self._execute(self.render_void_request(request))
+        )
+
+    @_translate_errors
     def refund(self, request: RefundRequest) -> TransactionResponse:
         """Refund a captured/settled transaction"""
-        try:
-            merchant_auth = self._create_merchant_auth()
-
-            credit_card = apicontractsv1.creditCardType()
-            credit_card.cardNumber = request.card_number_last4
-            credit_card.expirationDate = "XXXX"  # per Authorize.Net sample for refunds
-
-            payment = apicontractsv1.paymentType()
-            payment.creditCard = credit_card
-
-            transaction_request = apicontractsv1.transactionRequestType()
-            transaction_request.transactionType = "refundTransaction"
-            transaction_request.amount = str(request.amount)
-            transaction_request.refTransId = request.transaction_id
-            transaction_request.payment = payment
-
-            create_transaction_request = apicontractsv1.createTransactionRequest()
-            create_transaction_request.merchantAuthentication = merchant_auth
-            sanitized_ref = self._sanitize_ref_id(request.ref_id)
-            if sanitized_ref:
-                create_transaction_request.refId = sanitized_ref
-            create_transaction_request.transactionRequest = transaction_request
-
-            controller = createTransactionController(create_transaction_request)
-            controller.setenvironment(self._get_environment())
-            controller.execute()
-
-            response = controller.getresponse()
-            return self._parse_response(response)
-
-        except AuthorizeNetValidationError:
-            raise
-        except Exception as e:
-            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
-            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
+        return self.parse_transaction_response(
+            self._execute(self.render_refund_request(request))
+        )
 
+    @_translate_errors
     def create_subscription(self, request: SubscriptionRequest) -> SubscriptionResponse:
         """Create a recurring subscription (ARB)"""
-        try:
-            merchant_auth = self._create_merchant_auth()
-
-            # payment schedule
-            schedule = apicontractsv1.paymentScheduleType()
-            interval = apicontractsv1.paymentScheduleTypeInterval()
-            interval.length = request.schedule.interval_length
-            unit = request.schedule.interval_unit.lower()
-            if unit == "days":
-                interval.unit = apicontractsv1.ARBSubscriptionUnitEnum.days
-            elif unit == "months":
-                interval.unit = apicontractsv1.ARBSubscriptionUnitEnum.months
-            else:
-                raise AuthorizeNetValidationError("interval_unit must be 'days' or 'months'")
-            schedule.interval = interval
-            schedule.startDate = request.schedule.start_date
-            schedule.totalOccurrences = request.schedule.total_occurrences
-            schedule.trialOccurrences = request.schedule.trial_occurrences
-
-            # payment info
-            credit_card = apicontractsv1.creditCardType()
-            credit_card.cardNumber = request.credit_card.card_number.replace(" ", "").replace("-", "")
-            exp_date = request.credit_card.expiration_date
-            if len(exp_date) == 7 and "-" in exp_date:  # YYYY-MM format
-                year, month = exp_date.split("-")
-                exp_date = f"{month}/{year[-2:]}"
-            credit_card.expirationDate = exp_date
-            if request.credit_card.card_code:
-                credit_card.cardCode = request.credit_card.card_code
-
-            payment = apicontractsv1.paymentType()
-            payment.creditCard = credit_card
-
-            bill_to = apicontractsv1.nameAndAddressType()
-            bill_to.firstName = request.customer_address.first_name
-            bill_to.lastName = request.customer_address.last_name
-            if request.customer_address.company:
-                bill_to.company = request.customer_address.company
-            bill_to.address = request.customer_address.address
-            bill_to.city = request.customer_address.city
-            bill_to.state = request.customer_address.state
-            bill_to.zip = request.customer_address.zip
-            bill_to.country = request.customer_address.country
-
-            subscription = apicontractsv1.ARBSubscriptionType()
-            subscription.name = request.name
-            subscription.paymentSchedule = schedule
-            subscription.amount = float(request.amount)
-            subscription.trialAmount = float(request.schedule.trial_amount)
-            subscription.billTo = bill_to
-            subscription.payment = payment
-
-            arb_request = apicontractsv1.ARBCreateSubscriptionRequest()
-            arb_request.merchantAuthentication = merchant_auth
-            sanitized_ref = self._sanitize_ref_id(request.ref_id)
-            if sanitized_ref:
-                arb_request.refId = sanitized_ref
-            arb_request.subscription = subscription
-
-            controller = ARBCreateSubscriptionController(arb_request)
-            controller.setenvironment(self._get_environment())
-            controller.execute()
-
-            response = controller.getresponse()
-            return self._parse_subscription_response(response)
-
-        except AuthorizeNetValidationError:
-            raise
-        except Exception as e:
-            logger.error("Authorize.Net API error", error=str(e), exc_info=True)
-            raise AuthorizeNetConnectionError(f"Failed to connect to Authorize.Net: {str(e)}")
-
-    def _parse_subscription_response(self, response) -> SubscriptionResponse:
-        """Parse ARB subscription response"""
-        if response is None:
-            return SubscriptionResponse(
-                success=False,
-                error_text="Null response from Authorize.Net",
-            )
-
-        result_code = response.messages.resultCode
-        if result_code == "Ok":
-            msg = response.messages.message[0]
-            return SubscriptionResponse(
-                success=True,
-                subscription_id=str(getattr(response, "subscriptionId", None)),
-                result_code=result_code,
-                message_code=str(msg.code),
-                message_text=msg.text,
-            )
+        return self.parse_subscription_response(
+            self._execute(self.render_subscription_request(request))
+        )
 
-        # errors
-        msg = response.messages.message[0]
-        return SubscriptionResponse(
-            success=False,
-            result_code=result_code,
-            error_code=str(msg.code),
-            error_text=msg.text,
+    @_translate_errors
+    def get_settled_batch_list(self, request: SettledBatchListRequest) -> SettledBatchListResponse:
+        """List settled batches in a date range (Transaction Reporting API)"""
+        return self.parse_settled_batch_list_response(
+            self._execute(self.render_settled_batch_list_request(request))
         )
 
-    def _parse_response(self, response) -> TransactionResponse:
-        """Parse Authorize.Net API response"""
-        if response is None:
-            return TransactionResponse(
-                success=False,
-                error_text="Null response from Authorize.Net"
-            )
+    @_translate_errors
+    def get_transaction_list(self, request: TransactionListRequest) -> TransactionListResponse:
+        """Fetch one page of the transactions in a settled batch"""
+        return self.parse_transaction_list_response(
+            self._execute(self.render_transaction_list_request(request))
+        )
 
-        result_code = response.messages.resultCode
-
-        # Check if API request was successful
-        if result_code == "Ok":
-            # Check for transaction response
-            if hasattr(response, 'transactionResponse') and response.transactionResponse:
-                trans_response = response.transactionResponse
-
-                # Check for success messages
-                if hasattr(trans_response, 'messages') and trans_response.messages:
-                    response_code = str(trans_response.responseCode) if hasattr(trans_response, "responseCode") else None
-                    message_code = str(trans_response.messages.message[0].code)
-                    transaction_id = str(trans_response.transId) if hasattr(trans_response, "transId") else None
-                    return TransactionResponse(
-                        success=True,
-                        transaction_id=transaction_id,
-                        response_code=response_code,
-                        message_code=message_code,
-                        message_description=trans_response.messages.message[0].description,
-                        result_code=result_code
-                    )
-                # Check for errors
-                elif hasattr(trans_response, 'errors') and trans_response.errors:
-                    error = trans_response.errors.error[0]
-                    error_code = str(error.errorCode) if hasattr(error, "errorCode") else None
-                    return TransactionResponse(
-                        success=False,
-                        error_code=error_code,
-                        error_text=error.errorText,
-                        result_code=result_code
-                    )
-
-        # API request failed
-        error_code = None
-        error_text = None
-
-        if hasattr(response, 'transactionResponse') and hasattr(
-            response.transactionResponse, 'errors'
-        ) and response.transactionResponse.errors:
-            error = response.transactionResponse.errors.error[0]
-            error_code = str(error.errorCode)
-            error_text = error.errorText
-        elif hasattr(response, 'messages') and response.messages.message:
-            msg = response.messages.message[0]
-            error_code = str(msg.code)
-            error_text = msg.text
-
-        return TransactionResponse(
-            success=False,
-            error_code=error_code,
-            error_text=error_text,
-            result_code=result_code
+    @_translate_errors
+    def get_transaction_details(
+        self, request: TransactionDetailsRequest
+    ) -> TransactionDetailsResponse:
+        """Fetch the details of a single transaction"""
+        return self.parse_transaction_details_response(
+            self._execute(self.render_transaction_details_request(request))
         )
@@ -0,0 +1,173 @@
+"""Persistent HTTP connection pools for the Authorize.Net XML API"""
+import threading
+from functools import lru_cache
+
+import httpx
+from authorizenet import constants
+
+from app.core.config import settings
+from app.core.metrics import (
+    GATEWAY_POOL_REQUESTS,
+    GATEWAY_POOL_CONNECTIONS_OPENED,
+    GATEWAY_POOL_IN_FLIGHT,
+    GATEWAY_POOL_UTILIZATION,
+)
+
+# httpcore trace event emitted once per newly established TCP connection
+_CONNECT_EVENT = "connection.connect_tcp.complete"
+
+
+def _limits(pool_size: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=settings.AUTHORIZE_NET_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.AUTHORIZE_NET_READ_TIMEOUT_SECONDS,
+        connect=settings.AUTHORIZE_NET_CONNECT_TIMEOUT_SECONDS,
+    )
+
+
+class _PoolStats:
+    """Counters behind pool metrics, safe to update from many threads"""
+
+    def __init__(self, name: str, pool_size: int):
+        self.pool_size = pool_size
+        self.requests = 0
+        self.connections_opened = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        # Bind label children once so the hot path does no label lookups
+        self._requests_metric = GATEWAY_POOL_REQUESTS.labels(pool=name)
+        self._connections_metric = GATEWAY_POOL_CONNECTIONS_OPENED.labels(pool=name)
+        self._in_flight_metric = GATEWAY_POOL_IN_FLIGHT.labels(pool=name)
+        self._utilization_metric = GATEWAY_POOL_UTILIZATION.labels(pool=name)
+
+    def acquire(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            in_flight = self.in_flight
+        self._requests_metric.inc()
+        self._in_flight_metric.inc()
+        self._utilization_metric.set(in_flight / self.pool_size)
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            in_flight = self.in_flight
+        self._in_flight_metric.dec()
+        self._utilization_metric.set(in_flight / self.pool_size)
+
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+        self._connections_metric.inc()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.requests - self.connections_opened,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "utilization": self.in_flight / self.pool_size,
+            }
+
+
+class GatewayConnectionPool:
+    """
+    Keep-alive (optionally HTTP/2) connection pool for blocking gateway calls.
+
+    Safe to share between threads; one pool per process is enough.
+    """
+
+    def __init__(
+        self,
+        pool_size: int | None = None,
+        http2: bool | None = None,
+        verify: bool | str = True,
+        transport: httpx.BaseTransport | None = None,
+    ):
+        pool_size = pool_size or settings.AUTHORIZE_NET_POOL_SIZE
+        self.stats = _PoolStats("sync", pool_size)
+        self._client = httpx.Client(
+            http2=settings.AUTHORIZE_NET_HTTP2 if http2 is None else http2,
+            limits=_limits(pool_size),
+            timeout=_timeout(),
+            headers=constants.constants.headers,
+            verify=verify,
+            transport=transport,
+        )
+        self._extensions = {"trace": self._trace}
+
+    def _trace(self, event: str, info: dict) -> None:
+        if event == _CONNECT_EVENT:
+            self.stats.connection_opened()
+
+    def post(self, url: str, payload: bytes) -> bytes | None:
+        """POST an XML payload; returns the body, or None on a non-2xx reply"""
+        self.stats.acquire()
+        try:
+            response = self._client.post(url, content=payload, extensions=self._extensions)
+        finally:
+            self.stats.release()
+        return response.content if response.is_success else None
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class AsyncGatewayConnectionPool:
+    """Keep-alive (optionally HTTP/2) connection pool for awaitable gateway calls"""
+
+    def __init__(
+        self,
+        pool_size: int | None = None,
+        http2: bool | None = None,
+        verify: bool | str = True,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        pool_size = pool_size or settings.AUTHORIZE_NET_POOL_SIZE
+        self.stats = _PoolStats("async", pool_size)
+        self._client = httpx.AsyncClient(
+            http2=settings.AUTHORIZE_NET_HTTP2 if http2 is None else http2,
+            limits=_limits(pool_size),
+            timeout=_timeout(),
+            headers=constants.constants.headers,
+            verify=verify,
+            transport=transport,
+        )
+        self._extensions = {"trace": self._trace}
+
+    async def _trace(self, event: str, info: dict) -> None:
+        if event == _CONNECT_EVENT:
+            self.stats.connection_opened()
+
+    async def post(self, url: str, payload: bytes) -> bytes | None:
+        """POST an XML payload; returns the body, or None on a non-2xx reply"""
+        self.stats.acquire()
+        try:
+            response = await self._client.post(
+                url, content=payload, extensions=self._extensions
+            )
+        finally:
+            self.stats.release()
+        return response.content if response.is_success else None
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+@lru_cache()
+def get_connection_pool() -> GatewayConnectionPool:
+    """Get the process-wide pool shared by every AuthorizeNetClient"""
+    return GatewayConnectionPool()
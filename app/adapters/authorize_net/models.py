@@ -1,8 +1,8 @@
 """Authorize.Net adapter models"""
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 
 
 @dataclass
@@ -127,3 +127,87 @@ class TransactionResponse:
     error_text: Optional[str] = None
     result_code: Optional[str] = None
     success: bool = False
+
+
+@dataclass
+class SettledBatchListRequest:
+    """Settled batch list request (Transaction Reporting API, at most 31 days)"""
+    first_settlement_date: datetime
+    last_settlement_date: datetime
+    include_statistics: bool = False
+
+
+@dataclass
+class TransactionListRequest:
+    """One page of the transactions in a settled batch"""
+    batch_id: str
+    limit: int = 1000  # gateway maximum
+    offset: int = 1  # 1-based page number
+
+
+@dataclass
+class TransactionDetailsRequest:
+    """Transaction details request"""
+    transaction_id: str
+
+
+@dataclass
+class SettledBatch:
+    """Settled batch summary"""
+    batch_id: str
+    settlement_time_utc: Optional[str] = None
+    settlement_state: Optional[str] = None
+
+
+@dataclass
+class TransactionSummary:
+    """Transaction as listed in a settled batch"""
+    transaction_id: str
+    status: str
+    settle_amount: Optional[Decimal] = None
+    submit_time_utc: Optional[str] = None
+    invoice_number: Optional[str] = None
+
+
+@dataclass
+class TransactionDetails:
+    """Transaction details from the reporting API"""
+    transaction_id: str
+    status: str
+    transaction_type: Optional[str] = None
+    ref_transaction_id: Optional[str] = None
+    batch_id: Optional[str] = None
+    auth_amount: Optional[Decimal] = None
+    settle_amount: Optional[Decimal] = None
+    submit_time_utc: Optional[str] = None
+
+
+@dataclass
+class SettledBatchListResponse:
+    """Settled batch list response"""
+    batches: list[SettledBatch] = field(default_factory=list)
+    result_code: Optional[str] = None
+    error_code: Optional[str] = None
+    error_text: Optional[str] = None
+    success: bool = False
+
+
+@dataclass
+class TransactionListResponse:
+    """One page of a settled batch's transactions"""
+    transactions: list[TransactionSummary] = field(default_factory=list)
+    total_num_in_result_set: int = 0
+    result_code: Optional[str] = None
+    error_code: Optional[str] = None
+    error_text: Optional[str] = None
+    success: bool = False
+
+
+@dataclass
+class TransactionDetailsResponse:
+    """Transaction details response"""
+    transaction: Optional[TransactionDetails] = None
+    result_code: Optional[str] = None
+    error_code: Optional[str] = None
+    error_text: Optional[str] = None
+    success: bool = False
@@ -0,0 +1,285 @@
+"""Precompiled XML templates for Authorize.Net request payloads"""
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from authorizenet import constants
+
+from app.adapters.authorize_net.models import (
+    CreditCard,
+    PurchaseRequest,
+    CaptureRequest,
+    VoidRequest,
+    RefundRequest,
+    SettledBatchListRequest,
+    TransactionListRequest,
+    TransactionDetailsRequest,
+)
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>'
+_NAMESPACE = "AnetApi/xml/v1/schema/AnetApiSchema.xsd"
+
+_CAPTURE = (
+    "<transactionRequest>"
+    "<transactionType>priorAuthCaptureTransaction</transactionType>"
+    "<amount>{amount}</amount>"
+    "<refTransId>{ref_trans_id}</refTransId>"
+    "</transactionRequest>"
+)
+_VOID = (
+    "<transactionRequest>"
+    "<transactionType>voidTransaction</transactionType>"
+    "<refTransId>{ref_trans_id}</refTransId>"
+    "</transactionRequest>"
+)
+_REFUND = (
+    "<transactionRequest>"
+    "<transactionType>refundTransaction</transactionType>"
+    "<amount>{amount}</amount>"
+    "<payment><creditCard>"
+    "<cardNumber>{card_number}</cardNumber>"
+    "<expirationDate>XXXX</expirationDate>"  # per Authorize.Net sample for refunds
+    "</creditCard></payment>"
+    "<refTransId>{ref_trans_id}</refTransId>"
+    "</transactionRequest>"
+)
+_TRANSACTION_SETTINGS = (
+    "<transactionSettings><setting>"
+    "<settingName>duplicateWindow</settingName>"
+    "<settingValue>{duplicate_window}</settingValue>"
+    "</setting></transactionSettings>"
+)
+
+
+def escape(value) -> str:
+    """Escape character data the way the SDK's DOM serializer does"""
+    text = str(value)
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    return text
+
+
+def decimal_literal(value) -> str:
+    """Render an xs:decimal the way PyXB does (normalized, at least one fraction digit)"""
+    text = format(Decimal(str(value)).normalize(), "f")
+    return text if "." in text else f"{text}.0"
+
+
+def normalize_card_number(card_number: str) -> str:
+    """Strip spaces and dashes from a card number"""
+    return card_number.replace(" ", "").replace("-", "")
+
+
+def normalize_expiration_date(expiration_date: str) -> str:
+    """Convert expiration date format (YYYY-MM or MM/YY) to MM/YY"""
+    if len(expiration_date) == 7 and "-" in expiration_date:  # YYYY-MM format
+        year, month = expiration_date.split("-")
+        return f"{month}/{year[-2:]}"
+    return expiration_date
+
+
+def datetime_literal(value: datetime) -> str:
+    """Render an xs:dateTime in UTC (naive values are taken to be UTC already)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.replace(tzinfo=None, microsecond=0).isoformat() + "Z"
+
+
+def _element(tag: str, value) -> str:
+    """Render a simple element, omitting it when the value is unset"""
+    if value is None:
+        return ""
+    return f"<{tag}>{escape(value)}</{tag}>"
+
+
+def _open_request(element_name: str, api_login_id: str, transaction_key: str) -> str:
+    """Declaration, root element, merchant authentication and clientId"""
+    return (
+        f'{_XML_DECLARATION}<{element_name} xmlns="{_NAMESPACE}">'
+        "<merchantAuthentication>"
+        f"{_element('name', api_login_id)}"
+        f"{_element('transactionKey', transaction_key)}"
+        "</merchantAuthentication>"
+        f"{_element('clientId', constants.constants.clientId)}"
+    )
+
+
+class TransactionTemplates:
+    """
+    Render createTransactionRequest XML straight from the adapter dataclasses.
+
+    Produces the same document as building the PyXB contract objects and
+    serializing them through the SDK (same element order, decimal and escaping
+    rules), without the per-request object graph. Merchant authentication and
+    the transactionSettings fragments are rendered once and reused. Schema
+    facets (e.g. maxLength) are left to the gateway to enforce.
+    """
+
+    def __init__(self, api_login_id: str, transaction_key: str):
+        self._prefix = _open_request("createTransactionRequest", api_login_id, transaction_key)
+        self._suffix = "</createTransactionRequest>"
+        self._transaction_settings: dict[int, str] = {}
+
+    def _render(self, transaction_request: str, ref_id: str | None) -> bytes:
+        ref = f"<refId>{escape(ref_id)}</refId>" if ref_id else ""
+        return f"{self._prefix}{ref}{transaction_request}{self._suffix}".encode("utf-8")
+
+    def _settings(self, duplicate_window: int) -> str:
+        fragment = self._transaction_settings.get(duplicate_window)
+        if fragment is None:
+            fragment = _TRANSACTION_SETTINGS.format(duplicate_window=escape(duplicate_window))
+            self._transaction_settings[duplicate_window] = fragment
+        return fragment
+
+    @staticmethod
+    def _credit_card(card: CreditCard) -> str:
+        card_code = _element("cardCode", card.card_code) if card.card_code else ""
+        return (
+            "<creditCard>"
+            f"<cardNumber>{escape(normalize_card_number(card.card_number))}</cardNumber>"
+            f"<expirationDate>{escape(normalize_expiration_date(card.expiration_date))}"
+            "</expirationDate>"
+            f"{card_code}"
+            "</creditCard>"
+        )
+
+    def card_transaction(
+        self, request: PurchaseRequest, transaction_type: str, ref_id: str | None
+    ) -> bytes:
+        """Render a purchase (authCaptureTransaction) or auth only transaction"""
+        parts = [
+            "<transactionRequest>",
+            f"<transactionType>{transaction_type}</transactionType>",
+            f"<amount>{decimal_literal(request.amount)}</amount>",
+            f"<payment>{self._credit_card(request.credit_card)}</payment>",
+        ]
+
+        order = ""
+        if request.invoice_number:
+            order += _element("invoiceNumber", request.invoice_number)
+        if request.description:
+            order += _element("description", request.description)
+        parts.append(f"<order>{order}</order>" if order else "<order/>")
+
+        if request.line_items:
+            parts.append("<lineItems>")
+            for item in request.line_items:
+                parts.append(
+                    "<lineItem>"
+                    f"{_element('itemId', item.item_id)}"
+                    f"{_element('name', item.name)}"
+                    f"{_element('description', item.description)}"
+                    f"<quantity>{decimal_literal(item.quantity)}</quantity>"
+                    f"<unitPrice>{decimal_literal(item.unit_price)}</unitPrice>"
+                    "</lineItem>"
+                )
+            parts.append("</lineItems>")
+
+        customer = request.customer_data
+        parts.append(
+            "<customer>"
+            f"{_element('type', customer.customer_type)}"
+            f"{_element('id', customer.customer_id)}"
+            f"{_element('email', customer.email)}"
+            "</customer>"
+        )
+
+        address = request.customer_address
+        company = _element("company", address.company) if address.company else ""
+        parts.append(
+            "<billTo>"
+            f"{_element('firstName', address.first_name)}"
+            f"{_element('lastName', address.last_name)}"
+            f"{company}"
+            f"{_element('address', address.address)}"
+            f"{_element('city', address.city)}"
+            f"{_element('state', address.state)}"
+            f"{_element('zip', address.zip)}"
+            f"{_element('country', address.country)}"
+            "</billTo>"
+        )
+        parts.append(self._settings(request.duplicate_window))
+        parts.append("</transactionRequest>")
+        return self._render("".join(parts), ref_id)
+
+    def capture(self, request: CaptureRequest, ref_id: str | None) -> bytes:
+        """Render a prior auth capture"""
+        return self._render(
+            _CAPTURE.format(
+                amount=decimal_literal(request.amount),
+                ref_trans_id=escape(request.transaction_id),
+            ),
+            ref_id,
+        )
+
+    def void(self, request: VoidRequest, ref_id: str | None) -> bytes:
+        """Render a void"""
+        return self._render(_VOID.format(ref_trans_id=escape(request.transaction_id)), ref_id)
+
+    def refund(self, request: RefundRequest, ref_id: str | None) -> bytes:
+        """Render a refund"""
+        return self._render(
+            _REFUND.format(
+                amount=decimal_literal(request.amount),
+                card_number=escape(request.card_number_last4),
+                ref_trans_id=escape(request.transaction_id),
+            ),
+            ref_id,
+        )
+
+
+class ReportingTemplates:
+    """
+    Render Transaction Reporting API requests (getSettledBatchList,
+    getTransactionList, getTransactionDetails) with the same rules as
+    TransactionTemplates.
+    """
+
+    def __init__(self, api_login_id: str, transaction_key: str):
+        self._settled_batch_list = _open_request(
+            "getSettledBatchListRequest", api_login_id, transaction_key
+        )
+        self._transaction_list = _open_request(
+            "getTransactionListRequest", api_login_id, transaction_key
+        )
+        self._transaction_details = _open_request(
+            "getTransactionDetailsRequest", api_login_id, transaction_key
+        )
+
+    def settled_batch_list(self, request: SettledBatchListRequest) -> bytes:
+        """Render getSettledBatchListRequest"""
+        include_statistics = "true" if request.include_statistics else "false"
+        return (
+            f"{self._settled_batch_list}"
+            f"<includeStatistics>{include_statistics}</includeStatistics>"
+            f"<firstSettlementDate>{datetime_literal(request.first_settlement_date)}"
+            "</firstSettlementDate>"
+            f"<lastSettlementDate>{datetime_literal(request.last_settlement_date)}"
+            "</lastSettlementDate>"
+            "</getSettledBatchListRequest>"
+        ).encode("utf-8")
+
+    def transaction_list(self, request: TransactionListRequest) -> bytes:
+        """Render getTransactionListRequest for one page of a settled batch"""
+        return (
+            f"{self._transaction_list}"
+            f"<batchId>{escape(request.batch_id)}</batchId>"
+            "<sorting><orderBy>submitTimeUTC</orderBy>"
+            "<orderDescending>false</orderDescending></sorting>"
+            f"<paging><limit>{int(request.limit)}</limit>"
+            f"<offset>{int(request.offset)}</offset></paging>"
+            "</getTransactionListRequest>"
+        ).encode("utf-8")
+
+    def transaction_details(self, request: TransactionDetailsRequest) -> bytes:
+        """Render getTransactionDetailsRequest"""
+        return (
+            f"{self._transaction_details}"
+            f"<transId>{escape(request.transaction_id)}</transId>"
+            "</getTransactionDetailsRequest>"
+        ).encode("utf-8")
@@ -1,9 +1,15 @@
 """Shared API dependencies"""
 from fastapi import Depends, HTTPException, status, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from redis.asyncio import Redis
 
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient
+from app.api.v1.idempotency import IdempotentOperation
 from app.core.security import verify_token
 from app.core.database import get_db
+from app.services.idempotency_service import IdempotencyService, fingerprint_request
+from app.services.webhook_ingestion_service import WebhookIngestor
+from app.utils.authorize_net_webhook import WebhookSignatureVerifier
 from sqlalchemy.ext.asyncio import AsyncSession
 
 security = HTTPBearer()
@@ -31,7 +37,53 @@ async def get_idempotency_key(
     return x_idempotency_key
 
 
+async def get_request_fingerprint(
+    request: Request,
+    idempotency_key: str | None = Depends(get_idempotency_key),
+) -> str | None:
+    """
+    Idempotency fingerprint of the request, computed once from the raw body
+    (the same bytes FastAPI parsed, so the body is not re-read or re-serialized);
+    None without an idempotency key, when there is nothing to compare it with
+    """
+    if not idempotency_key:
+        return None
+    return fingerprint_request(request.method, request.url.path, await request.body())
+
+
 def get_correlation_id(request: Request) -> str:
     """Get correlation ID from request state"""
     return getattr(request.state, "correlation_id", None)
 
+
+def get_authorize_net_client(request: Request) -> AsyncAuthorizeNetClient:
+    """Get the process-wide Authorize.Net client created at startup"""
+    return request.app.state.authorize_net_client
+
+
+def get_webhook_ingestor(request: Request) -> WebhookIngestor:
+    """Get the process-wide webhook ingestor created at startup"""
+    return request.app.state.webhook_ingestor
+
+
+def get_webhook_verifier(request: Request) -> WebhookSignatureVerifier:
+    """Get the process-wide webhook signature verifier created at startup"""
+    return request.app.state.webhook_verifier
+
+
+def get_redis(request: Request) -> Redis | None:
+    """Get the process-wide async Redis client (None when the app was not started)"""
+    return getattr(request.app.state, "redis", None)
+
+
+def get_idempotent_operation(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    redis: Redis | None = Depends(get_redis),
+    idempotency_key: str | None = Depends(get_idempotency_key),
+    request_hash: str | None = Depends(get_request_fingerprint),
+) -> IdempotentOperation:
+    """Runner applying the request's idempotency key to a payment operation"""
+    return IdempotentOperation(
+        IdempotencyService(db, redis), idempotency_key, request_hash, get_correlation_id(request)
+    )
@@ -0,0 +1,135 @@
+"""Idempotent execution of payment endpoints"""
+from collections.abc import Awaitable, Callable
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import structlog
+
+from app.adapters.authorize_net.exceptions import AuthorizeNetValidationError
+from app.services.idempotency_service import IdempotencyService, legacy_request_hash
+
+logger = structlog.get_logger()
+
+# Raised before the request reaches the gateway: PaymentService validation
+# (ValueError) and requests the adapter refuses to build
+PRE_GATEWAY_ERRORS = (ValueError, AuthorizeNetValidationError)
+
+
+class IdempotentOperation:
+    """
+    Runs a payment endpoint's operation under the request's X-Idempotency-Key.
+
+    The key is reserved first (a concurrent duplicate waits for this request's
+    response; a reused key with another body, or a wait that times out, is a
+    409), and the lease is renewed while the operation runs. The outcome is
+    then stored for replay, failures included: once the request may have
+    reached the gateway, a retry must get this response rather than charge
+    again. Only a failure known to precede the gateway call releases the key.
+    Without a key the operation simply runs.
+    """
+
+    def __init__(
+        self,
+        service: IdempotencyService,
+        idempotency_key: str | None,
+        request_hash: str | None,
+        correlation_id: str | None,
+    ):
+        self.service = service
+        self.key = idempotency_key
+        self.request_hash = request_hash
+        self.correlation_id = correlation_id
+
+    async def run(
+        self,
+        operation: Callable[[], Awaitable[dict]],
+        response_model: type[BaseModel],
+        error_event: str,
+        error_detail: str,
+        invalid_status: int = status.HTTP_409_CONFLICT,
+        legacy_body: Callable[[], dict] | None = None,
+    ) -> BaseModel | JSONResponse:
+        """
+        Result of operation() as response_model, or the stored response.
+
+        ValueError from the operation answers invalid_status, anything else
+        500 with detail "<error_detail>: <error>" (error_event is logged).
+        legacy_body() is the dict keys stored before fingerprint_request were
+        hashed from (see legacy_request_hash).
+        """
+        legacy_hash = None if legacy_body is None else (lambda: legacy_request_hash(legacy_body()))
+        if self.key:
+            try:
+                # Holds the key until the response is stored; concurrent duplicates wait for it
+                cached_response = await self.service.reserve_idempotency(
+                    self.key,
+                    self.request_hash,
+                    legacy_hash=legacy_hash,
+                )
+            except ValueError as e:
+                logger.error(
+                    "Idempotency key error",
+                    error=str(e),
+                    correlation_id=self.correlation_id,
+                )
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+            if cached_response:
+                logger.info(
+                    "Returning cached idempotent response",
+                    idempotency_key=self.key,
+                    correlation_id=self.correlation_id,
+                )
+                return JSONResponse(
+                    status_code=cached_response["status_code"],
+                    content=cached_response["response_body"],
+                    headers={"X-Correlation-ID": self.correlation_id},
+                )
+
+        try:
+            async with self.service.hold_lease(self.key):
+                result = await operation()
+        except Exception as e:
+            await self.service.session.rollback()
+            if isinstance(e, ValueError):
+                logger.error(
+                    "Idempotency or validation error",
+                    error=str(e),
+                    correlation_id=self.correlation_id,
+                )
+                error = HTTPException(status_code=invalid_status, detail=str(e))
+            else:
+                logger.exception(error_event, error=str(e), correlation_id=self.correlation_id)
+                error = HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"{error_detail}: {str(e)}",
+                )
+            if isinstance(e, PRE_GATEWAY_ERRORS):
+                await self.service.release_idempotency(self.key)
+            else:
+                # Declined, or the charge may have gone through: retries replay this failure
+                await self._store({"detail": error.detail}, error.status_code)
+            raise error
+
+        await self._store(result, status.HTTP_200_OK)
+        return response_model(**result)
+
+    async def _store(self, response_body: dict, status_code: int) -> None:
+        if not self.key:
+            return
+        try:
+            await self.service.store_idempotency(
+                idempotency_key=self.key,
+                request_hash=self.request_hash,
+                response_body=response_body,
+                status_code=status_code,
+            )
+        except Exception as e:
+            # The reservation stays in place: a retry waits on it instead of running again
+            await self.service.session.rollback()
+            logger.exception(
+                "Failed to store idempotent response",
+                idempotency_key=self.key,
+                error=str(e),
+                correlation_id=self.correlation_id,
+            )
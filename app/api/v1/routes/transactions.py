@@ -1,26 +1,122 @@
 """Transaction endpoints"""
-from fastapi import APIRouter, Depends
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.dependencies import get_current_user
+from app.api.v1.schemas.transaction import TransactionSchema, TransactionListResponseSchema
+from app.core.database import get_read_db, read_session
+from app.models.transaction import TransactionStatus, TransactionType
+from app.repositories.payment_repository import PaymentRepository
+from app.services.export_service import TransactionExportService, EXPORT_MEDIA_TYPES
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
 
-@router.get("/transactions/{transaction_id}")
+def _naive_utc(value: datetime | None) -> datetime | None:
+    """created_at is stored as naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def _export_chunks(export_format: str, **filters) -> AsyncIterator[bytes]:
+    """
+    The export, on a session of its own: it is streamed after the endpoint
+    returns, when FastAPI (before 0.118) may already have closed the
+    request's dependencies
+    """
+    async with read_session() as db:
+        async for chunk in TransactionExportService(db).stream(export_format, **filters):
+            yield chunk
+
+
+@router.get("/transactions/export")
+async def export_transactions(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    status_filter: TransactionStatus | None = Query(None, alias="status"),
+    transaction_type: TransactionType | None = None,
+    customer_id: str | None = None,
+    created_from: datetime | None = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: datetime | None = Query(None, description="Exclusive upper bound on created_at"),
+    cursor: str | None = Query(None, description="cursor of the last row received, to resume"),
+    current_user: dict = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream transactions oldest first as NDJSON or CSV"""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    chunks = _export_chunks(
+        export_format,
+        status=status_filter,
+        transaction_type=transaction_type,
+        customer_id=customer_id,
+        created_from=_naive_utc(created_from),
+        created_to=_naive_utc(created_to),
+        after=after,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{export_format}"'},
+    )
+
+
+@router.get("/transactions/{transaction_id}", response_model=TransactionSchema)
 async def get_transaction(
-    transaction_id: str,
+    transaction_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
-):
-    """Get transaction by ID - placeholder"""
-    # TODO: Implement transaction retrieval
-    return {"message": "Get transaction endpoint - to be implemented"}
+) -> TransactionSchema:
+    """Get transaction by ID"""
+    row = await PaymentRepository(db).get_transaction_summary(transaction_id)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
+    return TransactionSchema.model_validate(row._mapping)
 
 
-@router.get("/transactions")
+@router.get("/transactions", response_model=TransactionListResponseSchema)
 async def list_transactions(
+    status_filter: TransactionStatus | None = Query(None, alias="status"),
+    transaction_type: TransactionType | None = None,
+    customer_id: str | None = None,
+    created_from: datetime | None = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: datetime | None = Query(None, description="Exclusive upper bound on created_at"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
-):
-    """List transactions - placeholder"""
-    # TODO: Implement transaction listing
-    return {"message": "List transactions endpoint - to be implemented"}
+) -> TransactionListResponseSchema:
+    """List transactions newest first, keyset-paginated with an opaque cursor"""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    # One extra row tells us whether there is a next page
+    rows = await PaymentRepository(db).list_transactions(
+        limit=limit + 1,
+        status=status_filter,
+        transaction_type=transaction_type,
+        customer_id=customer_id,
+        created_from=_naive_utc(created_from),
+        created_to=_naive_utc(created_to),
+        after=after,
+    )
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return TransactionListResponseSchema(
+        items=[TransactionSchema.model_validate(row._mapping) for row in page],
+        next_cursor=next_cursor,
+    )
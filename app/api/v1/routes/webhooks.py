@@ -4,14 +4,9 @@ import json
 from fastapi import APIRouter, Request, Header, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
 
-from app.core.config import settings
-from app.core.database import get_db
-from app.repositories.payment_repository import PaymentRepository
-from app.repositories.webhook_repository import WebhookRepository
-from app.utils.authorize_net_webhook import verify_signature
-from app.models.transaction import TransactionStatus
-from app.core.redis import get_queue
-from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.dependencies import get_webhook_ingestor, get_webhook_verifier
+from app.services.webhook_ingestion_service import WebhookIngestor
+from app.utils.authorize_net_webhook import WebhookSignatureVerifier
 import structlog
 
 logger = structlog.get_logger()
@@ -31,23 +26,38 @@ def _extract_trans_id(payload: dict) -> str | None:
     )
 
 
+def _ok(request: Request, correlation_id: str | None) -> JSONResponse:
+    """Acknowledge a delivery so Authorize.Net stops retrying it"""
+    response = JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"status": "ok"},
+    )
+    response.headers["X-Correlation-ID"] = correlation_id or request.state.correlation_id or ""
+    return response
+
+
 @router.post("/webhooks/authorize-net")
 async def authorize_net_webhook(
     request: Request,
     x_authorize_net_signature: str | None = Header(None, alias="X-Authorize-Net-Signature"),
     x_anet_signature: str | None = Header(None, alias="X-ANET-SIGNATURE"),
-    db: AsyncSession = Depends(get_db),
+    ingestor: WebhookIngestor = Depends(get_webhook_ingestor),
+    verifier: WebhookSignatureVerifier = Depends(get_webhook_verifier),
 ):
     """Handle Authorize.Net webhook events"""
     raw_body = await request.body()
     signature = x_authorize_net_signature or x_anet_signature
 
-    if not verify_signature(signature, raw_body, settings.AUTHORIZE_NET_WEBHOOK_SECRET):
+    key_index = verifier.match(signature, raw_body)
+    if key_index is None:
         logger.warning("Invalid webhook signature")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid signature",
         )
+    if key_index > 0:
+        # Still signed with a rotated-out key; it can be dropped once this stops
+        logger.info("Webhook signed with a previous signature key", key_index=key_index)
 
     try:
         payload = json.loads(raw_body.decode("utf-8"))
@@ -55,45 +65,33 @@ async def authorize_net_webhook(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON payload")
 
     event_type = payload.get("eventType")
-    trans_id = _extract_trans_id(payload)
+    notification_id = payload.get("notificationId")
     correlation_id = payload.get("refId")
     if correlation_id:
         structlog.contextvars.bind_contextvars(correlation_id=correlation_id)
         request.state.correlation_id = correlation_id
 
-    webhook_repo = WebhookRepository(db)
-    payment_repo = PaymentRepository(db)
+    # A retried delivery: acknowledge it without touching Postgres or the stream
+    if await ingestor.is_duplicate(notification_id):
+        logger.info("Duplicate webhook delivery", notification_id=notification_id)
+        return _ok(request, correlation_id)
 
-    event_record = await webhook_repo.create_event(
+    # Returns once the event is committed and enqueued (batched with concurrent webhooks)
+    event_id = await ingestor.submit(
         event_type=event_type or "unknown",
-        authorize_net_transaction_id=trans_id,
+        authorize_net_transaction_id=_extract_trans_id(payload),
         raw_payload=payload,
         correlation_id=correlation_id,
+        notification_id=notification_id,
     )
-
-    error_message = None
-
-    try:
-        # enqueue async processing
-        queue = get_queue("webhooks")
-        queue.enqueue("app.tasks.webhook_tasks.process_webhook_event", str(event_record.id))
+    if event_id is None:
+        logger.info("Duplicate webhook delivery", notification_id=notification_id)
+    else:
         logger.info(
             "Enqueued webhook event",
-            event_id=str(event_record.id),
+            event_id=str(event_id),
             event_type=event_type,
             correlation_id=correlation_id,
         )
-    except Exception as e:
-        error_message = str(e)
-        logger.exception("Error enqueueing webhook", error=error_message)
-        await db.rollback()
-        await webhook_repo.mark_processed(event_record, error_message=error_message)
-        await db.commit()
-        raise
+    return _ok(request, correlation_id)
 
-    response = JSONResponse(
-        status_code=status.HTTP_200_OK,
-        content={"status": "ok"},
-    )
-    response.headers["X-Correlation-ID"] = correlation_id or request.state.correlation_id or ""
-    return response
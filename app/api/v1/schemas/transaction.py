@@ -0,0 +1,30 @@
+"""Transaction listing schemas"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from decimal import Decimal
+from datetime import datetime
+from uuid import UUID
+
+from app.models.transaction import TransactionStatus, TransactionType
+
+
+class TransactionSchema(BaseModel):
+    """Transaction as returned by the listing and lookup endpoints"""
+    id: UUID
+    payment_id: UUID
+    transaction_type: TransactionType
+    status: TransactionStatus
+    amount: Decimal
+    currency: str
+    customer_id: Optional[str] = None
+    authorize_net_transaction_id: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class TransactionListResponseSchema(BaseModel):
+    """One page of transactions"""
+    items: list[TransactionSchema]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
@@ -1,4 +1,5 @@
 """Application configuration"""
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
@@ -8,6 +9,31 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    # Connection pool, per process: at most POOL_SIZE + MAX_OVERFLOW connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # replace connections older than this (-1 = never)
+    DB_POOL_PRE_PING: bool = False  # test each connection on checkout (one extra round trip)
+    # Per-statement timeouts: server-side statement_timeout (0 = none) and asyncpg's
+    # client-side command timeout (None = none)
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_COMMAND_TIMEOUT_SECONDS: float | None = None
+    # asyncpg prepared statements cached per connection (0 disables the cache)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Behind PgBouncer in transaction pooling mode: no prepared statement cache and unique
+    # statement names; statement_timeout is not sent (set it on the role or database)
+    DB_PGBOUNCER: bool = False
+    # Log every SQL statement (synchronously; debugging only)
+    DB_ECHO: bool = False
+    # Statements taking at least this long are logged as slow queries (0 = never)
+    DB_SLOW_QUERY_MS: int = 500
+    # Read replica for read-only endpoints (None = everything on DATABASE_URL). It is used
+    # while its replication lag, checked at most every LAG_CHECK seconds (a check taking
+    # longer counts as unavailable), is within MAX_LAG; otherwise reads go to the primary
+    DATABASE_REPLICA_URL: str | None = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 2.0
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 1.0
 
     # JWT
     JWT_SECRET_KEY: str
@@ -18,7 +44,26 @@ class Settings(BaseSettings):
     AUTHORIZE_NET_API_LOGIN_ID: str
     AUTHORIZE_NET_TRANSACTION_KEY: str
     AUTHORIZE_NET_ENVIRONMENT: str = "sandbox"
+    # Signature Key from the Merchant Interface (hex, as shown there)
     AUTHORIZE_NET_WEBHOOK_SECRET: str
+    # Comma-separated signature keys still accepted while the webhook key is rotated
+    AUTHORIZE_NET_WEBHOOK_PREVIOUS_SECRETS: str = ""
+    # Overrides the sandbox/production endpoint (e.g. a local stub gateway)
+    AUTHORIZE_NET_ENDPOINT_URL: str | None = None
+    # Async gateway path: "executor" (blocking client on a bounded thread pool) or "httpx"
+    AUTHORIZE_NET_ASYNC_TRANSPORT: str = "executor"
+    AUTHORIZE_NET_MAX_CONCURRENCY: int = 20
+    # Keep-alive connection pool to the gateway
+    AUTHORIZE_NET_POOL_SIZE: int = 20
+    AUTHORIZE_NET_HTTP2: bool = False  # requires the "http2" extra (h2)
+    AUTHORIZE_NET_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    AUTHORIZE_NET_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AUTHORIZE_NET_READ_TIMEOUT_SECONDS: float = 30.0
+    # Settlement reconciliation (Transaction Reporting API)
+    RECONCILIATION_MAX_CONCURRENCY: int = 4  # reporting calls in flight at once
+    RECONCILIATION_PAGE_SIZE: int = 1000  # getTransactionList page size (gateway max 1000)
+    # Transaction export: rows fetched per server-side cursor round trip (and per chunk)
+    EXPORT_BATCH_SIZE: int = 1000
 
     # Application
     LOG_LEVEL: str = "INFO"
@@ -30,6 +75,60 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Request-path Redis calls (idempotency cache) give up quickly and fall back to Postgres
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.25
+
+    # Idempotency: lease held by the request processing a key (renewed every third of it while
+    # the request runs) and how long a concurrent duplicate waits for that request's result
+    IDEMPOTENCY_LEASE_SECONDS: float = 60.0
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 35.0
+
+    # Webhook ingestion: events arriving within the window are inserted and enqueued together
+    WEBHOOK_BATCH_WINDOW_MS: float = 5.0
+    WEBHOOK_BATCH_MAX_SIZE: int = 500
+    # How long Redis remembers a stored notificationId (Authorize.Net retries for up to 3 days)
+    WEBHOOK_DEDUP_TTL_SECONDS: int = 3 * 24 * 3600
+
+    # Webhook processing: Redis stream consumed by scripts/webhook_consumer.py
+    WEBHOOK_STREAM: str = "webhooks:events"
+    # Approximate cap on the stream (XADD MAXLEN ~) should the consumers stop; trimmed entries
+    # are still in webhook_events and are picked up by replay. 0 = unbounded
+    WEBHOOK_STREAM_MAXLEN: int = 1_000_000
+    WEBHOOK_CONSUMER_GROUP: str = "webhook-processors"
+    WEBHOOK_CONSUMER_CONCURRENCY: int = 10  # batches processed at once per consumer
+    WEBHOOK_CONSUMER_BATCH_SIZE: int = 100  # stream entries read and processed together
+    WEBHOOK_CONSUMER_CLAIM_IDLE_MS: int = 60000  # reclaim entries a dead consumer left unacked
+
+    # Failed webhook events: retried after BACKOFF * 2^(attempts - 1) seconds (capped),
+    # dead-lettered after MAX_ATTEMPTS attempts
+    WEBHOOK_RETRY_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BACKOFF_SECONDS: float = 60.0
+    WEBHOOK_RETRY_BACKOFF_MAX_SECONDS: float = 6 * 3600
+
+    # Webhook replay (scripts/replay_webhooks.py): throttled so live processing keeps priority;
+    # never-attempted events younger than MIN_AGE are left to the live consumers
+    WEBHOOK_REPLAY_BATCH_SIZE: int = 100
+    WEBHOOK_REPLAY_CONCURRENCY: int = 2
+    WEBHOOK_REPLAY_RATE_LIMIT: float = 200.0  # events per second
+    WEBHOOK_REPLAY_MIN_AGE_SECONDS: float = 300.0
+    WEBHOOK_REPLAY_MAX_LIVE_BACKLOG: int = 1000  # pause while the live stream holds more entries
+
+    # Expired idempotency key compaction: rows per DELETE and pause between batches
+    IDEMPOTENCY_COMPACTION_BATCH_SIZE: int = 5000
+    IDEMPOTENCY_COMPACTION_PAUSE_SECONDS: float = 0.05
+
+    @field_validator("AUTHORIZE_NET_WEBHOOK_SECRET", "AUTHORIZE_NET_WEBHOOK_PREVIOUS_SECRETS")
+    @classmethod
+    def _signature_keys_are_hex(cls, value: str) -> str:
+        """Fail at startup rather than on the first webhook"""
+        for key in value.split(","):
+            try:
+                bytes.fromhex(key.strip())
+            except ValueError:
+                raise ValueError(
+                    "must be the hex Signature Key from the Authorize.Net Merchant Interface"
+                ) from None
+        return value
 
     model_config = SettingsConfigDict(
         env_file=".env",
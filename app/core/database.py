@@ -1,20 +1,249 @@
 """Database configuration and session management"""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import structlog
+from sqlalchemy import Engine, Select, event, exc, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_UTILIZATION,
+    DB_READ_SESSIONS,
+    DB_REPLICA_LAG,
+)
+from app.core.query_stats import instrument_queries
+
+logger = structlog.get_logger()
+
+# Seconds the server is behind its primary: 0 when it is not a standby (or has replayed
+# everything it received), otherwise the age of the last replayed transaction
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(
+            extract(epoch FROM now() - pg_last_xact_replay_timestamp())::float8,
+            'Infinity'::float8
+        )
+    END::float8
+    """
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long checkouts wait and how many time out"""
+
+    metrics_name = "primary"
+    _wait_metric = DB_POOL_CHECKOUT_WAIT.labels(pool="primary")
+    _timeouts_metric = DB_POOL_CHECKOUT_TIMEOUTS.labels(pool="primary")
+
+    def use_metrics_name(self, name: str) -> None:
+        """Report under pool=name"""
+        self.metrics_name = name
+        self._wait_metric = DB_POOL_CHECKOUT_WAIT.labels(pool=name)
+        self._timeouts_metric = DB_POOL_CHECKOUT_TIMEOUTS.labels(pool=name)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self._timeouts_metric.inc()
+            raise
+        finally:
+            self._wait_metric.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; it keeps reporting under the same name
+        pool = super().recreate()
+        pool.use_metrics_name(self.metrics_name)
+        return pool
+
+
+def _connect_args() -> dict:
+    """asyncpg connect() arguments from settings"""
+    connect_args = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    if settings.DB_COMMAND_TIMEOUT_SECONDS is not None:
+        connect_args["command_timeout"] = settings.DB_COMMAND_TIMEOUT_SECONDS
+    if settings.DB_PGBOUNCER:
+        # PgBouncer may hand each transaction a different server connection: statements
+        # prepared on one are unknown on the next, and names must not collide
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+        }
+    return connect_args
+
+
+def _instrument_pool(engine: AsyncEngine, name: str, capacity: int) -> None:
+    """Export checked-out connections and utilization of the engine's pool"""
+    checked_out_metric = DB_POOL_CHECKED_OUT.labels(pool=name)
+    utilization_metric = DB_POOL_UTILIZATION.labels(pool=name)
+    checked_out = 0
+
+    # Pool events registered on the engine follow it across dispose()
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(*args):
+        nonlocal checked_out
+        checked_out += 1
+        checked_out_metric.inc()
+        utilization_metric.set(checked_out / capacity)
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(*args):
+        nonlocal checked_out
+        checked_out -= 1
+        checked_out_metric.dec()
+        utilization_metric.set(checked_out / capacity)
+
+    engine.sync_engine.pool.use_metrics_name(name)
+
+
+def build_engine(url: str | None = None, name: str = "primary", **kwargs) -> AsyncEngine:
+    """
+    Async engine configured from the DB_* settings, its pool exporting the
+    db_pool_* metrics and its statements db_query_duration_seconds under
+    pool=name. kwargs are passed to create_async_engine; with a poolclass of
+    its own (e.g. NullPool) the pool settings and metrics do not apply.
+    """
+    options = {
+        "echo": settings.DB_ECHO,
+        "connect_args": _connect_args(),
+    }
+    if "poolclass" not in kwargs:
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    options.update(kwargs)
+    engine = create_async_engine(url or settings.DATABASE_URL, **options)
+    if isinstance(engine.sync_engine.pool, InstrumentedAsyncQueuePool):
+        _instrument_pool(engine, name, options["pool_size"] + max(options["max_overflow"], 0))
+    instrument_queries(engine, name)
+    return engine
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica until it writes.
+
+    With a replica_bind, plain SELECTs go to the replica. The first flush,
+    DML statement, SELECT ... FOR UPDATE or other statement pins the session
+    to the primary for the rest of its life, so it reads its own writes.
+    Without a replica_bind it is a plain Session on the primary.
+    """
+
+    def __init__(self, *args, replica_bind: Engine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def use_primary(self) -> None:
+        """Send every further statement to the primary"""
+        self.replica_bind = None
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self.replica_bind is not None:
+            if (
+                not self._flushing
+                and isinstance(clause, Select)
+                and clause._for_update_arg is None
+            ):
+                return self.replica_bind
+            self.use_primary()
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReplicaRouter:
+    """
+    Decides whether read-only sessions may use the read replica: only while
+    its replication lag is within max_lag_seconds. The lag is checked at
+    most every check_interval_seconds; a replica that does not answer within
+    that time (at least a second) counts as lagging.
+    """
+
+    def __init__(
+        self,
+        replica: AsyncEngine | None,
+        max_lag_seconds: float | None = None,
+        check_interval_seconds: float | None = None,
+    ):
+        self.replica = replica
+        self.max_lag = (
+            settings.DB_REPLICA_MAX_LAG_SECONDS if max_lag_seconds is None else max_lag_seconds
+        )
+        self.check_interval = (
+            settings.DB_REPLICA_LAG_CHECK_SECONDS
+            if check_interval_seconds is None
+            else check_interval_seconds
+        )
+        self._checked_at = float("-inf")
+        self._usable = False
+
+    async def replica_bind(self) -> Engine | None:
+        """The replica's bind for a new read-only session, or None to read from the primary"""
+        if self.replica is None:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            # Concurrent sessions keep the previous verdict while this check runs
+            self._checked_at = now
+            self._usable = await self._check()
+        return self.replica.sync_engine if self._usable else None
+
+    async def _check(self) -> bool:
+        try:
+            lag = await asyncio.wait_for(self._lag(), max(self.check_interval, 1.0))
+        except Exception as e:
+            logger.warning("Read replica unavailable, reading from the primary", error=str(e))
+            DB_REPLICA_LAG.set(float("inf"))
+            return False
+        DB_REPLICA_LAG.set(lag)
+        if lag > self.max_lag:
+            logger.warning("Read replica lagging, reading from the primary", lag_seconds=lag)
+            return False
+        return True
+
+    async def _lag(self) -> float:
+        async with self.replica.connect() as conn:
+            return (await conn.execute(REPLICA_LAG_QUERY)).scalar_one()
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.ENVIRONMENT == "development",
-    future=True,
+engine = build_engine()
+replica_engine = (
+    build_engine(settings.DATABASE_REPLICA_URL, name="replica")
+    if settings.DATABASE_REPLICA_URL
+    else None
 )
+replica_router = ReplicaRouter(replica_engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -34,3 +263,42 @@ async def get_db():
         finally:
             await session.close()
 
+
+_READ_SESSIONS = {
+    target: DB_READ_SESSIONS.labels(target=target) for target in ("primary", "replica")
+}
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only work: it reads from the replica while it is usable
+    (ReplicaRouter), else from the primary
+    """
+    replica_bind = await replica_router.replica_bind()
+    _READ_SESSIONS["primary" if replica_bind is None else "replica"].inc()
+    async with AsyncSessionLocal(replica_bind=replica_bind) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_read_db():
+    """Dependency for read-only endpoints (see read_session)"""
+    async with read_session() as session:
+        yield session
+
+
+async def read_one_or_none(session: AsyncSession, query, scalar: bool = True):
+    """
+    Run a single-row read. A miss on the replica, which may not have replayed
+    a write the caller just made, is retried on the primary.
+    """
+    result = await session.execute(query)
+    row = result.scalar_one_or_none() if scalar else result.one_or_none()
+    if row is None and getattr(session.sync_session, "replica_bind", None) is not None:
+        session.sync_session.use_primary()
+        result = await session.execute(query)
+        row = result.scalar_one_or_none() if scalar else result.one_or_none()
+    return row
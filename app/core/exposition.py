@@ -0,0 +1,79 @@
+"""Prometheus exposition for GET /metrics, single- or multi-process"""
+import os
+
+import structlog
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from prometheus_client.exposition import choose_encoder
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.metrics import WEBHOOK_QUEUE_DEPTH
+
+logger = structlog.get_logger()
+
+# Legacy RQ queue still drained by scripts/rq_worker.py
+RQ_WEBHOOK_QUEUE_KEY = "rq:queue:webhooks"
+
+_QUEUE_DEPTHS = {
+    queue: WEBHOOK_QUEUE_DEPTH.labels(queue=queue) for queue in ("stream", "pending", "rq")
+}
+
+
+def multiprocess_mode() -> bool:
+    """
+    Whether metrics are shared between worker processes. prometheus_client
+    reads PROMETHEUS_MULTIPROC_DIR when it is imported: each process then
+    writes its values to files in that directory (wipe it before starting
+    the workers).
+    """
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def _build_registry() -> CollectorRegistry:
+    if not multiprocess_mode():
+        return REGISTRY
+    # Aggregates the files of every process, live or dead, on each scrape
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+_registry = _build_registry()
+
+
+async def refresh_queue_depths(redis: Redis | None) -> None:
+    """Read the webhook backlog into webhook_queue_depth, in one pipelined round trip"""
+    if redis is None:
+        return
+    pipeline = redis.pipeline(transaction=False)
+    pipeline.xlen(settings.WEBHOOK_STREAM)
+    pipeline.xpending(settings.WEBHOOK_STREAM, settings.WEBHOOK_CONSUMER_GROUP)
+    pipeline.llen(RQ_WEBHOOK_QUEUE_KEY)
+    try:
+        stream, pending, rq = await pipeline.execute(raise_on_error=False)
+    except RedisError as e:
+        logger.warning("Webhook queue depth unavailable", error=str(e))
+        return
+    if isinstance(pending, Exception):
+        # No consumer group yet (NOGROUP): nothing can be pending
+        pending = {"pending": 0}
+    for queue, depth in (("stream", stream), ("pending", pending["pending"]), ("rq", rq)):
+        if not isinstance(depth, Exception):
+            _QUEUE_DEPTHS[queue].set(depth)
+
+
+async def render_metrics(accept: str | None, redis: Redis | None) -> tuple[bytes, str]:
+    """
+    Metrics in the format the scraper accepts (OpenMetrics or the Prometheus
+    text format) and its content type
+    """
+    await refresh_queue_depths(redis)
+    encoder, content_type = choose_encoder(accept)
+    return encoder(_registry), content_type
+
+
+def mark_process_dead() -> None:
+    """On worker exit: drop its live gauges (livesum/livemostrecent) from the aggregate"""
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
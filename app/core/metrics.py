@@ -0,0 +1,158 @@
+"""
+Prometheus metrics shared across the application.
+
+Served by GET /metrics (app/core/exposition.py). With several worker
+processes, PROMETHEUS_MULTIPROC_DIR must be set before they start: every
+gauge declares how its per-process values combine (multiprocess_mode).
+Hot paths bind their label sets once (module level or at construction)
+instead of calling .labels() per event.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+# Idempotency lookups answered by Redis (hit), Postgres (miss) or after a Redis failure (error)
+IDEMPOTENCY_CACHE_LOOKUPS = Counter(
+    "idempotency_cache_lookups",
+    "Idempotency key lookups by Redis cache outcome; hit rate = hit / (hit + miss)",
+    ["result"],
+)
+# Idempotent requests by how the key was resolved: claimed (processed), replayed (stored
+# response returned), conflict (key reused with a different body) or in_progress (gave up
+# waiting for the request holding the key)
+IDEMPOTENCY_REQUESTS = Counter(
+    "idempotency_requests",
+    "Requests carrying an idempotency key, by outcome",
+    ["outcome"],
+)
+
+# Retried webhook deliveries acknowledged without storing them again, by where the
+# notificationId was found (redis = fast path, postgres = unique index on insert)
+WEBHOOK_DUPLICATE_DELIVERIES = Counter(
+    "webhook_duplicate_deliveries",
+    "Duplicate Authorize.Net webhook deliveries (same notificationId) acknowledged",
+    ["source"],
+)
+
+# Webhook replay progress (scripts/replay_webhooks.py); throughput = rate(events_total)
+WEBHOOK_REPLAY_EVENTS = Counter(
+    "webhook_replay_events",
+    "Webhook events re-dispatched by the replay pipeline, by outcome",
+    ["outcome"],
+)
+
+# Authorize.Net API calls by operation and the response's resultCode (Ok or Error;
+# exception when no response was read, e.g. a connection error)
+GATEWAY_REQUEST_DURATION = Histogram(
+    "authorize_net_request_duration_seconds",
+    "Authorize.Net API call latency (render, round trip and parse)",
+    ["operation", "result_code"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10, 30),
+)
+
+# Authorize.Net connection pools (label pool=sync|async)
+GATEWAY_POOL_REQUESTS = Counter(
+    "authorize_net_pool_requests",
+    "Requests sent through the Authorize.Net connection pool",
+    ["pool"],
+)
+GATEWAY_POOL_CONNECTIONS_OPENED = Counter(
+    "authorize_net_pool_connections_opened",
+    "New TCP connections opened to Authorize.Net (requests minus this = reused)",
+    ["pool"],
+)
+GATEWAY_POOL_IN_FLIGHT = Gauge(
+    "authorize_net_pool_in_flight_requests",
+    "Requests currently holding an Authorize.Net connection",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+GATEWAY_POOL_UTILIZATION = Gauge(
+    "authorize_net_pool_utilization_ratio",
+    "In-flight requests divided by the pool size",
+    ["pool"],
+    multiprocess_mode="max",
+)
+
+# Database connection pools (label pool=primary, or the engine's name)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent getting a connection from the database pool (new connections included)",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS because the pool was exhausted",
+    ["pool"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_UTILIZATION = Gauge(
+    "db_pool_utilization_ratio",
+    "Checked-out connections divided by DB_POOL_SIZE + DB_MAX_OVERFLOW",
+    ["pool"],
+    multiprocess_mode="max",
+)
+
+# Read replica routing: lag measured by the last check, read-only sessions by where they read
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of the read replica at the last check (+Inf when unreachable)",
+    multiprocess_mode="max",
+)
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions",
+    "Read-only request sessions by the database they read from (replica or primary)",
+    ["target"],
+)
+
+# SQL statements by engine (label pool), and per HTTP request by route name (label endpoint)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Execution time of SQL statements, from sending to the result being read",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries",
+    "SQL statements that took at least DB_SLOW_QUERY_MS",
+    ["pool"],
+)
+DB_REQUEST_QUERIES = Histogram(
+    "db_request_queries",
+    "SQL statements issued per HTTP request",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100),
+)
+DB_REQUEST_SECONDS = Histogram(
+    "db_request_seconds",
+    "Time per HTTP request spent executing SQL statements",
+    ["endpoint"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# HTTP requests by route name (unmatched for 404s), method and status code
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, until the response has been sent",
+    ["endpoint", "method", "status"],
+    buckets=(0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Webhook pipeline: time from an event entering the stream to its batch being processed,
+# and backlog sizes read at scrape time (stream length, entries pending in the consumer
+# group, jobs left in the legacy RQ queue)
+WEBHOOK_PROCESSING_LAG = Histogram(
+    "webhook_processing_lag_seconds",
+    "Time from a webhook event being added to the stream to its batch being processed",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+WEBHOOK_QUEUE_DEPTH = Gauge(
+    "webhook_queue_depth",
+    "Webhook backlog at the last scrape: stream entries, pending entries, RQ jobs",
+    ["queue"],
+    multiprocess_mode="mostrecent",
+)
@@ -0,0 +1,118 @@
+"""SQL statement counts and timings, per engine and per request"""
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import (
+    DB_QUERY_DURATION,
+    DB_REQUEST_QUERIES,
+    DB_REQUEST_SECONDS,
+    DB_SLOW_QUERIES,
+)
+
+logger = structlog.get_logger()
+
+# Statements are cut to this many characters in slow query logs
+STATEMENT_LOG_CHARS = 1000
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while a track_queries() block was active"""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    # Every statement, in order (only with track_queries(record_statements=True))
+    statements: list[str] | None = None
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        if elapsed >= self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+# Trackers active in the current context, outermost first
+_trackers: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_trackers", default=())
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Collect the statements that instrumented engines execute in this context
+    (the current task, including SQLAlchemy's greenlets) until the block
+    exits. Blocks nest: outer trackers also count the inner block's statements.
+    """
+    stats = QueryStats(statements=[] if record_statements else None)
+    token = _trackers.set(_trackers.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _trackers.reset(token)
+
+
+# (db_request_queries, db_request_seconds) children by endpoint, bound on first use
+_request_metrics: dict[str, tuple] = {}
+
+
+def observe_request(endpoint: str, stats: QueryStats) -> None:
+    """Export one request's statement count and database time under its route name"""
+    metrics = _request_metrics.get(endpoint)
+    if metrics is None:
+        metrics = _request_metrics[endpoint] = (
+            DB_REQUEST_QUERIES.labels(endpoint=endpoint),
+            DB_REQUEST_SECONDS.labels(endpoint=endpoint),
+        )
+    metrics[0].observe(stats.count)
+    metrics[1].observe(stats.total_seconds)
+
+
+def instrument_queries(engine: AsyncEngine, name: str) -> None:
+    """
+    Time every statement the engine executes: db_query_duration_seconds
+    under pool=name, the active track_queries() blocks, and a warning log
+    (with the request's correlation ID) for statements reaching
+    DB_SLOW_QUERY_MS.
+    """
+    duration_metric = DB_QUERY_DURATION.labels(pool=name)
+    slow_metric = DB_SLOW_QUERIES.labels(pool=name)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        duration_metric.observe(elapsed)
+        for stats in _trackers.get():
+            stats.add(statement, elapsed)
+        if settings.DB_SLOW_QUERY_MS and elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+            slow_metric.inc()
+            logger.warning(
+                "Slow query",
+                pool=name,
+                duration_ms=round(elapsed * 1000, 1),
+                statement=statement[:STATEMENT_LOG_CHARS],
+                correlation_id=structlog.contextvars.get_contextvars().get("correlation_id"),
+            )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.execution_context is not None:
+            started = context.connection.info.get("query_started")
+            if started:
+                started.pop()
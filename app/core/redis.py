@@ -1,5 +1,6 @@
 """Redis connection utilities"""
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from rq import Queue
 
 from app.core.config import settings
@@ -9,6 +10,15 @@ def get_redis_client() -> Redis:
     return Redis.from_url(settings.REDIS_URL)
 
 
-def get_queue(name: str = "webhooks") -> Queue:
-    redis_client = get_redis_client()
-    return Queue(name, connection=redis_client)
+def get_queue(name: str = "webhooks", connection: Redis | None = None) -> Queue:
+    """RQ queue; pass a long-lived connection to reuse its pool across enqueues"""
+    return Queue(name, connection=connection or get_redis_client())
+
+
+def get_async_redis_client() -> AsyncRedis:
+    """Async client for the request path; the application keeps one per process"""
+    return AsyncRedis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    )
@@ -1,13 +1,20 @@
 """FastAPI application entry point"""
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from redis.asyncio import Redis
 
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient
+from app.api.v1.dependencies import get_redis
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import AsyncSessionLocal, engine, Base
+from app.core.exposition import mark_process_dead, render_metrics
+from app.core.redis import get_async_redis_client
 from app.middleware.correlation import CorrelationIdMiddleware
 from app.middleware.error_handler import ErrorHandlerMiddleware
 from app.api.v1.routes import payments, transactions, webhooks
+from app.services.webhook_ingestion_service import WebhookIngestor
+from app.utils.authorize_net_webhook import WebhookSignatureVerifier
 from app.utils.logging import setup_logging
 
 
@@ -19,9 +26,24 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         # Create tables (in production, use migrations)
         await conn.run_sync(Base.metadata.create_all)
+    # One gateway client per process: merchant auth, endpoint and pools are built once
+    app.state.authorize_net_client = AsyncAuthorizeNetClient()
+    # Shared Redis connection pool (idempotency cache)
+    app.state.redis = get_async_redis_client()
+    # Webhook events are stored and added to the webhook stream in micro-batches
+    app.state.webhook_ingestor = WebhookIngestor(AsyncSessionLocal, app.state.redis)
+    # Webhook signature keys are decoded once (current key first, then rotated-out keys)
+    app.state.webhook_verifier = WebhookSignatureVerifier(
+        [settings.AUTHORIZE_NET_WEBHOOK_SECRET]
+        + settings.AUTHORIZE_NET_WEBHOOK_PREVIOUS_SECRETS.split(",")
+    )
     yield
     # Shutdown
+    await app.state.webhook_ingestor.aclose()
+    await app.state.authorize_net_client.aclose()
+    await app.state.redis.aclose()
     await engine.dispose()
+    mark_process_dead()
 
 
 app = FastAPI(
@@ -58,3 +80,9 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request, redis: Redis | None = Depends(get_redis)):
+    """Prometheus metrics (of every worker process with PROMETHEUS_MULTIPROC_DIR set)"""
+    body, content_type = await render_metrics(request.headers.get("accept"), redis)
+    return Response(body, media_type=content_type)
@@ -1,49 +1,113 @@
 """Correlation ID middleware for request tracing"""
+import time
 import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
+from prometheus_client import Histogram
+
+from app.core.metrics import HTTP_REQUEST_DURATION
+from app.core.query_stats import observe_request, track_queries
 
 logger = structlog.get_logger()
 
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+# http_request_duration_seconds children by (endpoint, method, status), bound on first use
+_request_durations: dict[tuple[str, str, int], Histogram] = {}
+
+
+def _request_duration(endpoint: str, method: str, status_code: int) -> Histogram:
+    if method not in HTTP_METHODS:
+        method = "OTHER"
+    key = (endpoint, method, status_code)
+    metric = _request_durations.get(key)
+    if metric is None:
+        metric = _request_durations[key] = HTTP_REQUEST_DURATION.labels(
+            endpoint=endpoint, method=method, status=str(status_code)
+        )
+    return metric
+
+
+class CorrelationIdMiddleware:
+    """
+    Middleware to add correlation ID to requests and responses.
+
+    Pure ASGI: the request runs in the caller's task and the response is
+    passed through as it is sent (only the start message gets the header),
+    so streaming responses are not buffered.
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
-    """Middleware to add correlation ID to requests and responses"""
+    The SQL statements the request runs are counted and timed
+    (track_queries): the completion log carries the count, the database
+    time and the slowest statement's duration, and the db_request_*
+    metrics record them under the route name (e.g. list_transactions).
+    The request's latency goes to http_request_duration_seconds; a request
+    that raises before responding counts as the 500 ErrorHandlerMiddleware
+    answers with.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         # Get correlation ID from header or generate new one
-        correlation_id = request.headers.get("X-Correlation-ID")
+        correlation_id = Headers(scope=scope).get("X-Correlation-ID")
         if not correlation_id:
             correlation_id = str(uuid.uuid4())
 
         # Add to request state
-        request.state.correlation_id = correlation_id
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
 
         # Bind logger with correlation ID
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(correlation_id=correlation_id)
 
+        method, path = scope["method"], scope["path"]
         logger.info(
             "Request started",
-            method=request.method,
-            path=request.url.path,
+            method=method,
+            path=path,
             correlation_id=correlation_id,
         )
 
-        # Process request
-        response: Response = await call_next(request)
+        status_code = None
 
-        # Add correlation ID to response headers
-        response.headers["X-Correlation-ID"] = correlation_id
+        async def send_with_correlation_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add correlation ID to response headers
+                MutableHeaders(scope=message)["X-Correlation-ID"] = correlation_id
+            await send(message)
+
+        # Process request
+        started = time.perf_counter()
+        try:
+            with track_queries() as queries:
+                await self.app(scope, receive, send_with_correlation_id)
+        except Exception:
+            status_code = status_code or 500
+            raise
+        finally:
+            # Set by the router; route names, unlike raw paths, keep the label set bounded
+            endpoint = getattr(scope.get("route"), "name", "unmatched")
+            # No response at all: the request was cancelled (client gone), nginx's 499
+            _request_duration(endpoint, method, status_code or 499).observe(
+                time.perf_counter() - started
+            )
+            observe_request(endpoint, queries)
 
         logger.info(
             "Request completed",
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
+            method=method,
+            path=path,
+            status_code=status_code,
             correlation_id=correlation_id,
+            db_queries=queries.count,
+            db_time_ms=round(queries.total_seconds * 1000, 2),
+            db_slowest_ms=round(queries.slowest_seconds * 1000, 2),
         )
-
-        return response
-
@@ -1,22 +1,49 @@
 """Global error handler middleware"""
-from fastapi import Request, status
+from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
 logger = structlog.get_logger()
 
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle errors globally"""
+class ErrorHandlerMiddleware:
+    """
+    Middleware to handle errors globally.
+
+    Pure ASGI. An exception raised before the response has started is turned
+    into the JSON error envelope; once the response has started it can no
+    longer be replaced, and the exception propagates.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
-            return response
-        except RequestValidationError as exc:
-            correlation_id = getattr(request.state, "correlation_id", None)
+            await self.app(scope, receive, send_tracking_start)
+        except Exception as exc:
+            if response_started:
+                raise
+            response = self._error_response(exc, scope.get("state", {}).get("correlation_id"))
+            await response(scope, receive, send)
+
+    @staticmethod
+    def _error_response(exc: Exception, correlation_id: str | None) -> JSONResponse:
+        if isinstance(exc, RequestValidationError):
             logger.error(
                 "Validation error",
                 errors=exc.errors(),
@@ -30,18 +57,15 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
                     "correlation_id": correlation_id,
                 },
             )
-        except Exception as exc:
-            correlation_id = getattr(request.state, "correlation_id", None)
-            logger.exception(
-                "Unhandled exception",
-                error=str(exc),
-                correlation_id=correlation_id,
-            )
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "error": "Internal server error",
-                    "correlation_id": correlation_id,
-                },
-            )
-
+        logger.exception(
+            "Unhandled exception",
+            error=str(exc),
+            correlation_id=correlation_id,
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "error": "Internal server error",
+                "correlation_id": correlation_id,
+            },
+        )
@@ -17,7 +17,11 @@ class IdempotencyKey(Base):
     request_hash = Column(String, nullable=False)
     response_body = Column(JSONB, nullable=True)
     status_code = Column(Integer, nullable=True)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    # Set while the first request holding the key is still processing (status_code is NULL)
+    locked_until = Column(DateTime, nullable=True)
+    # Owner of the in-flight reservation: only its holder may renew, store or release it
+    lease_token = Column(UUID(as_uuid=True), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     @classmethod
@@ -2,7 +2,16 @@
 from datetime import datetime
 from uuid import uuid4
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, Enum as SQLEnum
+from sqlalchemy import (
+    Column,
+    String,
+    DateTime,
+    Integer,
+    Numeric,
+    ForeignKey,
+    Index,
+    Enum as SQLEnum,
+)
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -30,6 +39,54 @@ class TransactionStatus(str, PyEnum):
     FAILED = "failed"
 
 
+# Transitions: status -> statuses it may be reached from. Statuses only move
+# forward, so a late or replayed gateway event can never undo a later one
+# (e.g. authorization.created arriving after the capture or the refund).
+# A refund or void may be seen before the events leading up to it.
+STATUS_PREDECESSORS: dict[TransactionStatus, frozenset[TransactionStatus]] = {
+    TransactionStatus.PENDING: frozenset(),
+    TransactionStatus.AUTHORIZED: frozenset({TransactionStatus.PENDING}),
+    TransactionStatus.CAPTURED: frozenset(
+        {TransactionStatus.PENDING, TransactionStatus.AUTHORIZED}
+    ),
+    TransactionStatus.VOIDED: frozenset(
+        {TransactionStatus.PENDING, TransactionStatus.AUTHORIZED, TransactionStatus.CAPTURED}
+    ),
+    TransactionStatus.REFUNDED: frozenset(
+        {TransactionStatus.PENDING, TransactionStatus.AUTHORIZED, TransactionStatus.CAPTURED}
+    ),
+    TransactionStatus.FAILED: frozenset({TransactionStatus.PENDING}),
+}
+
+
+def can_transition(current: TransactionStatus, new: TransactionStatus) -> bool:
+    return current in STATUS_PREDECESSORS[new]
+
+
+# Columns returned by the transaction listing besides the (created_at, id) keyset
+LISTING_COLUMNS = (
+    "payment_id",
+    "transaction_type",
+    "status",
+    "amount",
+    "currency",
+    "customer_id",
+    "authorize_net_transaction_id",
+    "updated_at",
+)
+
+
+def listing_index(name: str, *filter_columns: str) -> Index:
+    """Composite (filter..., created_at, id) index that INCLUDEs the other listed columns"""
+    return Index(
+        name,
+        *filter_columns,
+        "created_at",
+        "id",
+        postgresql_include=[c for c in LISTING_COLUMNS if c not in filter_columns],
+    )
+
+
 class Transaction(Base):
     """Transaction model"""
 
@@ -37,18 +94,20 @@ class Transaction(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     payment_id = Column(UUID(as_uuid=True), ForeignKey("payments.id"), nullable=False)
-    transaction_type = Column(
-        SQLEnum(TransactionType), nullable=False, index=True
-    )
-    status = Column(SQLEnum(TransactionStatus), nullable=False, index=True)
+    transaction_type = Column(SQLEnum(TransactionType), nullable=False)
+    status = Column(SQLEnum(TransactionStatus), nullable=False)
     authorize_net_transaction_id = Column(String, nullable=True, index=True)
     amount = Column(Numeric(10, 2), nullable=False)
     currency = Column(String(3), default="USD", nullable=False)
-    customer_id = Column(String, nullable=True, index=True)
+    customer_id = Column(String, nullable=True)
     customer_email = Column(String, nullable=True)
     correlation_id = Column(String, nullable=True, index=True)
     extra_data = Column("metadata", JSONB, nullable=True)  # Database column named 'metadata', Python attribute 'extra_data'
     error_message = Column(String, nullable=True)
+    # Bumped on every status change; status_event_at is when the gateway event
+    # behind the current status happened (NULL if set by the API flow)
+    status_version = Column(Integer, default=0, server_default="0", nullable=False)
+    status_event_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -57,3 +116,11 @@ class Transaction(Base):
     # Relationships
     payment = relationship("Payment", back_populates="transactions")
 
+    # Keyset listing: (filter, created_at, id) keys, covering the listed columns
+    # so dashboard scans are index-only (see migrations/versions/0001_*)
+    __table_args__ = (
+        listing_index("ix_transactions_created_at_id"),
+        listing_index("ix_transactions_status_created_at_id", "status"),
+        listing_index("ix_transactions_transaction_type_created_at_id", "transaction_type"),
+        listing_index("ix_transactions_customer_id_created_at_id", "customer_id"),
+    )
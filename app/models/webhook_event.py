@@ -1,7 +1,7 @@
 """Webhook event model"""
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import Column, String, DateTime, Boolean
+from sqlalchemy import Column, String, DateTime, Boolean, Index, Integer, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.core.database import Base
@@ -13,6 +13,8 @@ class WebhookEvent(Base):
     __tablename__ = "webhook_events"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    # Authorize.Net notificationId, the same on every retry of a delivery
+    notification_id = Column(String, nullable=True, unique=True)
     event_type = Column(String, nullable=False, index=True)
     authorize_net_transaction_id = Column(String, nullable=True, index=True)
     raw_payload = Column(JSONB, nullable=False)
@@ -21,4 +23,19 @@ class WebhookEvent(Base):
     error_message = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     processed_at = Column(DateTime, nullable=True)
+    # Failed events are retried by the replay pipeline (scripts/replay_webhooks.py)
+    # from next_attempt_at, with exponential backoff, until dead-lettered
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at = Column(DateTime, nullable=True)
+    dead_lettered_at = Column(DateTime, nullable=True)
+
+    # Keyset scans of replay candidates only touch events still to be processed
+    __table_args__ = (
+        Index(
+            "ix_webhook_events_replay",
+            "created_at",
+            "id",
+            postgresql_where=text("NOT processed AND dead_lettered_at IS NULL"),
+        ),
+    )
 
@@ -1,11 +1,89 @@
 """Payment repository for database operations"""
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import (
+    DateTime,
+    bindparam,
+    case,
+    column,
+    false,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.orm import selectinload
 
+from app.core.database import read_one_or_none
 from app.models.payment import Payment
-from app.models.transaction import Transaction, TransactionType, TransactionStatus
+from app.models.transaction import (
+    STATUS_PREDECESSORS,
+    Transaction,
+    TransactionType,
+    TransactionStatus,
+)
+
+# Projection for listings; every column is served by the covering listing indexes
+TRANSACTION_LISTING_COLUMNS = (
+    Transaction.id,
+    Transaction.payment_id,
+    Transaction.transaction_type,
+    Transaction.status,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.customer_id,
+    Transaction.authorize_net_transaction_id,
+    Transaction.created_at,
+    Transaction.updated_at,
+)
+
+TRANSACTION_EXPORT_COLUMNS = TRANSACTION_LISTING_COLUMNS + (
+    Transaction.customer_email,
+    Transaction.correlation_id,
+    Transaction.error_message,
+)
+
+
+def _utc_now():
+    """
+    Database clock at the start of the statement, as the naive UTC timestamp
+    the DateTime columns hold (statement time rather than now(), which is the
+    transaction's start and may precede rows created earlier in it)
+    """
+    return func.timezone("UTC", func.statement_timestamp())
+
+
+def _merge_extra_data(patch):
+    """metadata || patch; a missing or JSON null metadata counts as an empty object"""
+    current = func.coalesce(func.nullif(Transaction.extra_data, literal(None, JSONB)), literal({}, JSONB))
+    return current.op("||")(patch)
+
+
+def _filter_transactions(
+    query,
+    status: TransactionStatus | None,
+    transaction_type: TransactionType | None,
+    customer_id: str | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+):
+    """Apply the listing/export filters (created_to is exclusive)"""
+    if status is not None:
+        query = query.where(Transaction.status == status)
+    if transaction_type is not None:
+        query = query.where(Transaction.transaction_type == transaction_type)
+    if customer_id is not None:
+        query = query.where(Transaction.customer_id == customer_id)
+    if created_from is not None:
+        query = query.where(Transaction.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Transaction.created_at < created_to)
+    return query
 
 
 class PaymentRepository:
@@ -57,52 +135,244 @@ class PaymentRepository:
         await self.session.flush()
         return transaction
 
-    async def get_transaction_by_id(self, transaction_id: UUID) -> Transaction | None:
-        """Get transaction by ID"""
-        result = await self.session.execute(
-            select(Transaction)
-            .where(Transaction.id == transaction_id)
-            .options(selectinload(Transaction.payment))
-        )
-        return result.scalar_one_or_none()
+    async def get_transaction_by_id(
+        self, transaction_id: UUID, with_payment: bool = False
+    ) -> Transaction | None:
+        """Get transaction by ID (with_payment also loads its payment, one more query)"""
+        query = select(Transaction).where(Transaction.id == transaction_id)
+        if with_payment:
+            query = query.options(selectinload(Transaction.payment))
+        return await read_one_or_none(self.session, query)
 
     async def update_transaction_status(
         self,
-        transaction_id: UUID,
+        transaction: Transaction | UUID,
         status: TransactionStatus,
         authorize_net_transaction_id: str | None = None,
         error_message: str | None = None,
         extra_data: dict | None = None,
     ) -> Transaction | None:
-        """Update transaction status"""
-        transaction = await self.get_transaction_by_id(transaction_id)
-        if transaction:
-            transaction.status = status
-            if authorize_net_transaction_id:
-                transaction.authorize_net_transaction_id = authorize_net_transaction_id
-            if error_message:
-                transaction.error_message = error_message
-            if extra_data:
-                existing = transaction.extra_data or {}
-                existing.update(extra_data)
-                transaction.extra_data = existing
-            await self.session.flush()
-        return transaction
+        """
+        Update a transaction, given as an already-loaded instance or by ID, with
+        one UPDATE ... RETURNING: no read first. status_version is bumped only
+        when the status changes and extra_data is merged into the metadata
+        column. A loaded instance is refreshed from the returned row.
+        Returns the transaction, or None when no row has that ID.
+        """
+        transaction_id = transaction.id if isinstance(transaction, Transaction) else transaction
+        values = {
+            "status": status,
+            "status_version": case(
+                (Transaction.status != status, Transaction.status_version + 1),
+                else_=Transaction.status_version,
+            ),
+            "updated_at": _utc_now(),
+        }
+        if authorize_net_transaction_id:
+            values["authorize_net_transaction_id"] = authorize_net_transaction_id
+        if error_message:
+            values["error_message"] = error_message
+        if extra_data:
+            values["extra_data"] = _merge_extra_data(
+                bindparam("extra_data_patch", extra_data, type_=JSONB)
+            )
+        result = await self.session.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction_id)
+            .values(**values)
+            .returning(Transaction)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return result.scalar_one_or_none()
 
     async def get_transaction_by_authorize_net_id(self, auth_net_transaction_id: str) -> Transaction | None:
         """Get transaction by Authorize.Net transaction ID"""
-        result = await self.session.execute(
-            select(Transaction)
-            .where(Transaction.authorize_net_transaction_id == auth_net_transaction_id)
-            .options(selectinload(Transaction.payment))
+        return await read_one_or_none(
+            self.session,
+            select(Transaction).where(
+                Transaction.authorize_net_transaction_id == auth_net_transaction_id
+            ),
         )
-        return result.scalar_one_or_none()
 
     async def get_payment_by_id(self, payment_id: UUID) -> Payment | None:
         """Get payment by ID with transactions"""
-        result = await self.session.execute(
+        return await read_one_or_none(
+            self.session,
             select(Payment)
             .where(Payment.id == payment_id)
-            .options(selectinload(Payment.transactions))
+            .options(selectinload(Payment.transactions)),
         )
-        return result.scalar_one_or_none()
+
+    async def get_transaction_states(self, authorize_net_transaction_ids: list[str]) -> list:
+        """
+        Bulk-load (id, authorize_net_transaction_id, status, amount) rows for a
+        set of Authorize.Net transaction IDs in a single query.
+        """
+        if not authorize_net_transaction_ids:
+            return []
+        result = await self.session.execute(
+            select(
+                Transaction.id,
+                Transaction.authorize_net_transaction_id,
+                Transaction.status,
+                Transaction.amount,
+            ).where(Transaction.authorize_net_transaction_id.in_(authorize_net_transaction_ids))
+        )
+        return result.all()
+
+    async def bulk_update_status(
+        self,
+        transaction_ids: list[UUID],
+        from_status: TransactionStatus,
+        to_status: TransactionStatus,
+        extra_data: dict | None = None,
+    ) -> int:
+        """
+        Move every listed transaction that is still in from_status to to_status
+        with one set-based UPDATE, merging extra_data into the metadata column.
+        Rows changed concurrently no longer match and are left alone.
+        Returns the number of rows updated.
+        """
+        if not transaction_ids:
+            return 0
+        values = {
+            "status": to_status,
+            "status_version": Transaction.status_version + 1,
+            "updated_at": _utc_now(),
+        }
+        if extra_data:
+            values["extra_data"] = _merge_extra_data(
+                bindparam("extra_data_patch", extra_data, type_=JSONB)
+            )
+        result = await self.session.execute(
+            update(Transaction)
+            .where(Transaction.id.in_(transaction_ids), Transaction.status == from_status)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def bulk_transition_status(
+        self, updates: Sequence[tuple[UUID, TransactionStatus, datetime, dict]]
+    ) -> list[UUID]:
+        """
+        Apply (transaction_id, status, event_at, extra_data) updates with one
+        UPDATE ... FROM (VALUES ...), each only if the transaction may move
+        from its current status to the new one (STATUS_PREDECESSORS), merging
+        extra_data into the metadata column. The check is part of the UPDATE,
+        so concurrent writers need no explicit row locks: Postgres re-checks a
+        row changed meanwhile against its new status. Returns the IDs of the
+        transactions updated.
+        """
+        if not updates:
+            return []
+        rows = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("status", Transaction.status.type),
+            column("event_at", DateTime),
+            column("extra_data_patch", JSONB),
+            name="status_updates",
+        ).data(sorted(updates, key=lambda row: row[0]))
+        # A predicate on the target row alone: when a concurrent update commits
+        # first, Postgres re-evaluates it against the row's new status (a join
+        # on a transitions table would be re-checked against the joined row
+        # matched for the old status and drop valid transitions)
+        allowed = case(
+            *[
+                (
+                    rows.c.status == status,
+                    Transaction.status.in_(predecessors) if predecessors else false(),
+                )
+                for status, predecessors in STATUS_PREDECESSORS.items()
+            ],
+            else_=false(),
+        )
+        result = await self.session.execute(
+            update(Transaction)
+            .where(Transaction.id == rows.c.id, allowed)
+            .values(
+                status=rows.c.status,
+                status_version=Transaction.status_version + 1,
+                status_event_at=rows.c.event_at,
+                extra_data=_merge_extra_data(rows.c.extra_data_patch),
+                updated_at=_utc_now(),
+            )
+            .returning(Transaction.id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.scalars())
+
+    async def get_transaction_summary(self, transaction_id: UUID):
+        """Get the listing columns of one transaction (no ORM object, no payment load)"""
+        return await read_one_or_none(
+            self.session,
+            select(*TRANSACTION_LISTING_COLUMNS).where(Transaction.id == transaction_id),
+            scalar=False,
+        )
+
+    async def list_transactions(
+        self,
+        limit: int,
+        status: TransactionStatus | None = None,
+        transaction_type: TransactionType | None = None,
+        customer_id: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list:
+        """
+        List transactions newest first, keyset-paginated on (created_at, id).
+
+        after is the (created_at, id) of the last row of the previous page;
+        rows strictly older than it are returned. created_to is exclusive.
+        """
+        query = _filter_transactions(
+            select(*TRANSACTION_LISTING_COLUMNS),
+            status,
+            transaction_type,
+            customer_id,
+            created_from,
+            created_to,
+        )
+        if after is not None:
+            query = query.where(tuple_(Transaction.created_at, Transaction.id) < tuple_(*after))
+        query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def stream_transactions(
+        self,
+        batch_size: int,
+        status: TransactionStatus | None = None,
+        transaction_type: TransactionType | None = None,
+        customer_id: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> AsyncIterator[Sequence]:
+        """
+        Yield export rows oldest first, batch_size rows at a time, from a
+        server-side cursor; only one batch is held in memory.
+
+        after is the (created_at, id) of the last row already received;
+        rows strictly newer than it are returned.
+        """
+        query = _filter_transactions(
+            select(*TRANSACTION_EXPORT_COLUMNS),
+            status,
+            transaction_type,
+            customer_id,
+            created_from,
+            created_to,
+        )
+        if after is not None:
+            query = query.where(tuple_(Transaction.created_at, Transaction.id) > tuple_(*after))
+        query = query.order_by(Transaction.created_at, Transaction.id).execution_options(
+            yield_per=batch_size
+        )
+        result = await self.session.stream(query)
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
@@ -1,10 +1,22 @@
 """Repository for webhook event persistence"""
+from collections.abc import Sequence
 from datetime import datetime
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import DateTime, String, cast, column, or_, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
+from app.core.database import read_one_or_none
 from app.models.webhook_event import WebhookEvent
 
+UNPROCESSED_COLUMNS = (
+    WebhookEvent.id,
+    WebhookEvent.raw_payload,
+    WebhookEvent.correlation_id,
+    WebhookEvent.created_at,
+    WebhookEvent.attempts,
+)
+
 
 class WebhookRepository:
     """Repository to store and update webhook events"""
@@ -36,8 +48,86 @@ class WebhookRepository:
         event.processed_at = datetime.utcnow()
         await self.session.flush()
 
-    async def get_by_id(self, event_id) -> WebhookEvent | None:
+    async def bulk_mark_processed(
+        self,
+        outcomes: Sequence[tuple[UUID, str | None, datetime | None, datetime | None]],
+        processed_at: datetime | None = None,
+    ) -> int:
+        """
+        Record one processing attempt per event with one UPDATE ... FROM
+        (VALUES ...). outcomes are (event_id, error_message, next_attempt_at,
+        dead_lettered_at); an event without error_message is processed.
+        """
+        if not outcomes:
+            return 0
+        rows = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("error_message", String),
+            column("next_attempt_at", DateTime),
+            column("dead_lettered_at", DateTime),
+            name="event_results",
+        ).data(list(outcomes))
+        result = await self.session.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == rows.c.id)
+            .values(
+                processed=rows.c.error_message.is_(None),
+                error_message=rows.c.error_message,
+                processed_at=processed_at or datetime.utcnow(),
+                attempts=WebhookEvent.attempts + 1,
+                # Cast: a VALUES column holding only NULLs is typed as text
+                next_attempt_at=cast(rows.c.next_attempt_at, DateTime),
+                dead_lettered_at=cast(rows.c.dead_lettered_at, DateTime),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def list_replayable(
+        self,
+        limit: int,
+        created_before: datetime,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list:
+        """
+        (id, created_at) of events to replay, oldest first, keyset-paginated on
+        (created_at, id): not processed, not dead-lettered, due for their next
+        attempt and created before created_before. after is the (created_at, id)
+        of the last row of the previous page.
+        """
+        query = select(WebhookEvent.id, WebhookEvent.created_at).where(
+            WebhookEvent.processed.is_(False),
+            WebhookEvent.dead_lettered_at.is_(None),
+            or_(
+                WebhookEvent.next_attempt_at.is_(None),
+                WebhookEvent.next_attempt_at <= datetime.utcnow(),
+            ),
+            WebhookEvent.created_at < created_before,
+        )
+        if after is not None:
+            query = query.where(tuple_(WebhookEvent.created_at, WebhookEvent.id) > tuple_(*after))
+        result = await self.session.execute(
+            query.order_by(WebhookEvent.created_at, WebhookEvent.id).limit(limit)
+        )
+        return result.all()
+
+    async def lock_unprocessed(self, event_ids: Sequence[UUID]) -> list:
+        """
+        Lock the listed events that are not processed yet, oldest first, as
+        (id, raw_payload, correlation_id, created_at, attempts) rows. Events locked by another
+        processor are skipped.
+        """
+        if not event_ids:
+            return []
         result = await self.session.execute(
-            select(WebhookEvent).where(WebhookEvent.id == event_id)
+            select(*UNPROCESSED_COLUMNS)
+            .where(WebhookEvent.id.in_(event_ids), WebhookEvent.processed.is_(False))
+            .order_by(WebhookEvent.created_at, WebhookEvent.id)
+            .with_for_update(skip_locked=True)
+        )
+        return result.all()
+
+    async def get_by_id(self, event_id) -> WebhookEvent | None:
+        return await read_one_or_none(
+            self.session, select(WebhookEvent).where(WebhookEvent.id == event_id)
         )
-        return result.scalar_one_or_none()
@@ -0,0 +1,129 @@
+"""Service for streaming transaction exports"""
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from uuid import UUID
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.transaction import TransactionStatus, TransactionType
+from app.repositories.payment_repository import PaymentRepository
+from app.utils.pagination import encode_cursor
+
+logger = structlog.get_logger()
+
+EXPORT_NDJSON = "ndjson"
+EXPORT_CSV = "csv"
+
+EXPORT_MEDIA_TYPES = {
+    EXPORT_NDJSON: "application/x-ndjson",
+    EXPORT_CSV: "text/csv; charset=utf-8",
+}
+
+# Output columns, in order. "cursor" resumes the export after that row.
+EXPORT_FIELDS = (
+    "id",
+    "payment_id",
+    "transaction_type",
+    "status",
+    "amount",
+    "currency",
+    "customer_id",
+    "customer_email",
+    "authorize_net_transaction_id",
+    "correlation_id",
+    "error_message",
+    "created_at",
+    "updated_at",
+    "cursor",
+)
+
+
+def _record(row) -> list:
+    """Export values of one row as JSON/CSV-ready scalars, in EXPORT_FIELDS order"""
+    return [
+        str(row.id),
+        str(row.payment_id),
+        row.transaction_type.value,
+        row.status.value,
+        str(row.amount),
+        row.currency,
+        row.customer_id,
+        row.customer_email,
+        row.authorize_net_transaction_id,
+        row.correlation_id,
+        row.error_message,
+        row.created_at.isoformat(),
+        row.updated_at.isoformat(),
+        encode_cursor(row.created_at, row.id),
+    ]
+
+
+class TransactionExportService:
+    """
+    Streams transactions as NDJSON or CSV.
+
+    Rows come oldest first from a server-side cursor, EXPORT_BATCH_SIZE at a
+    time, and each batch is encoded into one chunk before the next is
+    fetched, so memory does not grow with the size of the export. Every row
+    carries a cursor; passing the last one received resumes the export
+    right after it.
+    """
+
+    def __init__(self, session: AsyncSession, batch_size: int | None = None):
+        self.repository = PaymentRepository(session)
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    async def stream(
+        self,
+        export_format: str,
+        status: TransactionStatus | None = None,
+        transaction_type: TransactionType | None = None,
+        customer_id: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield the encoded export, one chunk per fetched batch"""
+        encode = self._csv if export_format == EXPORT_CSV else self._ndjson
+        if export_format == EXPORT_CSV:
+            yield self._csv([EXPORT_FIELDS])
+
+        rows = 0
+        batches = self.repository.stream_transactions(
+            self.batch_size,
+            status=status,
+            transaction_type=transaction_type,
+            customer_id=customer_id,
+            created_from=created_from,
+            created_to=created_to,
+            after=after,
+        )
+        try:
+            async for batch in batches:
+                rows += len(batch)
+                yield encode([_record(row) for row in batch])
+        except Exception as e:
+            # Headers are already sent; the client resumes from the last cursor it got
+            logger.error("Transaction export aborted", rows=rows, error=str(e), exc_info=True)
+            raise
+        finally:
+            await batches.aclose()
+        logger.info("Transaction export finished", rows=rows, format=export_format)
+
+    @staticmethod
+    def _ndjson(records: list[list]) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, record)), separators=(",", ":")) + "\n"
+            for record in records
+        ).encode("utf-8")
+
+    @staticmethod
+    def _csv(records: list) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(records)
+        return buffer.getvalue().encode("utf-8")
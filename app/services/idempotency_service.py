@@ -1,48 +1,193 @@
 """Idempotency service for ensuring idempotent operations"""
+import asyncio
 import hashlib
 import json
-from typing import Optional
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Callable, Optional
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
+from app.core.config import settings
+from app.core.metrics import IDEMPOTENCY_CACHE_LOOKUPS, IDEMPOTENCY_REQUESTS
 from app.models.idempotency import IdempotencyKey
 import structlog
 
 logger = structlog.get_logger()
 
+REDIS_KEY_PREFIX = "idempotency:"
+
+# Backoff between polls while a duplicate waits for the request holding the key
+POLL_INITIAL_SECONDS = 0.05
+POLL_MAX_SECONDS = 0.5
+
+_CACHE_LOOKUPS = {
+    result: IDEMPOTENCY_CACHE_LOOKUPS.labels(result=result) for result in ("hit", "miss", "error")
+}
+_REQUESTS = {
+    outcome: IDEMPOTENCY_REQUESTS.labels(outcome=outcome)
+    for outcome in ("claimed", "replayed", "conflict", "in_progress")
+}
+
+
+def fingerprint_request(method: str, path: str, body: bytes) -> str:
+    """
+    Hash identifying a request for idempotency: method, path (which carries
+    the transaction ID for capture/refund/void) and the body exactly as the
+    client sent it, in one pass and without decoding it.
+    """
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def legacy_request_hash(request_body: dict) -> str:
+    """
+    Hash stored before fingerprint_request: the request model's fields
+    (plus the path's transaction_id) as sorted JSON. Keys stored under it are
+    still honoured until they expire, 24h after the deploy that switched
+    formats; drop it, and the legacy_hash arguments, after that.
+    """
+    request_str = json.dumps(request_body, sort_keys=True, default=str)
+    return hashlib.sha256(request_str.encode()).hexdigest()
+
+
+class IdempotencyInProgressError(ValueError):
+    """The request holding the key did not finish within the wait timeout"""
+
 
 class IdempotencyService:
-    """Service for handling idempotency keys"""
+    """
+    Service for handling idempotency keys.
+
+    Postgres (idempotency_keys) is the source of truth. When a Redis client
+    is given, it holds a copy of each stored key (request hash, status code,
+    response body) that expires together with the row: lookups read through
+    Redis and fall back to Postgres on a miss (refilling the cache), and
+    stores write to both. Redis errors only cost the fast path.
+
+    Concurrent duplicates are collapsed by reserve_idempotency: the first
+    request inserts a placeholder row (status_code NULL) holding a lease, and
+    the others wait for its response instead of running the operation again.
+    A lease left behind by a crashed worker is taken over once it lapses.
+    The reservation carries an owner token: only the request holding it can
+    renew the lease (hold_lease), store the response or release the key, so
+    a request that lost its lease cannot overwrite the new holder's result.
+    """
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, redis: Redis | None = None):
         self.session = session
+        self.redis = redis
+        # Owner token of the reservation this request holds, if any
+        self.lease_token: UUID | None = None
+
+    async def _cache_get(self, idempotency_key: str) -> Optional[dict]:
+        """Cached entry for the key, or None on a miss or Redis failure"""
+        if self.redis is None:
+            return None
+        try:
+            cached = await self.redis.get(REDIS_KEY_PREFIX + idempotency_key)
+        except RedisError as e:
+            _CACHE_LOOKUPS["error"].inc()
+            logger.warning("Idempotency cache read failed", error=str(e))
+            return None
+        _CACHE_LOOKUPS["hit" if cached is not None else "miss"].inc()
+        return json.loads(cached) if cached is not None else None
+
+    async def _cache_set(
+        self,
+        idempotency_key: str,
+        request_hash: str,
+        response_body: Optional[dict],
+        status_code: Optional[int],
+        expires_at: datetime,
+    ) -> None:
+        """Cache an entry until the row's expires_at"""
+        if self.redis is None:
+            return
+        ttl_ms = int((expires_at - datetime.utcnow()).total_seconds() * 1000)
+        if ttl_ms <= 0:
+            return
+        entry = json.dumps(
+            {
+                "request_hash": request_hash,
+                "response_body": response_body,
+                "status_code": status_code,
+            },
+            separators=(",", ":"),
+        )
+        try:
+            await self.redis.set(REDIS_KEY_PREFIX + idempotency_key, entry, px=ttl_ms)
+        except RedisError as e:
+            logger.warning("Idempotency cache write failed", error=str(e))
+
+    def _replay(
+        self,
+        idempotency_key: str,
+        request_hash: str,
+        stored_hash: str,
+        response_body: Optional[dict],
+        status_code: Optional[int],
+        legacy_hash: Optional[Callable[[], str]] = None,
+    ) -> dict:
+        """Cached response for a matching request; ValueError for a different one"""
+        if self._same_request(stored_hash, request_hash, legacy_hash):
+            _REQUESTS["replayed"].inc()
+            logger.info(
+                "Idempotent request detected",
+                idempotency_key=idempotency_key,
+            )
+            return {
+                "response_body": response_body,
+                "status_code": status_code,
+            }
+        _REQUESTS["conflict"].inc()
+        logger.warning(
+            "Idempotency key exists but request hash mismatch",
+            idempotency_key=idempotency_key,
+        )
+        raise ValueError(
+            "Idempotency key already used with different request"
+        )
 
-    def _hash_request(self, request_body: dict) -> str:
-        """Create a hash of the request body"""
-        request_str = json.dumps(request_body, sort_keys=True)
-        return hashlib.sha256(request_str.encode()).hexdigest()
+    @staticmethod
+    def _same_request(
+        stored_hash: str, request_hash: str, legacy_hash: Optional[Callable[[], str]]
+    ) -> bool:
+        """Whether stored_hash is this request's (the legacy hash only computed on a mismatch)"""
+        return stored_hash == request_hash or (
+            legacy_hash is not None and stored_hash == legacy_hash()
+        )
 
     async def check_idempotency(
         self,
         idempotency_key: str,
-        request_body: dict,
+        request_hash: str,
+        legacy_hash: Optional[Callable[[], str]] = None,
     ) -> Optional[dict]:
         """Check if request with this idempotency key was already processed"""
         if not idempotency_key:
             return None
 
-        request_hash = self._hash_request(request_body)
-
-        # Check for existing idempotency key
-        result = await self.session.execute(
-            select(IdempotencyKey).where(
-                IdempotencyKey.idempotency_key == idempotency_key
+        cached = await self._cache_get(idempotency_key)
+        if cached is not None:
+            return self._replay(
+                idempotency_key,
+                request_hash,
+                cached["request_hash"],
+                cached["response_body"],
+                cached["status_code"],
+                legacy_hash,
             )
-        )
-        existing = result.scalar_one_or_none()
 
-        if existing:
+        existing = await self._load(idempotency_key)
+
+        if existing and existing.status_code is not None:
             # Check if expired
             if existing.expires_at < datetime.utcnow():
                 logger.warning(
@@ -51,53 +196,319 @@ class IdempotencyService:
                 )
                 return None
 
-            # Check if request hash matches
-            if existing.request_hash == request_hash:
-                logger.info(
-                    "Idempotent request detected",
+            # Refill the cache for the retries that follow
+            await self._cache_set(
+                idempotency_key,
+                existing.request_hash,
+                existing.response_body,
+                existing.status_code,
+                existing.expires_at,
+            )
+            return self._replay(
+                idempotency_key,
+                request_hash,
+                existing.request_hash,
+                existing.response_body,
+                existing.status_code,
+                legacy_hash,
+            )
+
+        return None
+
+    async def reserve_idempotency(
+        self,
+        idempotency_key: str,
+        request_hash: str,
+        legacy_hash: Optional[Callable[[], str]] = None,
+    ) -> Optional[dict]:
+        """
+        Claim the key for this request, or return the response stored for it.
+
+        Returns None when the caller holds the key: it must process the
+        request and then call store_idempotency, or release_idempotency if
+        processing fails. While another request holds the key, this polls
+        until that request stores its response (which is replayed), its lease
+        lapses (the key is taken over) or the wait times out
+        (IdempotencyInProgressError). A different request body under the same
+        key raises ValueError.
+        """
+        if not idempotency_key:
+            return None
+
+        cached = await self._cache_get(idempotency_key)
+        if cached is not None:
+            return self._replay(
+                idempotency_key,
+                request_hash,
+                cached["request_hash"],
+                cached["response_body"],
+                cached["status_code"],
+                legacy_hash,
+            )
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+        delay = POLL_INITIAL_SECONDS
+        while True:
+            if await self._claim(idempotency_key, request_hash):
+                _REQUESTS["claimed"].inc()
+                return None
+
+            # None: released between our insert and read, claimed again on the next poll
+            existing = await self._load(idempotency_key)
+            if existing is not None:
+                now = datetime.utcnow()
+                if existing.status_code is not None:
+                    if existing.expires_at >= now:
+                        await self._cache_set(
+                            idempotency_key,
+                            existing.request_hash,
+                            existing.response_body,
+                            existing.status_code,
+                            existing.expires_at,
+                        )
+                        return self._replay(
+                            idempotency_key,
+                            request_hash,
+                            existing.request_hash,
+                            existing.response_body,
+                            existing.status_code,
+                            legacy_hash,
+                        )
+                elif not self._same_request(existing.request_hash, request_hash, legacy_hash):
+                    self._replay(idempotency_key, request_hash, existing.request_hash, None, None)
+
+                if (
+                    existing.status_code is not None or existing.locked_until < now
+                ) and await self._take_over(idempotency_key, request_hash):
+                    _REQUESTS["claimed"].inc()
+                    logger.warning(
+                        "Took over idempotency key",
+                        idempotency_key=idempotency_key,
+                        expired=existing.status_code is not None,
+                    )
+                    return None
+
+            if time.monotonic() >= deadline:
+                _REQUESTS["in_progress"].inc()
+                logger.warning(
+                    "Idempotent request still in progress",
                     idempotency_key=idempotency_key,
                 )
-                return {
-                    "response_body": existing.response_body,
-                    "status_code": existing.status_code,
-                }
-            else:
+                raise IdempotencyInProgressError(
+                    "A request with this idempotency key is still in progress"
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLL_MAX_SECONDS)
+
+    async def release_idempotency(self, idempotency_key: str) -> None:
+        """
+        Drop this request's reservation so a retry can run the operation
+        again. Only for failures known to have happened before the operation
+        reached the gateway.
+        """
+        if not idempotency_key or self.lease_token is None:
+            return
+        await self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.idempotency_key == idempotency_key,
+                IdempotencyKey.lease_token == self.lease_token,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        await self.session.commit()
+        self.lease_token = None
+
+    async def renew_idempotency(self, idempotency_key: str) -> bool:
+        """
+        Extend this request's lease by IDEMPOTENCY_LEASE_SECONDS; False if it
+        no longer holds the key. Runs on its own connection, so it can be
+        called while the request's session is busy.
+        """
+        if not idempotency_key or self.lease_token is None:
+            return False
+        async with self.session.bind.begin() as conn:
+            result = await conn.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.idempotency_key == idempotency_key,
+                    IdempotencyKey.lease_token == self.lease_token,
+                    IdempotencyKey.status_code.is_(None),
+                )
+                .values(locked_until=self._lease_deadline())
+                .returning(IdempotencyKey.id)
+            )
+            return result.scalar_one_or_none() is not None
+
+    @asynccontextmanager
+    async def hold_lease(self, idempotency_key: str | None) -> AsyncIterator[None]:
+        """
+        Renew this request's lease every third of IDEMPOTENCY_LEASE_SECONDS
+        while the block runs, so a slow gateway call (executor queueing plus
+        timeouts) is not mistaken for a crashed worker and run again.
+        """
+        if not idempotency_key or self.lease_token is None:
+            yield
+            return
+        renewal = asyncio.create_task(self._renew_until_cancelled(idempotency_key))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            with suppress(asyncio.CancelledError):
+                await renewal
+
+    async def _renew_until_cancelled(self, idempotency_key: str) -> None:
+        interval = settings.IDEMPOTENCY_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.renew_idempotency(idempotency_key):
+                    logger.warning("Lost idempotency lease", idempotency_key=idempotency_key)
+                    return
+            except Exception as e:
+                # The next attempt may still land before the lease lapses
                 logger.warning(
-                    "Idempotency key exists but request hash mismatch",
+                    "Idempotency lease renewal failed",
                     idempotency_key=idempotency_key,
-                )
-                raise ValueError(
-                    "Idempotency key already used with different request"
+                    error=str(e),
                 )
 
-        return None
+    async def _load(self, idempotency_key: str):
+        """Current state of the key's row, bypassing the session's identity map"""
+        result = await self.session.execute(
+            select(
+                IdempotencyKey.request_hash,
+                IdempotencyKey.response_body,
+                IdempotencyKey.status_code,
+                IdempotencyKey.expires_at,
+                IdempotencyKey.locked_until,
+            ).where(IdempotencyKey.idempotency_key == idempotency_key)
+        )
+        return result.one_or_none()
+
+    async def _claim(self, idempotency_key: str, request_hash: str) -> bool:
+        """Insert the placeholder row; False if the key already has a row"""
+        token = uuid4()
+        result = await self.session.execute(
+            insert(IdempotencyKey)
+            .values(
+                idempotency_key=idempotency_key,
+                request_hash=request_hash,
+                expires_at=IdempotencyKey.create_expires_at(hours=24),
+                locked_until=self._lease_deadline(),
+                lease_token=token,
+            )
+            .on_conflict_do_nothing(index_elements=[IdempotencyKey.idempotency_key])
+            .returning(IdempotencyKey.id)
+        )
+        claimed = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        if claimed:
+            self.lease_token = token
+        return claimed
+
+    async def _take_over(self, idempotency_key: str, request_hash: str) -> bool:
+        """Reclaim a key whose lease lapsed or whose stored response expired"""
+        now = datetime.utcnow()
+        token = uuid4()
+        result = await self.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.idempotency_key == idempotency_key,
+                or_(
+                    and_(
+                        IdempotencyKey.status_code.is_(None),
+                        IdempotencyKey.locked_until < now,
+                    ),
+                    and_(
+                        IdempotencyKey.status_code.is_not(None),
+                        IdempotencyKey.expires_at < now,
+                    ),
+                ),
+            )
+            .values(
+                request_hash=request_hash,
+                response_body=None,
+                status_code=None,
+                expires_at=IdempotencyKey.create_expires_at(hours=24),
+                locked_until=self._lease_deadline(),
+                lease_token=token,
+            )
+            .returning(IdempotencyKey.id)
+            .execution_options(synchronize_session=False)
+        )
+        taken = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        if taken:
+            self.lease_token = token
+        return taken
+
+    @staticmethod
+    def _lease_deadline() -> datetime:
+        return datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
 
     async def store_idempotency(
         self,
         idempotency_key: str,
-        request_body: dict,
+        request_hash: str,
         response_body: dict,
         status_code: int,
-    ) -> None:
-        """Store idempotency key and response"""
+    ) -> bool:
+        """
+        Store the response for the key: completes this request's reservation,
+        or creates the row when the request holds none. False, storing
+        nothing, when another request holds or has answered the key (this
+        one lost its lease).
+        """
         if not idempotency_key:
-            return
+            return False
 
-        request_hash = self._hash_request(request_body)
+        # Stored as replayed: JSON types only (Decimal amounts become strings, as in responses)
+        response_body = json.loads(json.dumps(response_body, default=str))
+        expires_at = IdempotencyKey.create_expires_at(hours=24)
 
-        idempotency_record = IdempotencyKey(
-            idempotency_key=idempotency_key,
-            request_hash=request_hash,
-            response_body=response_body,
-            status_code=status_code,
-            expires_at=IdempotencyKey.create_expires_at(hours=24),
-        )
+        values = {
+            "request_hash": request_hash,
+            "response_body": response_body,
+            "status_code": status_code,
+            "expires_at": expires_at,
+            "locked_until": None,
+        }
+        if self.lease_token is not None:
+            statement = (
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.idempotency_key == idempotency_key,
+                    IdempotencyKey.lease_token == self.lease_token,
+                    IdempotencyKey.status_code.is_(None),
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            statement = (
+                insert(IdempotencyKey)
+                .values(idempotency_key=idempotency_key, **values)
+                .on_conflict_do_nothing(index_elements=[IdempotencyKey.idempotency_key])
+            )
+        result = await self.session.execute(statement.returning(IdempotencyKey.id))
+        stored = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        self.lease_token = None
+        if not stored:
+            logger.warning(
+                "Idempotency key held by another request, response not stored",
+                idempotency_key=idempotency_key,
+            )
+            return False
 
-        self.session.add(idempotency_record)
-        await self.session.flush()
+        # Write-through only once the row is durable, so Redis never holds a key Postgres lacks
+        await self._cache_set(
+            idempotency_key, request_hash, response_body, status_code, expires_at
+        )
 
         logger.info(
             "Stored idempotency key",
             idempotency_key=idempotency_key,
         )
-
+        return True
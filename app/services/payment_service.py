@@ -2,7 +2,7 @@
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient
 from app.adapters.authorize_net.models import (
     PurchaseRequest as AdapterPurchaseRequest,
     CreditCard,
@@ -32,10 +32,10 @@ logger = structlog.get_logger()
 class PaymentService:
     """Service for payment operations"""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, authorize_net_client: AsyncAuthorizeNetClient):
         self.session = session
         self.repository = PaymentRepository(session)
-        self.authorize_net_client = AuthorizeNetClient()
+        self.authorize_net_client = authorize_net_client
 
     async def process_purchase(
         self,
@@ -79,12 +79,12 @@ class PaymentService:
             )
 
             # Call Authorize.Net API
-            response = self.authorize_net_client.purchase(adapter_request)
+            response = await self.authorize_net_client.purchase(adapter_request)
 
             # Update transaction based on response
             if response.success:
                 await self.repository.update_transaction_status(
-                    transaction_id=transaction.id,
+                    transaction,
                     status=TransactionStatus.CAPTURED,
                     authorize_net_transaction_id=response.transaction_id,
                 )
@@ -110,7 +110,7 @@ class PaymentService:
                 # Transaction failed
                 error_message = response.error_text or response.message_description or "Transaction failed"
                 await self.repository.update_transaction_status(
-                    transaction_id=transaction.id,
+                    transaction,
                     status=TransactionStatus.FAILED,
                     error_message=error_message,
                 )
@@ -172,11 +172,11 @@ class PaymentService:
             adapter_request = self._convert_to_adapter_request(
                 request, correlation_id, idempotency_key=idempotency_key
             )
-            response = self.authorize_net_client.authorize(adapter_request)
+            response = await self.authorize_net_client.authorize(adapter_request)
 
             if response.success:
                 await self.repository.update_transaction_status(
-                    transaction_id=transaction.id,
+                    transaction,
                     status=TransactionStatus.AUTHORIZED,
                     authorize_net_transaction_id=response.transaction_id,
                 )
@@ -201,7 +201,7 @@ class PaymentService:
             else:
                 error_message = response.error_text or response.message_description or "Authorization failed"
                 await self.repository.update_transaction_status(
-                    transaction_id=transaction.id,
+                    transaction,
                     status=TransactionStatus.FAILED,
                     error_message=error_message,
                 )
@@ -260,11 +260,11 @@ class PaymentService:
                 ref_id=idempotency_key or correlation_id,
             )
 
-            response = self.authorize_net_client.capture(capture_request)
+            response = await self.authorize_net_client.capture(capture_request)
 
             if response.success:
                 await self.repository.update_transaction_status(
-                    transaction_id=auth_txn.id,
+                    auth_txn,
                     status=TransactionStatus.CAPTURED,
                     authorize_net_transaction_id=response.transaction_id,
                     extra_data={
@@ -292,7 +292,7 @@ class PaymentService:
 
             error_message = response.error_text or response.message_description or "Capture failed"
             await self.repository.update_transaction_status(
-                transaction_id=auth_txn.id,
+                auth_txn,
                 status=TransactionStatus.FAILED,
                 error_message=error_message,
             )
@@ -346,11 +346,11 @@ class PaymentService:
                 ref_id=idempotency_key or correlation_id,
             )
 
-            response = self.authorize_net_client.void(void_request)
+            response = await self.authorize_net_client.void(void_request)
 
             if response.success:
                 await self.repository.update_transaction_status(
-                    transaction_id=txn.id,
+                    txn,
                     status=TransactionStatus.VOIDED,
                     authorize_net_transaction_id=response.transaction_id,
                     extra_data={
@@ -378,7 +378,7 @@ class PaymentService:
 
             error_message = response.error_text or response.message_description or "Void failed"
             await self.repository.update_transaction_status(
-                transaction_id=txn.id,
+                txn,
                 status=TransactionStatus.FAILED,
                 error_message=error_message,
             )
@@ -443,11 +443,11 @@ class PaymentService:
                 ref_id=idempotency_key or correlation_id,
             )
 
-            response = self.authorize_net_client.refund(refund_request)
+            response = await self.authorize_net_client.refund(refund_request)
 
             if response.success:
                 await self.repository.update_transaction_status(
-                    transaction_id=txn.id,
+                    txn,
                     status=TransactionStatus.REFUNDED,
                     authorize_net_transaction_id=response.transaction_id,
                     extra_data={
@@ -476,7 +476,7 @@ class PaymentService:
 
             error_message = response.error_text or response.message_description or "Refund failed"
             await self.repository.update_transaction_status(
-                transaction_id=txn.id,
+                txn,
                 status=TransactionStatus.FAILED,
                 error_message=error_message,
             )
@@ -511,7 +511,7 @@ class PaymentService:
             adapter_request = self._convert_to_subscription_request(
                 request, correlation_id, idempotency_key=idempotency_key
             )
-            response = self.authorize_net_client.create_subscription(adapter_request)
+            response = await self.authorize_net_client.create_subscription(adapter_request)
 
             if response.success:
                 logger.info(
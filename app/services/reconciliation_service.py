@@ -0,0 +1,286 @@
+"""Service for reconciling local transactions against Authorize.Net settlement data"""
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient
+from app.adapters.authorize_net.exceptions import AuthorizeNetAPIError
+from app.adapters.authorize_net.models import (
+    SettledBatchListRequest,
+    TransactionListRequest,
+    TransactionListResponse,
+    TransactionDetailsRequest,
+    TransactionDetails,
+    TransactionSummary,
+)
+from app.core.config import settings
+from app.models.transaction import TransactionStatus
+from app.repositories.payment_repository import PaymentRepository
+
+logger = structlog.get_logger()
+
+# getSettledBatchList accepts at most 31 days per call
+MAX_SETTLEMENT_WINDOW = timedelta(days=31)
+
+# Gateway transactionStatus -> local status; anything else (under review,
+# chargebacks, returned items, ...) is left for a human to look at
+GATEWAY_STATUS_MAP = {
+    "settledSuccessfully": TransactionStatus.CAPTURED,
+    "capturedPendingSettlement": TransactionStatus.CAPTURED,
+    "authorizedPendingCapture": TransactionStatus.AUTHORIZED,
+    "refundSettledSuccessfully": TransactionStatus.REFUNDED,
+    "refundPendingSettlement": TransactionStatus.REFUNDED,
+    "voided": TransactionStatus.VOIDED,
+    "declined": TransactionStatus.FAILED,
+    "expired": TransactionStatus.FAILED,
+    "generalError": TransactionStatus.FAILED,
+    "settlementError": TransactionStatus.FAILED,
+    "failedReview": TransactionStatus.FAILED,
+    "communicationError": TransactionStatus.FAILED,
+}
+
+
+@dataclass
+class StatusCorrection:
+    """A local transaction whose status disagrees with the gateway"""
+
+    transaction_id: UUID
+    authorize_net_transaction_id: str
+    gateway_status: str
+    from_status: TransactionStatus
+    to_status: TransactionStatus
+
+
+@dataclass
+class AmountMismatch:
+    """A settled transaction whose settle amount differs from the local amount"""
+
+    transaction_id: UUID
+    authorize_net_transaction_id: str
+    local_amount: Decimal
+    settle_amount: Decimal
+
+
+@dataclass
+class ReconciliationReport:
+    """Outcome of one reconciliation run"""
+
+    batches: int = 0
+    pages: int = 0
+    gateway_transactions: int = 0
+    matched: int = 0
+    corrections: list[StatusCorrection] = field(default_factory=list)
+    corrected: int = 0
+    amount_mismatches: list[AmountMismatch] = field(default_factory=list)
+    missing_locally: list[str] = field(default_factory=list)
+    unmapped_statuses: dict[str, int] = field(default_factory=dict)
+    details: list[TransactionDetails] = field(default_factory=list)
+
+
+class ReconciliationService:
+    """
+    Diffs the transactions table against settled batches from the
+    Transaction Reporting API.
+
+    Gateway calls (batch list, transaction list pages, details) run
+    concurrently, at most max_concurrency at a time. Each page is diffed as it
+    arrives with one bulk SELECT; the session itself is only ever used from
+    the calling coroutine. Status corrections are grouped by transition and
+    applied with set-based UPDATEs that only touch rows still in the status
+    the diff saw. Amount differences are reported, never corrected.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        authorize_net_client: AsyncAuthorizeNetClient,
+        max_concurrency: int | None = None,
+        page_size: int | None = None,
+    ):
+        self.session = session
+        self.repository = PaymentRepository(session)
+        self.authorize_net_client = authorize_net_client
+        self.max_concurrency = max_concurrency or settings.RECONCILIATION_MAX_CONCURRENCY
+        self.page_size = page_size or settings.RECONCILIATION_PAGE_SIZE
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def reconcile(
+        self,
+        first_settlement_date: datetime,
+        last_settlement_date: datetime,
+        dry_run: bool = False,
+        include_details: bool = False,
+    ) -> ReconciliationReport:
+        """
+        Reconcile every batch settled between the two dates.
+
+        With dry_run the corrections are reported but not written. With
+        include_details, transactions the gateway knows about but we do not
+        are looked up with getTransactionDetails.
+        """
+        report = ReconciliationReport()
+        batch_ids = await self._settled_batch_ids(first_settlement_date, last_settlement_date)
+        report.batches = len(batch_ids)
+
+        tasks = {
+            asyncio.create_task(self._page(batch_id, 1)): (batch_id, 1) for batch_id in batch_ids
+        }
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    batch_id, offset = tasks.pop(task)
+                    page = task.result()
+                    report.pages += 1
+                    if offset == 1:
+                        # The first page tells us how many more to fetch
+                        pages = -(-page.total_num_in_result_set // self.page_size)
+                        for next_offset in range(2, pages + 1):
+                            tasks[asyncio.create_task(self._page(batch_id, next_offset))] = (
+                                batch_id,
+                                next_offset,
+                            )
+                    await self._diff(page.transactions, report)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if include_details and report.missing_locally:
+            report.details = await asyncio.gather(
+                *(self._details(trans_id) for trans_id in report.missing_locally)
+            )
+
+        if not dry_run and report.corrections:
+            report.corrected = await self._apply(report.corrections)
+            await self.session.commit()
+
+        logger.info(
+            "Reconciliation finished",
+            batches=report.batches,
+            gateway_transactions=report.gateway_transactions,
+            matched=report.matched,
+            corrections=len(report.corrections),
+            corrected=report.corrected,
+            missing_locally=len(report.missing_locally),
+            amount_mismatches=len(report.amount_mismatches),
+            dry_run=dry_run,
+        )
+        return report
+
+    async def _gateway(self, call, request):
+        """Run one reporting call under the concurrency limit"""
+        async with self._semaphore:
+            response = await call(request)
+        if not response.success:
+            raise AuthorizeNetAPIError(
+                response.error_text or "Transaction Reporting API request failed",
+                error_code=response.error_code,
+            )
+        return response
+
+    async def _settled_batch_ids(self, first: datetime, last: datetime) -> list[str]:
+        windows = []
+        start = first
+        while start <= last:
+            end = min(start + MAX_SETTLEMENT_WINDOW, last)
+            windows.append(
+                SettledBatchListRequest(first_settlement_date=start, last_settlement_date=end)
+            )
+            start = end + timedelta(seconds=1)
+        responses = await asyncio.gather(
+            *(self._gateway(self.authorize_net_client.get_settled_batch_list, w) for w in windows)
+        )
+        batch_ids = {}
+        for response in responses:
+            for batch in response.batches:
+                batch_ids[batch.batch_id] = None
+        return list(batch_ids)
+
+    async def _page(self, batch_id: str, offset: int) -> TransactionListResponse:
+        return await self._gateway(
+            self.authorize_net_client.get_transaction_list,
+            TransactionListRequest(batch_id=batch_id, limit=self.page_size, offset=offset),
+        )
+
+    async def _details(self, trans_id: str) -> TransactionDetails:
+        response = await self._gateway(
+            self.authorize_net_client.get_transaction_details,
+            TransactionDetailsRequest(transaction_id=trans_id),
+        )
+        return response.transaction
+
+    async def _diff(
+        self, summaries: list[TransactionSummary], report: ReconciliationReport
+    ) -> None:
+        """Compare one page of gateway transactions with the local rows in one query"""
+        if not summaries:
+            return
+        report.gateway_transactions += len(summaries)
+        by_trans_id = {summary.transaction_id: summary for summary in summaries}
+        rows = await self.repository.get_transaction_states(list(by_trans_id))
+
+        found = set()
+        for row in rows:
+            summary = by_trans_id[row.authorize_net_transaction_id]
+            found.add(summary.transaction_id)
+            target = GATEWAY_STATUS_MAP.get(summary.status)
+            if target is None:
+                report.unmapped_statuses[summary.status] = (
+                    report.unmapped_statuses.get(summary.status, 0) + 1
+                )
+                continue
+            if row.status != target:
+                report.corrections.append(
+                    StatusCorrection(
+                        transaction_id=row.id,
+                        authorize_net_transaction_id=summary.transaction_id,
+                        gateway_status=summary.status,
+                        from_status=row.status,
+                        to_status=target,
+                    )
+                )
+            else:
+                report.matched += 1
+            if (
+                target == TransactionStatus.CAPTURED
+                and summary.settle_amount is not None
+                and row.amount is not None
+                and Decimal(row.amount) != summary.settle_amount
+            ):
+                report.amount_mismatches.append(
+                    AmountMismatch(
+                        transaction_id=row.id,
+                        authorize_net_transaction_id=summary.transaction_id,
+                        local_amount=Decimal(row.amount),
+                        settle_amount=summary.settle_amount,
+                    )
+                )
+        report.missing_locally.extend(t for t in by_trans_id if t not in found)
+
+    async def _apply(self, corrections: list[StatusCorrection]) -> int:
+        """One UPDATE per (from, to, gateway status) group, chunked by page size"""
+        groups: dict[tuple, list[UUID]] = defaultdict(list)
+        for correction in corrections:
+            key = (correction.from_status, correction.to_status, correction.gateway_status)
+            groups[key].append(correction.transaction_id)
+
+        reconciled_at = datetime.utcnow().isoformat()
+        updated = 0
+        for (from_status, to_status, gateway_status), ids in groups.items():
+            for start in range(0, len(ids), self.page_size):
+                updated += await self.repository.bulk_update_status(
+                    ids[start : start + self.page_size],
+                    from_status=from_status,
+                    to_status=to_status,
+                    extra_data={
+                        "reconciled_at": reconciled_at,
+                        "reconciled_gateway_status": gateway_status,
+                    },
+                )
+        return updated
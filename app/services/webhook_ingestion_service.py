@@ -0,0 +1,212 @@
+"""Micro-batched persistence and enqueueing of incoming webhook events"""
+import asyncio
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import structlog
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import WEBHOOK_DUPLICATE_DELIVERIES
+from app.models.webhook_event import WebhookEvent
+
+logger = structlog.get_logger()
+
+NOTIFICATION_KEY_PREFIX = "webhook:notification:"
+
+_DUPLICATES = {
+    source: WEBHOOK_DUPLICATE_DELIVERIES.labels(source=source) for source in ("redis", "postgres")
+}
+
+
+class WebhookIngestor:
+    """
+    Stores webhook events in micro-batches and enqueues them for processing.
+
+    Events submitted within window_ms of each other (at most max_batch_size)
+    are written with one multi-row INSERT in one transaction, then added to
+    the webhook stream (WEBHOOK_STREAM, capped near WEBHOOK_STREAM_MAXLEN
+    entries) with one pipelined XADD round trip.
+    submit() returns only once its event is committed and enqueued, so the
+    route still answers 200 only for events that are durable. If the INSERT
+    fails, every request in the batch fails. If the enqueue fails, every
+    request in the batch fails, as a single event would, and the committed
+    events are recorded with the error and dead-lettered: the gateway
+    retries the failed deliveries, which are stored as new events, so the
+    replay pipeline must not process these copies as well.
+
+    Retried deliveries are recognized by their notificationId: the unique
+    index on webhook_events.notification_id makes the INSERT skip them (they
+    are not enqueued again), and the XADD pipeline records every stored
+    notificationId in Redis for WEBHOOK_DEDUP_TTL_SECONDS so is_duplicate()
+    can acknowledge later retries without touching Postgres.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        redis: Redis,
+        window_ms: float | None = None,
+        max_batch_size: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.redis = redis
+        self.window = (
+            settings.WEBHOOK_BATCH_WINDOW_MS if window_ms is None else window_ms
+        ) / 1000
+        self.max_batch_size = max_batch_size or settings.WEBHOOK_BATCH_MAX_SIZE
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def is_duplicate(self, notification_id: str | None) -> bool:
+        """
+        Whether a delivery with this notificationId was already stored, per
+        Redis. A miss or a Redis failure returns False; submit() still
+        catches the duplicate on INSERT.
+        """
+        if not notification_id:
+            return False
+        try:
+            seen = await self.redis.exists(NOTIFICATION_KEY_PREFIX + notification_id)
+        except RedisError as e:
+            logger.warning("Webhook dedup check failed", error=str(e))
+            return False
+        if seen:
+            _DUPLICATES["redis"].inc()
+        return bool(seen)
+
+    async def submit(
+        self,
+        event_type: str,
+        authorize_net_transaction_id: str | None,
+        raw_payload: dict,
+        correlation_id: str | None = None,
+        notification_id: str | None = None,
+    ) -> UUID | None:
+        """
+        Queue one event for the next batch and wait until it is stored and
+        enqueued. Returns None if an event with the same notification_id was
+        already stored.
+        """
+        loop = asyncio.get_running_loop()
+        row = {
+            "id": uuid4(),
+            "notification_id": notification_id,
+            "event_type": event_type,
+            "authorize_net_transaction_id": authorize_net_transaction_id,
+            "raw_payload": raw_payload,
+            "correlation_id": correlation_id,
+            "processed": False,
+            "created_at": datetime.utcnow(),
+        }
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch_size or self.window <= 0:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_pending)
+        # A disconnecting client must not cancel the flush its event is part of
+        return await asyncio.shield(future)
+
+    async def aclose(self) -> None:
+        """Flush what is pending and wait for in-flight batches"""
+        if self._pending:
+            self._flush_pending()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        rows = [row for row, _ in batch]
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    insert(WebhookEvent)
+                    .values(rows)
+                    .on_conflict_do_nothing(index_elements=[WebhookEvent.notification_id])
+                    .returning(WebhookEvent.id)
+                )
+                stored = set(result.scalars())
+                await session.commit()
+        except Exception as e:
+            logger.exception("Error storing webhook batch", events=len(rows), error=str(e))
+            self._fail(batch, e)
+            return
+
+        ids = [row["id"] for row in rows if row["id"] in stored]
+        notification_ids = [row["notification_id"] for row in rows if row["notification_id"]]
+        try:
+            await self._enqueue(ids, notification_ids)
+        except Exception as e:
+            error_message = str(e)
+            logger.exception("Error enqueueing webhook batch", events=len(rows), error=error_message)
+            await self._mark_failed(ids, error_message)
+            self._fail(batch, e)
+            return
+
+        duplicates = len(rows) - len(ids)
+        if duplicates:
+            _DUPLICATES["postgres"].inc(duplicates)
+        logger.info("Enqueued webhook batch", events=len(ids), duplicates=duplicates)
+        for row, future in batch:
+            if not future.done():
+                future.set_result(row["id"] if row["id"] in stored else None)
+
+    async def _enqueue(self, ids: list[UUID], notification_ids: list[str]) -> None:
+        pipeline = self.redis.pipeline(transaction=False)
+        for event_id in ids:
+            # Trimmed lazily (whole macro nodes), so the cap costs nothing per XADD
+            pipeline.xadd(
+                settings.WEBHOOK_STREAM,
+                {"event_id": str(event_id)},
+                maxlen=settings.WEBHOOK_STREAM_MAXLEN or None,
+                approximate=True,
+            )
+        for notification_id in notification_ids:
+            pipeline.set(
+                NOTIFICATION_KEY_PREFIX + notification_id,
+                1,
+                ex=settings.WEBHOOK_DEDUP_TTL_SECONDS,
+            )
+        await pipeline.execute()
+
+    async def _mark_failed(self, ids: list[UUID], error_message: str) -> None:
+        try:
+            async with self.session_factory() as session:
+                # Releases the notificationIds so the gateway's retry is stored again, and
+                # retires the rows: that retry supersedes them, replay must skip them
+                now = datetime.utcnow()
+                await session.execute(
+                    update(WebhookEvent)
+                    .where(WebhookEvent.id.in_(ids))
+                    .values(
+                        notification_id=None,
+                        error_message=error_message,
+                        processed_at=now,
+                        dead_lettered_at=now,
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            logger.exception("Error recording webhook enqueue failure", error=str(e))
+
+    @staticmethod
+    def _fail(batch: list[tuple[dict, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
@@ -0,0 +1,199 @@
+"""Service for replaying webhook events that were never processed or failed"""
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import structlog
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import WEBHOOK_REPLAY_EVENTS
+from app.repositories.webhook_repository import WebhookRepository
+from app.services.webhook_service import WebhookService
+
+logger = structlog.get_logger()
+
+# How often a paused replay re-checks the live stream backlog
+BACKLOG_POLL_SECONDS = 1.0
+
+MIN_UUID = UUID(int=0)
+
+_EVENTS = {
+    outcome: WEBHOOK_REPLAY_EVENTS.labels(outcome=outcome)
+    for outcome in ("processed", "failed", "dead_lettered", "skipped", "error")
+}
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of one replay run"""
+
+    batches: int = 0
+    events: int = 0  # events re-dispatched
+    processed: int = 0
+    failed: int = 0  # failed again; retried from their next_attempt_at
+    dead_lettered: int = 0
+    skipped: int = 0  # processed or locked elsewhere by the time their batch ran
+    seconds: float = 0.0
+    events_per_second: float = 0.0
+
+
+class WebhookReplayService:
+    """
+    Re-dispatches webhook events that are not processed: failed attempts
+    whose backoff (next_attempt_at) has elapsed, and events that were never
+    attempted (lost stream entries) once they are min_age_seconds old, so
+    live consumers keep the fresh ones. Events whose enqueue failed are
+    dead-lettered at ingestion, since the gateway retries those deliveries.
+
+    Candidates are streamed in keyset order on (created_at, id), one page per
+    query, and each page is split into batches of batch_size processed with
+    WebhookService.process_events, up to concurrency batches at once, each in
+    its own session. Every attempt goes through the same bookkeeping as live
+    processing: a failure schedules the next attempt with exponential backoff
+    and dead-letters the event once WEBHOOK_RETRY_MAX_ATTEMPTS is reached.
+
+    Replay is throttled to rate_limit events per second, and paused while
+    the live webhook stream holds more than max_live_backlog entries, so it
+    never competes with live traffic for the database.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        redis: Redis | None = None,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+        rate_limit: float | None = None,
+        min_age_seconds: float | None = None,
+        max_live_backlog: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.redis = redis
+        self.batch_size = batch_size or settings.WEBHOOK_REPLAY_BATCH_SIZE
+        self.concurrency = concurrency or settings.WEBHOOK_REPLAY_CONCURRENCY
+        self.rate_limit = rate_limit or settings.WEBHOOK_REPLAY_RATE_LIMIT
+        self.min_age = timedelta(
+            seconds=settings.WEBHOOK_REPLAY_MIN_AGE_SECONDS
+            if min_age_seconds is None
+            else min_age_seconds
+        )
+        self.max_live_backlog = (
+            settings.WEBHOOK_REPLAY_MAX_LIVE_BACKLOG
+            if max_live_backlog is None
+            else max_live_backlog
+        )
+        self._next_slot = 0.0
+
+    async def replay(
+        self, since: datetime | None = None, max_events: int | None = None
+    ) -> ReplayReport:
+        """
+        Replay the events due when the run started, up to max_events; with
+        since, only events created from then on (a backfill after an incident).
+        An aware since is converted to UTC; a naive one is taken as UTC.
+        """
+        if since is not None and since.tzinfo is not None:
+            # created_at is stored as naive UTC
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        report = ReplayReport()
+        started = time.monotonic()
+        created_before = datetime.utcnow() - self.min_age
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task] = set()
+        # Keyset cursor: (created_at, id) of the last event paged
+        after = (since, MIN_UUID) if since is not None else None
+        try:
+            while max_events is None or report.events < max_events:
+                limit = self.batch_size * self.concurrency
+                if max_events is not None:
+                    limit = min(limit, max_events - report.events)
+                async with self.session_factory() as session:
+                    page = await WebhookRepository(session).list_replayable(
+                        limit, created_before, after
+                    )
+                if not page:
+                    break
+                after = (page[-1].created_at, page[-1].id)
+                for offset in range(0, len(page), self.batch_size):
+                    batch = [row.id for row in page[offset : offset + self.batch_size]]
+                    await self._throttle(len(batch))
+                    await slots.acquire()
+                    report.batches += 1
+                    report.events += len(batch)
+                    task = asyncio.create_task(self._dispatch(batch, report, slots))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                self._log_progress(report, started, after[0])
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        report.seconds = round(time.monotonic() - started, 3)
+        if report.seconds:
+            report.events_per_second = round(report.events / report.seconds, 1)
+        logger.info("Webhook replay finished", **asdict(report))
+        return report
+
+    async def _dispatch(
+        self, event_ids: list[UUID], report: ReplayReport, slots: asyncio.Semaphore
+    ) -> None:
+        try:
+            async with self.session_factory() as session:
+                result = await WebhookService(session).process_events(event_ids)
+        except Exception as e:
+            # Left as they were; the next run picks them up again
+            logger.exception("Webhook replay batch failed", events=len(event_ids), error=str(e))
+            report.failed += len(event_ids)
+            _EVENTS["error"].inc(len(event_ids))
+            return
+        finally:
+            slots.release()
+
+        processed = result.events - result.failed
+        skipped = len(event_ids) - result.events
+        report.processed += processed
+        report.failed += result.failed - result.dead_lettered
+        report.dead_lettered += result.dead_lettered
+        report.skipped += skipped
+        for outcome, count in (
+            ("processed", processed),
+            ("failed", result.failed - result.dead_lettered),
+            ("dead_lettered", result.dead_lettered),
+            ("skipped", skipped),
+        ):
+            if count:
+                _EVENTS[outcome].inc(count)
+
+    async def _throttle(self, events: int) -> None:
+        """Hold the next batch back to keep within rate_limit and behind live traffic"""
+        while self.redis is not None and await self._live_backlog() > self.max_live_backlog:
+            await asyncio.sleep(BACKLOG_POLL_SECONDS)
+        now = time.monotonic()
+        if self._next_slot > now:
+            await asyncio.sleep(self._next_slot - now)
+        self._next_slot = max(now, self._next_slot) + events / self.rate_limit
+
+    async def _live_backlog(self) -> int:
+        try:
+            return await self.redis.xlen(settings.WEBHOOK_STREAM)
+        except RedisError as e:
+            logger.warning("Could not read the live webhook backlog", error=str(e))
+            return 0
+
+    @staticmethod
+    def _log_progress(report: ReplayReport, started: float, cursor: datetime) -> None:
+        elapsed = time.monotonic() - started
+        logger.info(
+            "Webhook replay progress",
+            events=report.events,
+            processed=report.processed,
+            failed=report.failed,
+            dead_lettered=report.dead_lettered,
+            events_per_second=round(report.events / elapsed, 1) if elapsed else None,
+            cursor=cursor.isoformat(),
+        )
@@ -1,17 +1,87 @@
 """Service for processing Authorize.Net webhook events"""
 import structlog
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.repositories.payment_repository import PaymentRepository
 from app.repositories.webhook_repository import WebhookRepository
-from app.models.transaction import TransactionStatus
+from app.models.transaction import TransactionStatus, can_transition
 
 logger = structlog.get_logger()
 
+STATUS_MAP = {
+    "net.authorize.payment.authcapture.created": TransactionStatus.CAPTURED,
+    "net.authorize.payment.authorization.created": TransactionStatus.AUTHORIZED,
+    "net.authorize.payment.void.created": TransactionStatus.VOIDED,
+    "net.authorize.payment.refund.created": TransactionStatus.REFUNDED,
+}
+
+
+@dataclass
+class ProcessingReport:
+    """Outcome of processing a batch of webhook events"""
+
+    events: int = 0
+    failed: int = 0  # recorded an error; retried from next_attempt_at
+    dead_lettered: int = 0  # failed with no attempts left
+
+
+def retry_schedule(attempts: int, now: datetime) -> tuple[datetime | None, datetime | None]:
+    """(next_attempt_at, dead_lettered_at) for an event whose attempts-th attempt failed"""
+    if attempts >= settings.WEBHOOK_RETRY_MAX_ATTEMPTS:
+        return None, now
+    delay = min(
+        settings.WEBHOOK_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1),
+        settings.WEBHOOK_RETRY_BACKOFF_MAX_SECONDS,
+    )
+    return now + timedelta(seconds=delay), None
+
+
+def _event_details(payload: dict) -> tuple[str | None, str | None, datetime | None]:
+    """Event type, Authorize.Net transaction ID and event time (naive UTC) of a webhook payload"""
+    event_type = payload.get("eventType")
+    trans_id = (
+        payload.get("id")
+        or payload.get("transId")
+        or payload.get("payload", {}).get("id")
+        or payload.get("payload", {}).get("transId")
+    )
+    try:
+        event_at = datetime.fromisoformat(payload["eventDate"])
+    except (KeyError, TypeError, ValueError):
+        return event_type, trans_id, None
+    if event_at.tzinfo is not None:
+        event_at = event_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return event_type, trans_id, event_at
+
 
 class WebhookService:
-    """Processes webhook events asynchronously"""
+    """
+    Processes webhook events asynchronously.
+
+    Events are handled in batches: the batch is locked, its Authorize.Net
+    transaction IDs are resolved with one query, status changes are applied
+    with one UPDATE ... FROM (VALUES ...) and every event is marked with one
+    more, all in one transaction. An event that cannot be handled (malformed
+    payload, failing update) is marked with its error without affecting the
+    rest of the batch.
+
+    Status changes follow STATUS_PREDECESSORS and are conditional on the
+    status in the database, so events may arrive in any order and batches
+    touching the same transactions may run in parallel: an event that would
+    move a status backwards (a late authorization after the capture) is
+    processed without changing the transaction.
+
+    Every attempt is counted on the event. A failed event is scheduled for
+    another attempt after an exponential backoff (retry_schedule), which the
+    replay pipeline picks up, and dead-lettered once WEBHOOK_RETRY_MAX_ATTEMPTS
+    attempts have failed.
+    """
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -20,68 +90,128 @@ class WebhookService:
 
     async def process_event(self, event_id: str):
         """Load and process a webhook event by ID"""
-        event_uuid = UUID(event_id)
-        event = await self.webhook_repo.get_by_id(event_uuid)
-        if not event:
-            logger.warning("Webhook event not found", event_id=event_id)
-            return
-
-        if event.processed:
-            logger.info("Webhook event already processed", event_id=event_id)
-            return
-
-        correlation_id = event.correlation_id
-        if correlation_id:
-            structlog.contextvars.bind_contextvars(correlation_id=correlation_id)
-
-        payload = event.raw_payload
-        event_type = payload.get("eventType")
-        trans_id = (
-            payload.get("id")
-            or payload.get("transId")
-            or payload.get("payload", {}).get("id")
-            or payload.get("payload", {}).get("transId")
-        )
+        await self.process_events([event_id])
 
-        error_message = None
+    async def process_events(self, event_ids: Sequence[str | UUID]) -> ProcessingReport:
+        """
+        Process the listed events that are not processed yet; events already
+        processed or being processed elsewhere are skipped.
+        """
+        event_uuids = [UUID(str(event_id)) for event_id in event_ids]
+        events = await self.webhook_repo.lock_unprocessed(event_uuids)
+        if len(events) < len(event_uuids):
+            logger.info(
+                "Skipped webhook events not found or already processed",
+                skipped=len(event_uuids) - len(events),
+            )
+        return await self._process(events)
 
-        try:
-            status_map = {
-                "net.authorize.payment.authcapture.created": TransactionStatus.CAPTURED,
-                "net.authorize.payment.authorization.created": TransactionStatus.AUTHORIZED,
-                "net.authorize.payment.void.created": TransactionStatus.VOIDED,
-                "net.authorize.payment.refund.created": TransactionStatus.REFUNDED,
-            }
-
-            if event_type in status_map and trans_id:
-                txn = await self.payment_repo.get_transaction_by_authorize_net_id(trans_id)
-                if txn:
-                    await self.payment_repo.update_transaction_status(
-                        transaction_id=txn.id,
-                        status=status_map[event_type],
-                        authorize_net_transaction_id=trans_id,
-                        extra_data={"webhook_event_id": str(event.id)},
-                    )
-                    await self.session.commit()
-                    logger.info(
-                        "Updated transaction from webhook",
-                        transaction_id=str(txn.id),
-                        event_type=event_type,
-                        authorize_net_transaction_id=trans_id,
-                    )
-                else:
-                    logger.warning(
-                        "Transaction not found for webhook",
-                        event_type=event_type,
-                        authorize_net_transaction_id=trans_id,
-                    )
+    async def _process(self, events: list) -> ProcessingReport:
+        if not events:
+            await self.session.commit()
+            return ProcessingReport()
+
+        errors: dict[UUID, str | None] = {}
+        handled = []
+        for event in events:
+            errors[event.id] = None
+            try:
+                event_type, trans_id, event_at = _event_details(event.raw_payload)
+            except Exception as e:
+                errors[event.id] = str(e)
+                logger.warning(
+                    "Malformed webhook payload", event_id=str(event.id), error=str(e)
+                )
+                continue
+            if event_type in STATUS_MAP and trans_id:
+                handled.append((event, event_type, str(trans_id), event_at or event.created_at))
+            else:
+                logger.info(
+                    "Unhandled webhook event type",
+                    event_type=event_type,
+                    correlation_id=event.correlation_id,
+                )
+
+        states = await self.payment_repo.get_transaction_states(
+            list({trans_id for _, _, trans_id, _ in handled})
+        )
+        matches = Counter(state.authorize_net_transaction_id for state in states)
+        transaction_ids = {state.authorize_net_transaction_id: state.id for state in states}
+
+        # Per transaction, the status its events lead to when applied in event
+        # time order; events that would not move it forward are dropped here
+        updates: dict[UUID, tuple[TransactionStatus, datetime, UUID]] = {}
+        events_by_transaction: dict[UUID, list[UUID]] = {}
+        for event, event_type, trans_id, event_at in sorted(handled, key=lambda h: h[3]):
+            if matches[trans_id] > 1:
+                errors[event.id] = "Multiple transactions match the Authorize.Net transaction ID"
+                logger.warning(
+                    "Multiple transactions for webhook",
+                    event_type=event_type,
+                    authorize_net_transaction_id=trans_id,
+                )
+            elif trans_id not in transaction_ids:
+                logger.warning(
+                    "Transaction not found for webhook",
+                    event_type=event_type,
+                    authorize_net_transaction_id=trans_id,
+                )
             else:
-                logger.info("Unhandled webhook event type", event_type=event_type)
+                transaction_id = transaction_ids[trans_id]
+                status = STATUS_MAP[event_type]
+                events_by_transaction.setdefault(transaction_id, []).append(event.id)
+                current = updates.get(transaction_id)
+                if current is None or can_transition(current[0], status):
+                    updates[transaction_id] = (status, event_at, event.id)
 
+        rows = [
+            (transaction_id, status, event_at, {"webhook_event_id": str(event_id)})
+            for transaction_id, (status, event_at, event_id) in updates.items()
+        ]
+        updated: set[UUID] = set()
+        try:
+            if rows:
+                async with self.session.begin_nested():
+                    updated.update(await self.payment_repo.bulk_transition_status(rows))
         except Exception as e:
-            error_message = str(e)
-            logger.exception("Error processing webhook", error=error_message)
-            await self.session.rollback()
+            # Find the failing rows: apply the updates one by one, each in its own savepoint
+            logger.warning("Batched webhook update failed, retrying per event", error=str(e))
+            for row in rows:
+                try:
+                    async with self.session.begin_nested():
+                        updated.update(await self.payment_repo.bulk_transition_status([row]))
+                except Exception as e:
+                    logger.exception("Error processing webhook", error=str(e))
+                    for event_id in events_by_transaction[row[0]]:
+                        errors[event_id] = str(e)
 
-        await self.webhook_repo.mark_processed(event, error_message=error_message)
+        for transaction_id, (status, _, event_id) in updates.items():
+            if transaction_id not in updated and errors[event_id] is None:
+                logger.info(
+                    "Ignored out-of-order webhook",
+                    transaction_id=str(transaction_id),
+                    status=status.value,
+                    event_id=str(event_id),
+                )
+
+        now = datetime.utcnow()
+        report = ProcessingReport(events=len(events))
+        outcomes = []
+        for event in events:
+            error_message = errors[event.id]
+            next_attempt_at = dead_lettered_at = None
+            if error_message is not None:
+                next_attempt_at, dead_lettered_at = retry_schedule(event.attempts + 1, now)
+                report.failed += 1
+                report.dead_lettered += dead_lettered_at is not None
+            outcomes.append((event.id, error_message, next_attempt_at, dead_lettered_at))
+        await self.webhook_repo.bulk_mark_processed(outcomes, now)
         await self.session.commit()
+        logger.info(
+            "Processed webhook events",
+            events=report.events,
+            transactions_updated=len(updated),
+            failed=report.failed,
+            dead_lettered=report.dead_lettered,
+        )
+        return report
@@ -0,0 +1,149 @@
+"""Long-lived asyncio consumer for the webhook event stream"""
+import asyncio
+import os
+import socket
+import time
+
+import structlog
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import WEBHOOK_PROCESSING_LAG
+from app.services.webhook_service import WebhookService
+
+logger = structlog.get_logger()
+
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WebhookStreamConsumer:
+    """
+    Processes webhook events from WEBHOOK_STREAM as a member of
+    WEBHOOK_CONSUMER_GROUP.
+
+    One event loop and one connection pool serve the whole run. Entries are
+    read batch_size at a time and each read is processed as one batch
+    (WebhookService.process_events) in its own session, up to concurrency
+    batches at once. A batch's entries are acknowledged and deleted from the
+    stream once its events have been handled (WebhookService records
+    per-event errors on the events themselves). If handling raises, e.g. the
+    database is unreachable, the entries stay pending and are reclaimed after
+    claim_idle_ms by whichever consumer of the group is polling, so events of
+    a crashed consumer are not lost.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        session_factory: async_sessionmaker[AsyncSession],
+        consumer_name: str | None = None,
+        concurrency: int | None = None,
+        claim_idle_ms: int | None = None,
+        batch_size: int | None = None,
+        block_ms: int = 1000,
+    ):
+        self.redis = redis
+        self.session_factory = session_factory
+        self.consumer_name = consumer_name or default_consumer_name()
+        self.concurrency = concurrency or settings.WEBHOOK_CONSUMER_CONCURRENCY
+        self.claim_idle_ms = claim_idle_ms or settings.WEBHOOK_CONSUMER_CLAIM_IDLE_MS
+        self.batch_size = batch_size or settings.WEBHOOK_CONSUMER_BATCH_SIZE
+        self.block_ms = block_ms
+        self.processed = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._in_flight: set[bytes] = set()
+        self._claim_cursor = "0-0"
+
+    async def run(self, stop: asyncio.Event | None = None, burst: bool = False) -> None:
+        """
+        Consume until stop is set; with burst, return once the stream has
+        nothing new or reclaimable left.
+        """
+        stop = stop or asyncio.Event()
+        await self._ensure_group()
+        logger.info(
+            "Webhook consumer started",
+            consumer=self.consumer_name,
+            concurrency=self.concurrency,
+        )
+        try:
+            while not stop.is_set():
+                if len(self._tasks) >= self.concurrency:
+                    await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                entries = await self._reclaim(self.batch_size) or await self._read(
+                    self.batch_size, block=not burst
+                )
+                if not entries:
+                    if burst:
+                        break
+                    continue
+                self._in_flight.update(entry_id for entry_id, _ in entries)
+                task = asyncio.create_task(self._handle(entries))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            logger.info(
+                "Webhook consumer stopped", consumer=self.consumer_name, processed=self.processed
+            )
+
+    async def _ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(
+                settings.WEBHOOK_STREAM, settings.WEBHOOK_CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _read(self, count: int, block: bool) -> list:
+        response = await self.redis.xreadgroup(
+            settings.WEBHOOK_CONSUMER_GROUP,
+            self.consumer_name,
+            {settings.WEBHOOK_STREAM: ">"},
+            count=count,
+            block=self.block_ms if block else None,
+        )
+        return response[0][1] if response else []
+
+    async def _reclaim(self, count: int) -> list:
+        """Entries another consumer (or this one) took but did not acknowledge in time"""
+        self._claim_cursor, entries, _ = await self.redis.xautoclaim(
+            settings.WEBHOOK_STREAM,
+            settings.WEBHOOK_CONSUMER_GROUP,
+            self.consumer_name,
+            min_idle_time=self.claim_idle_ms,
+            start_id=self._claim_cursor,
+            count=count,
+        )
+        # Slow entries this consumer is still handling are not started twice
+        return [entry for entry in entries if entry[0] not in self._in_flight]
+
+    async def _handle(self, entries: list) -> None:
+        entry_ids = [entry_id for entry_id, _ in entries]
+        event_ids = [fields[b"event_id"].decode() for _, fields in entries]
+        try:
+            async with self.session_factory() as session:
+                await WebhookService(session).process_events(event_ids)
+            # Stream entry IDs start with the time the entry was added (ms since the epoch)
+            processed_at_ms = time.time() * 1000
+            for entry_id in entry_ids:
+                WEBHOOK_PROCESSING_LAG.observe(
+                    (processed_at_ms - int(entry_id.split(b"-", 1)[0])) / 1000
+                )
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.xack(settings.WEBHOOK_STREAM, settings.WEBHOOK_CONSUMER_GROUP, *entry_ids)
+            pipeline.xdel(settings.WEBHOOK_STREAM, *entry_ids)
+            await pipeline.execute()
+            self.processed += len(entries)
+        except Exception as e:
+            # Left pending: reclaimed and retried after claim_idle_ms (processing is idempotent)
+            logger.exception("Webhook batch handling failed", events=len(entries), error=str(e))
+        finally:
+            self._in_flight.difference_update(entry_ids)
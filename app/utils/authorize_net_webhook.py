@@ -1,8 +1,67 @@
 """Utilities for Authorize.Net webhook verification"""
 import hmac
 import hashlib
+from collections.abc import Iterable
 from typing import Optional
 
+SIGNATURE_PREFIX = "sha512"
+DIGEST_SIZE = hashlib.sha512().digest_size
+
+
+def compute_signature(payload: bytes, signature_key_hex: str) -> str:
+    """X-ANET-Signature header value for a payload ("SHA512=<hex digest>")"""
+    digest = hmac.new(bytes.fromhex(signature_key_hex), payload, hashlib.sha512).hexdigest()
+    return f"SHA512={digest.upper()}"
+
+
+class WebhookSignatureVerifier:
+    """
+    Verifies webhook signatures against one or more signature keys.
+
+    Keys are decoded once and each is kept as a pre-keyed HMAC-SHA512 that is
+    copied per webhook, so verifying does not re-parse the hex key or redo the
+    HMAC key setup. Keys are tried in order: the current key first, then keys
+    still accepted while a rotation is in progress (Authorize.Net signs with
+    the new key as soon as it is generated, but retries of older deliveries
+    may still carry the previous one).
+    """
+
+    def __init__(self, signature_keys_hex: Iterable[str]):
+        # Blank keys are ignored; a key that is not hex fails here, at startup
+        self._macs = []
+        for position, key_hex in enumerate(signature_keys_hex):
+            if not key_hex or not key_hex.strip():
+                continue
+            try:
+                key = bytes.fromhex(key_hex.strip())
+            except ValueError:
+                raise ValueError(f"Webhook signature key #{position + 1} is not hex") from None
+            self._macs.append(hmac.new(key, digestmod=hashlib.sha512))
+
+    def match(self, signature_header: Optional[str], payload: bytes) -> Optional[int]:
+        """Index of the key that signed the payload, or None if the signature is invalid"""
+        if not signature_header:
+            return None
+        algorithm, _, digest_hex = signature_header.partition("=")
+        if algorithm.lower() != SIGNATURE_PREFIX:
+            return None
+        try:
+            provided = bytes.fromhex(digest_hex.strip())
+        except ValueError:
+            return None
+        if len(provided) != DIGEST_SIZE:
+            return None
+        for index, template in enumerate(self._macs):
+            mac = template.copy()
+            mac.update(payload)
+            if hmac.compare_digest(mac.digest(), provided):
+                return index
+        return None
+
+    def verify(self, signature_header: Optional[str], payload: bytes) -> bool:
+        """Whether the payload was signed with one of the keys"""
+        return self.match(signature_header, payload) is not None
+
 
 def verify_signature(signature_header: Optional[str], payload: bytes, signature_key_hex: str) -> bool:
     """
@@ -10,19 +69,10 @@ def verify_signature(signature_header: Optional[str], payload: bytes, signature_
 
     Header value format: "SHA512=<hex digest>"
     Digest is HMAC-SHA512 over the raw payload using the signature key (hex string) as key.
+    For repeated verification use a WebhookSignatureVerifier built once.
     """
-    if not signature_header or not signature_key_hex:
-        return False
-
-    parts = signature_header.split("=", 1)
-    if len(parts) != 2 or parts[0].lower() != "sha512":
-        return False
-
     try:
-        key = bytes.fromhex(signature_key_hex)
+        verifier = WebhookSignatureVerifier([signature_key_hex])
     except ValueError:
         return False
-
-    expected = hmac.new(key, payload, hashlib.sha512).hexdigest()
-    provided = parts[1].strip().lower()
-    return hmac.compare_digest(expected, provided)
+    return verifier.verify(signature_header, payload)
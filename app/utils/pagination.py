@@ -0,0 +1,24 @@
+"""Opaque keyset cursors for (created_at, id) ordered listings"""
+import base64
+from datetime import datetime
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode the last row of a page as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises ValueError for anything that is not a well-formed cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -1,6 +1,7 @@
 """Alembic environment configuration"""
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 import asyncio
 
@@ -11,15 +12,8 @@ from app.models import *  # Import all models
 # this is the Alembic Config object
 config = context.config
 
-# Override sqlalchemy.url with sync URL (Alembic needs sync URL)
-# Convert asyncpg URL to psycopg2 URL for Alembic
-db_url = settings.DATABASE_URL
-if "+asyncpg" in db_url:
-    db_url = db_url.replace("+asyncpg", "+psycopg2")
-elif "postgresql+asyncpg" in db_url:
-    db_url = db_url.replace("postgresql+asyncpg", "postgresql+psycopg2")
-
-config.set_main_option("sqlalchemy.url", db_url)
+# Use the application's asyncpg URL; online migrations run on an async engine
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # Interpret the config file for Python logging
 if config.config_file_name is not None:
@@ -52,7 +46,7 @@ def do_run_migrations(connection):
 
 async def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
-    connectable = engine_from_config(
+    connectable = async_engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
@@ -0,0 +1,110 @@
+"""Baseline schema
+
+Creates the payments, transactions, idempotency_keys and webhook_events
+tables as they were before the first migration, so `alembic upgrade head`
+builds the schema on an empty database. The tables are spelled out rather
+than taken from the models, which already carry the later revisions.
+
+The application also creates its tables on startup (Base.metadata.create_all);
+tables that already exist are left alone, and the later revisions only add
+what is missing.
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0000'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TRANSACTION_TYPES = ("PURCHASE", "AUTHORIZE", "CAPTURE", "REFUND", "VOID")
+TRANSACTION_STATUSES = ("PENDING", "AUTHORIZED", "CAPTURED", "REFUNDED", "VOIDED", "FAILED")
+
+
+def _tables() -> dict[str, list[sa.Column]]:
+    """Columns of each table, in creation order; index=True columns get ix_<table>_<column>"""
+    return {
+        "payments": [
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("customer_id", sa.String(), nullable=False, index=True),
+            sa.Column("payment_method_token", sa.String(), nullable=True),
+            sa.Column("billing_address", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        ],
+        "transactions": [
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "payment_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("payments.id"),
+                nullable=False,
+            ),
+            # The status, transaction_type and customer_id indexes are replaced in 0001
+            sa.Column(
+                "transaction_type",
+                sa.Enum(*TRANSACTION_TYPES, name="transactiontype"),
+                nullable=False,
+                index=True,
+            ),
+            sa.Column(
+                "status",
+                sa.Enum(*TRANSACTION_STATUSES, name="transactionstatus"),
+                nullable=False,
+                index=True,
+            ),
+            sa.Column("authorize_net_transaction_id", sa.String(), nullable=True, index=True),
+            sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+            sa.Column("currency", sa.String(3), nullable=False),
+            sa.Column("customer_id", sa.String(), nullable=True, index=True),
+            sa.Column("customer_email", sa.String(), nullable=True),
+            sa.Column("correlation_id", sa.String(), nullable=True, index=True),
+            sa.Column("metadata", postgresql.JSONB(), nullable=True),
+            sa.Column("error_message", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        ],
+        "idempotency_keys": [
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("idempotency_key", sa.String(), nullable=False, unique=True, index=True),
+            sa.Column("request_hash", sa.String(), nullable=False),
+            sa.Column("response_body", postgresql.JSONB(), nullable=True),
+            sa.Column("status_code", sa.Integer(), nullable=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        ],
+        "webhook_events": [
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("event_type", sa.String(), nullable=False, index=True),
+            sa.Column("authorize_net_transaction_id", sa.String(), nullable=True, index=True),
+            sa.Column("raw_payload", postgresql.JSONB(), nullable=False),
+            sa.Column("processed", sa.Boolean(), nullable=False, index=True),
+            sa.Column("correlation_id", sa.String(), nullable=True, index=True),
+            sa.Column("error_message", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("processed_at", sa.DateTime(), nullable=True),
+        ],
+    }
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, columns in _tables().items():
+        # Databases created by the application at startup already have the table
+        if table not in existing:
+            op.create_table(table, *columns)
+
+
+def downgrade() -> None:
+    for table in reversed(_tables()):
+        op.drop_table(table)
+    op.execute("DROP TYPE IF EXISTS transactionstatus")
+    op.execute("DROP TYPE IF EXISTS transactiontype")
@@ -0,0 +1,81 @@
+"""Covering keyset indexes for transaction listing
+
+Replaces the single-column status / transaction_type / customer_id indexes
+with (filter, created_at, id) composites that INCLUDE the listed columns, so
+GET /transactions pages are index-only range scans. The leading filter column
+still serves the equality lookups the old indexes did.
+
+The tables themselves are created by the application on startup
+(Base.metadata.create_all); this revision only manages indexes. Indexes are
+built CONCURRENTLY so a populated transactions table stays writable.
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = '0000'
+branch_labels = None
+depends_on = None
+
+LISTING_COLUMNS = [
+    "payment_id",
+    "transaction_type",
+    "status",
+    "amount",
+    "currency",
+    "customer_id",
+    "authorize_net_transaction_id",
+    "updated_at",
+]
+
+LISTING_INDEXES = {
+    "ix_transactions_created_at_id": [],
+    "ix_transactions_status_created_at_id": ["status"],
+    "ix_transactions_transaction_type_created_at_id": ["transaction_type"],
+    "ix_transactions_customer_id_created_at_id": ["customer_id"],
+}
+
+SINGLE_COLUMN_INDEXES = {
+    "ix_transactions_status": "status",
+    "ix_transactions_transaction_type": "transaction_type",
+    "ix_transactions_customer_id": "customer_id",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, filter_columns in LISTING_INDEXES.items():
+            op.create_index(
+                name,
+                "transactions",
+                [*filter_columns, "created_at", "id"],
+                postgresql_include=[c for c in LISTING_COLUMNS if c not in filter_columns],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name in SINGLE_COLUMN_INDEXES:
+            op.drop_index(
+                name, table_name="transactions", postgresql_concurrently=True, if_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, column in SINGLE_COLUMN_INDEXES.items():
+            op.create_index(
+                name,
+                "transactions",
+                [column],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name in LISTING_INDEXES:
+            op.drop_index(
+                name, table_name="transactions", postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,28 @@
+"""In-flight lease on idempotency keys
+
+Adds idempotency_keys.locked_until. A row with a NULL status_code is a
+reservation held by the request processing that key until locked_until;
+a lapsed lease can be taken over by a retry.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by the application at startup may already have the column
+    op.execute("ALTER TABLE idempotency_keys ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP")
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "locked_until")
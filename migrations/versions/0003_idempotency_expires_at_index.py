@@ -0,0 +1,40 @@
+"""Index idempotency_keys.expires_at for compaction
+
+Lets the compaction job find the oldest expired keys with an index range
+scan instead of a sequential scan of the whole table. Built CONCURRENTLY so
+the table stays writable.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_idempotency_keys_expires_at",
+            "idempotency_keys",
+            ["expires_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_idempotency_keys_expires_at",
+            table_name="idempotency_keys",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,34 @@
+"""Status version and event time on transactions
+
+Adds transactions.status_version, bumped on every status change, and
+transactions.status_event_at, the time of the gateway event behind the
+current status. Webhook updates are conditional on the transition table in
+app/models/transaction.py, so out-of-order events cannot move a status back.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by the application at startup may already have the columns
+    op.execute(
+        "ALTER TABLE transactions "
+        "ADD COLUMN IF NOT EXISTS status_version INTEGER NOT NULL DEFAULT 0, "
+        "ADD COLUMN IF NOT EXISTS status_event_at TIMESTAMP"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("transactions", "status_event_at")
+    op.drop_column("transactions", "status_version")
@@ -0,0 +1,45 @@
+"""Deduplicate webhook deliveries by notificationId
+
+Adds webhook_events.notification_id with a unique index, so a retried
+Authorize.Net delivery is not stored (or processed) a second time. The
+index is built CONCURRENTLY so ingestion keeps running; existing rows keep
+a NULL notification_id.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by the application at startup may already have the column
+    op.execute("ALTER TABLE webhook_events ADD COLUMN IF NOT EXISTS notification_id VARCHAR")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "webhook_events_notification_id_key",
+            "webhook_events",
+            ["notification_id"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "webhook_events_notification_id_key",
+            table_name="webhook_events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("webhook_events", "notification_id")
@@ -0,0 +1,53 @@
+"""Retry bookkeeping for webhook events
+
+Adds webhook_events.attempts, next_attempt_at (exponential backoff after a
+failed attempt) and dead_lettered_at (attempts exhausted), plus a partial
+(created_at, id) index over the events still to be processed, which the
+replay pipeline scans in keyset order. The index is built CONCURRENTLY.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by the application at startup may already have the columns
+    op.execute(
+        "ALTER TABLE webhook_events "
+        "ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0, "
+        "ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP, "
+        "ADD COLUMN IF NOT EXISTS dead_lettered_at TIMESTAMP"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_webhook_events_replay",
+            "webhook_events",
+            ["created_at", "id"],
+            postgresql_where=sa.text("NOT processed AND dead_lettered_at IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_webhook_events_replay",
+            table_name="webhook_events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("webhook_events", "dead_lettered_at")
+    op.drop_column("webhook_events", "next_attempt_at")
+    op.drop_column("webhook_events", "attempts")
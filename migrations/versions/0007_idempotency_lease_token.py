@@ -0,0 +1,29 @@
+"""Owner token on idempotency leases
+
+Adds idempotency_keys.lease_token, written when a request claims or takes
+over a key. Renewing the lease, storing the response and releasing the key
+are conditional on the token, so a request whose lease lapsed and was taken
+over cannot overwrite the new holder's response.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by the application at startup may already have the column
+    op.execute("ALTER TABLE idempotency_keys ADD COLUMN IF NOT EXISTS lease_token UUID")
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "lease_token")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Per-request allocation benchmark for the Authorize.Net client.
+
+"per-request client" reproduces the old behaviour of PaymentService building a
+new AuthorizeNetClient (endpoint lookup, merchant auth, settings array) for
+every HTTP request; "singleton" reuses the process-wide client built at startup.
+The first table covers only the per-request setup the singleton removes, the
+second the full build + serialize of one purchase request.
+
+    uv run python scripts/bench_client_allocation.py --requests 2000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.authorize_net.client import (  # noqa: E402
+    AuthorizeNetClient,
+    CREATE_TRANSACTION_REQUEST,
+)
+from app.adapters.authorize_net.connection_pool import get_connection_pool  # noqa: E402
+from app.adapters.authorize_net.models import (  # noqa: E402
+    PurchaseRequest,
+    CreditCard,
+    CustomerAddress,
+    CustomerData,
+)
+
+REQUEST = PurchaseRequest(
+    amount=Decimal("10.00"),
+    credit_card=CreditCard(card_number="4111111111111111", expiration_date="2035-12"),
+    customer_address=CustomerAddress(
+        first_name="Bench",
+        last_name="Mark",
+        address="1 Main St",
+        city="Austin",
+        state="TX",
+        zip="78701",
+    ),
+    customer_data=CustomerData(customer_id="bench", email="bench@example.com"),
+    ref_id="bench",
+)
+
+
+def setup_only(get_client) -> None:
+    client = get_client()
+    client._get_transaction_settings(REQUEST.duplicate_window)
+
+
+def build(get_client) -> None:
+    client = get_client()
+    client.serialize(client.build_purchase_request(REQUEST), CREATE_TRANSACTION_REQUEST)
+
+
+def run(name: str, step, get_client, total: int) -> None:
+    started = time.perf_counter()
+    for _ in range(total):
+        step(get_client)
+    elapsed = time.perf_counter() - started
+
+    # Peak transient allocation of a single request, averaged
+    peaks = 0
+    tracemalloc.start()
+    for _ in range(total):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step(get_client)
+        peaks += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    print(f"{name:<20} {elapsed / total * 1e6:>8.1f} us/req   {peaks / total:>9.0f} B peak/req")
+
+
+def main(args) -> None:
+    pool = get_connection_pool()
+    singleton = AuthorizeNetClient(pool=pool)
+    # Warm caches (duplicate window settings) and imports
+    singleton.build_purchase_request(REQUEST)
+
+    for title, step in (("client setup", setup_only), ("build + serialize", build)):
+        print(f"{title} x {args.requests}")
+        run("per-request client", step, lambda: AuthorizeNetClient(pool=pool), args.requests)
+        run("singleton", step, lambda: singleton, args.requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    main(parser.parse_args())
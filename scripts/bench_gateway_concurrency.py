@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Concurrency benchmark for the gateway call path against a local stub gateway.
+
+Compares the old blocking call (sync client inside ``async def``) with the
+``executor`` and ``httpx`` async transports. Reports wall time, throughput and
+the worst event loop stall observed while the calls were in flight.
+
+    uv run python scripts/bench_gateway_concurrency.py --requests 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient  # noqa: E402
+from app.adapters.authorize_net.client import AuthorizeNetClient  # noqa: E402
+from app.adapters.authorize_net.models import (  # noqa: E402
+    PurchaseRequest,
+    CreditCard,
+    CustomerAddress,
+    CustomerData,
+)
+from tests.stub_gateway import StubGateway  # noqa: E402
+
+
+def make_request(i: int) -> PurchaseRequest:
+    return PurchaseRequest(
+        amount=Decimal("10.00"),
+        credit_card=CreditCard(card_number="4111111111111111", expiration_date="2035-12"),
+        customer_address=CustomerAddress(
+            first_name="Bench",
+            last_name="Mark",
+            address="1 Main St",
+            city="Austin",
+            state="TX",
+            zip="78701",
+        ),
+        customer_data=CustomerData(customer_id=f"bench-{i}", email="bench@example.com"),
+        ref_id=f"bench-{i}",
+    )
+
+
+async def measure(name: str, call, total: int) -> None:
+    """Fire ``total`` calls concurrently while sampling event loop lag"""
+    max_lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal max_lag
+        interval = 0.005
+        while not stop.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - before - interval)
+
+    monitor = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call(make_request(i)) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    ok = sum(1 for r in results if r.success)
+    print(
+        f"{name:<10} {elapsed:>8.2f}s {total / elapsed:>10.1f} req/s "
+        f"{max_lag * 1000:>10.1f} ms {ok:>6}/{total}"
+    )
+
+
+async def main(args) -> None:
+    gateway = StubGateway(latency=args.latency)
+    url = gateway.start()
+    sync_client = AuthorizeNetClient(endpoint_url=url)
+
+    print(
+        f"{args.requests} purchases, {args.latency * 1000:.0f} ms stub latency, "
+        f"concurrency limit {args.concurrency}"
+    )
+    print(f"{'mode':<10} {'wall':>9} {'throughput':>14} {'max stall':>13} {'ok':>8}")
+
+    async def blocking(request):
+        return sync_client.purchase(request)
+
+    await measure("blocking", blocking, args.requests)
+
+    for transport in ("executor", "httpx"):
+        client = AsyncAuthorizeNetClient(
+            client=sync_client, transport=transport, max_concurrency=args.concurrency
+        )
+        await measure(transport, client.purchase, args.requests)
+        await client.aclose()
+
+    gateway.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub latency in seconds")
+    asyncio.run(main(parser.parse_args()))
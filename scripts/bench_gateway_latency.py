@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Steady-traffic latency benchmark: new TLS connection per request vs keep-alive pool.
+
+Starts the stub gateway behind a throwaway self-signed certificate and sends
+sequential void requests, reporting p50/p99 for:
+- "per-request": a fresh connection (TCP + TLS handshake) per call, which is
+  what the SDK's module-level ``requests.post`` did
+- "pooled": the shared GatewayConnectionPool used by AuthorizeNetClient
+
+    uv run python scripts/bench_gateway_latency.py --requests 500
+"""
+import argparse
+import datetime
+import ipaddress
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx  # noqa: E402
+from authorizenet import constants  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+from app.adapters.authorize_net.client import AuthorizeNetClient  # noqa: E402
+from app.adapters.authorize_net.connection_pool import GatewayConnectionPool  # noqa: E402
+from app.adapters.authorize_net.models import VoidRequest  # noqa: E402
+from tests.stub_gateway import StubGateway  # noqa: E402
+
+
+def self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    """Write a localhost certificate/key pair and return their paths"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = directory / "cert.pem"
+    key_path = directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return cert_path, key_path
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+def run(name: str, post, payload: bytes, total: int) -> None:
+    samples = []
+    for _ in range(total):
+        started = time.perf_counter()
+        post(payload)
+        samples.append(time.perf_counter() - started)
+    p50, p99 = percentiles(samples)
+    print(f"{name:<12} p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms")
+
+
+def main(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = self_signed_cert(Path(tmp))
+        server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_context.load_cert_chain(cert_path, key_path)
+
+        gateway = StubGateway()
+        url = gateway.start(ssl_context=server_context)
+
+        pool = GatewayConnectionPool(pool_size=4, verify=str(cert_path))
+        client = AuthorizeNetClient(endpoint_url=url, pool=pool)
+        payload = client.render_void_request(VoidRequest(transaction_id="1", ref_id="bench"))
+
+        def per_request(body: bytes):
+            with httpx.Client(verify=str(cert_path), headers=constants.constants.headers) as c:
+                return c.post(url, content=body).content
+
+        print(f"{args.requests} sequential requests over TLS to the stub gateway")
+        run("per-request", per_request, payload, args.requests)
+        run("pooled", lambda body: pool.post(url, body), payload, args.requests)
+        print(f"pool stats: {pool.stats.snapshot()}")
+
+        pool.close()
+        gateway.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    main(parser.parse_args())
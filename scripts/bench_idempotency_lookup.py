@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Benchmark: idempotency key lookups against a large idempotency_keys table.
+
+Seeds --rows keys server-side (generate_series), --expired-fraction of them
+already expired, then measures lookup latency for live keys, compacts the
+expired ones and measures again, reporting table and index sizes at each
+step. VACUUM makes the freed pages reusable but does not shrink the files;
+--reindex rebuilds the table's indexes to show their compacted size. Seeded
+keys are removed afterwards.
+
+    uv run python scripts/bench_idempotency_lookup.py --rows 1000000 --reindex
+    uv run python scripts/bench_idempotency_lookup.py --rows 100000000 --lookups 20000
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import structlog  # noqa: E402
+from sqlalchemy import delete, text  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models.idempotency import IdempotencyKey  # noqa: E402
+from app.services.idempotency_compaction_service import (  # noqa: E402
+    IdempotencyCompactionService,
+)
+from app.services.idempotency_service import IdempotencyService  # noqa: E402
+
+PREFIX = "bench-lookup-"
+SEED_CHUNK = 1_000_000
+
+
+async def seed(rows: int, expired: int) -> None:
+    # Expired keys first so a live key's number is >= expired
+    for start in range(0, rows, SEED_CHUNK):
+        stop = min(start + SEED_CHUNK, rows)
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "INSERT INTO idempotency_keys "
+                    "(id, idempotency_key, request_hash, response_body, status_code, "
+                    " expires_at, created_at) "
+                    "SELECT gen_random_uuid(), :prefix || n, md5(n::text), "
+                    "       '{\"status\": \"captured\"}'::jsonb, 200, "
+                    "       CASE WHEN n < :expired THEN now() - interval '1 hour' "
+                    "            ELSE now() + interval '1 day' END, now() "
+                    "FROM generate_series(:start, :stop - 1) AS n"
+                ),
+                {"prefix": PREFIX, "expired": expired, "start": start, "stop": stop},
+            )
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE idempotency_keys"))
+
+
+async def lookups(rows: int, expired: int, count: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(n: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as session:
+                await IdempotencyService(session).check_idempotency(
+                    f"{PREFIX}{n}", hashlib.md5(str(n).encode()).hexdigest()
+                )
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(random.randrange(expired, rows)) for _ in range(count)))
+    latencies.sort()
+    return latencies
+
+
+async def sizes() -> str:
+    async with engine.connect() as conn:
+        table, indexes = (
+            await conn.execute(
+                text(
+                    "SELECT pg_table_size('idempotency_keys'), "
+                    "pg_indexes_size('idempotency_keys')"
+                )
+            )
+        ).one()
+    return f"table {table / 2**20:,.0f} MiB, indexes {indexes / 2**20:,.0f} MiB"
+
+
+def summary(name: str, latencies: list[float]) -> str:
+    return (
+        f"{name:<18} p50 {statistics.median(latencies) * 1e3:6.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e3:6.2f} ms"
+    )
+
+
+async def main(args) -> None:
+    # One "Idempotent request detected" line per lookup would dominate the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    expired = int(args.rows * args.expired_fraction)
+    try:
+        started = time.perf_counter()
+        await seed(args.rows, expired)
+        print(f"seeded {args.rows:,} keys ({expired:,} expired) in {time.perf_counter() - started:.0f}s")
+        print(f"before compaction: {await sizes()}")
+        await lookups(args.rows, expired, args.concurrency, args.concurrency)
+        print(summary("lookup", await lookups(args.rows, expired, args.lookups, args.concurrency)))
+
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            report = await IdempotencyCompactionService(
+                session, batch_size=args.batch_size, pause_seconds=0
+            ).compact()
+        elapsed = time.perf_counter() - started
+        print(
+            f"compacted {report.rows_reclaimed:,} keys in {report.batches} batches, "
+            f"{elapsed:.1f}s ({report.rows_reclaimed / elapsed:,.0f} rows/s)"
+        )
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE idempotency_keys"))
+            if args.reindex:
+                await conn.execute(text("REINDEX TABLE CONCURRENTLY idempotency_keys"))
+        step = "vacuum + reindex" if args.reindex else "vacuum"
+        print(f"after compaction + {step}: {await sizes()}")
+        print(summary("lookup", await lookups(args.rows, expired, args.lookups, args.concurrency)))
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.idempotency_key.startswith(PREFIX))
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--expired-fraction", type=float, default=0.9)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--reindex", action="store_true", help="rebuild indexes after compaction")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Benchmark: duplicate-request storm against the idempotency store.
+
+Stores one idempotency key, then replays --requests duplicate lookups
+(--concurrency at a time, each on its own session like a request would)
+with Postgres only and with the Redis tier in front. Reports throughput,
+p50/p99 latency, SQL statements issued and the Redis hit rate.
+
+    uv run python scripts/bench_idempotency_storm.py --requests 5000 --concurrency 50
+    uv run python scripts/bench_idempotency_storm.py --fake-redis   # no Redis server needed
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import structlog  # noqa: E402
+from sqlalchemy import delete, event  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.core.metrics import IDEMPOTENCY_CACHE_LOOKUPS  # noqa: E402
+from app.core.redis import get_async_redis_client  # noqa: E402
+from app.models.idempotency import IdempotencyKey  # noqa: E402
+from app.services.idempotency_service import (  # noqa: E402
+    IdempotencyService,
+    REDIS_KEY_PREFIX,
+    fingerprint_request,
+)
+
+REQUEST = fingerprint_request(
+    "POST",
+    "/api/v1/payments/purchase",
+    b'{"amount":"10.00","customer_id":"bench","card":"4111111111111111"}',
+)
+RESPONSE = {"transaction_id": str(uuid.uuid4()), "status": "captured", "amount": "10.00"}
+
+
+def lookups(result: str) -> float:
+    return IDEMPOTENCY_CACHE_LOOKUPS.labels(result=result)._value.get()
+
+
+async def storm(key: str, redis, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as session:
+                await IdempotencyService(session, redis).check_idempotency(key, REQUEST)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+async def main(args) -> None:
+    # One "Idempotent request detected" line per lookup would dominate the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    if args.fake_redis:
+        from fakeredis import FakeAsyncRedis
+
+        redis = FakeAsyncRedis()
+    else:
+        redis = get_async_redis_client()
+
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(1)
+    )
+
+    key = f"bench-{uuid.uuid4().hex}"
+    async with AsyncSessionLocal() as session:
+        await IdempotencyService(session).store_idempotency(key, REQUEST, RESPONSE, 200)
+    # Warm the connection pool so both runs start equal
+    await storm(key, None, args.concurrency, args.concurrency)
+
+    print(f"{args.requests} duplicate lookups, concurrency {args.concurrency}")
+    print(f"{'store':<18} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'SQL':>6} {'hit rate':>9}")
+    try:
+        for name, client in (("postgres", None), ("redis+postgres", redis)):
+            await redis.delete(REDIS_KEY_PREFIX + key)
+            statements.clear()
+            hits, misses = lookups("hit"), lookups("miss")
+            started = time.perf_counter()
+            latencies = await storm(key, client, args.requests, args.concurrency)
+            elapsed = time.perf_counter() - started
+            hits, misses = lookups("hit") - hits, lookups("miss") - misses
+            hit_rate = f"{hits / (hits + misses):.1%}" if hits + misses else "-"
+            latencies.sort()
+            print(
+                f"{name:<18} {args.requests / elapsed:>8.0f} "
+                f"{statistics.median(latencies) * 1e3:>8.2f} "
+                f"{latencies[int(len(latencies) * 0.99) - 1] * 1e3:>8.2f} "
+                f"{len(statements):>6} {hit_rate:>9}"
+            )
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.idempotency_key == key)
+            )
+            await session.commit()
+        await redis.aclose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--fake-redis", action="store_true", help="use in-process fakeredis")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""
+Benchmark: correlation ID and error handler middleware overhead.
+
+Sends --requests requests, --concurrency at a time, through the app in-process
+(httpx ASGI transport) to /health and to /payments/purchase against the stub
+gateway (and the configured database), once with the previous
+BaseHTTPMiddleware implementations of CorrelationIdMiddleware and
+ErrorHandlerMiddleware and once with the current pure ASGI ones. Reports
+throughput and p50/p99 latency.
+
+    uv run python scripts/bench_middleware.py --requests 2000 --concurrency 1 20
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx  # noqa: E402
+import structlog  # noqa: E402
+from fastapi import status  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.middleware.correlation import CorrelationIdMiddleware  # noqa: E402
+from app.middleware.error_handler import ErrorHandlerMiddleware  # noqa: E402
+
+PURCHASE = {
+    "amount": "10.00",
+    "credit_card": {"card_number": "4111111111111111", "expiration_date": "2035-12"},
+    "customer_address": {
+        "first_name": "Bench",
+        "last_name": "Mark",
+        "address": "1 Main St",
+        "city": "Austin",
+        "state": "TX",
+        "zip": "78701",
+    },
+    "customer_id": "bench-middleware",
+    "customer_email": "bench@example.com",
+}
+
+
+class BaseHTTPCorrelationIdMiddleware(BaseHTTPMiddleware):
+    """The previous CorrelationIdMiddleware"""
+
+    async def dispatch(self, request, call_next):
+        correlation_id = request.headers.get("X-Correlation-ID") or str(uuid.uuid4())
+        request.state.correlation_id = correlation_id
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(correlation_id=correlation_id)
+        structlog.get_logger().info(
+            "Request started", method=request.method, path=request.url.path
+        )
+        response = await call_next(request)
+        response.headers["X-Correlation-ID"] = correlation_id
+        structlog.get_logger().info(
+            "Request completed",
+            method=request.method,
+            path=request.url.path,
+            status_code=response.status_code,
+        )
+        return response
+
+
+class BaseHTTPErrorHandlerMiddleware(BaseHTTPMiddleware):
+    """The previous ErrorHandlerMiddleware (validation branch omitted: never reached)"""
+
+    async def dispatch(self, request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={
+                    "error": "Internal server error",
+                    "correlation_id": getattr(request.state, "correlation_id", None),
+                },
+            )
+
+
+def use_middleware(app, correlation, error_handler) -> None:
+    """Swap the app's middleware (outermost first, as add_middleware would order them)"""
+    app.user_middleware = [Middleware(error_handler), Middleware(correlation)]
+    app.middleware_stack = None
+
+
+async def run(client, method: str, url: str, requests: int, concurrency: int, **kwargs):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return requests / elapsed, latencies
+
+
+async def main(args) -> None:
+    # Request logs (and the refId truncation warning per purchase) would dominate the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+
+    from fakeredis import FakeAsyncRedis
+
+    from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient, TRANSPORT_HTTPX
+    from app.adapters.authorize_net.client import AuthorizeNetClient
+    from app.adapters.authorize_net.connection_pool import AsyncGatewayConnectionPool
+    from app.api.v1.dependencies import get_authorize_net_client, get_current_user, get_redis
+    from app.core.database import Base, engine
+    from app.main import app
+    from tests.stub_gateway import StubGateway
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    gateway = StubGateway()
+    gateway_client = AsyncAuthorizeNetClient(
+        client=AuthorizeNetClient(),
+        transport=TRANSPORT_HTTPX,
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(gateway.ahandle)),
+    )
+    redis = FakeAsyncRedis()
+    app.dependency_overrides.update(
+        {
+            get_current_user: lambda: {"sub": "bench"},
+            get_authorize_net_client: lambda: gateway_client,
+            get_redis: lambda: redis,
+        }
+    )
+    endpoints = [
+        ("/health", "GET", "/health", {}),
+        ("/purchase", "POST", "/api/v1/payments/purchase", {"json": PURCHASE}),
+    ]
+    variants = [
+        ("BaseHTTP", BaseHTTPCorrelationIdMiddleware, BaseHTTPErrorHandlerMiddleware),
+        ("pure ASGI", CorrelationIdMiddleware, ErrorHandlerMiddleware),
+    ]
+
+    print(f"{args.requests} requests per run (in-process, stub gateway)")
+    print(f"{'endpoint':<10} {'conc':>5} {'middleware':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for name, method, url, kwargs in endpoints:
+                for concurrency in args.concurrency:
+                    for label, correlation, error_handler in variants:
+                        use_middleware(app, correlation, error_handler)
+                        # Warm up pools and the middleware stack
+                        await run(client, method, url, concurrency * 5, concurrency, **kwargs)
+                        rate, latencies = await run(
+                            client, method, url, args.requests, concurrency, **kwargs
+                        )
+                        print(
+                            f"{name:<10} {concurrency:>5} {label:<10} {rate:>8.0f} "
+                            f"{statistics.median(latencies) * 1e3:>8.2f} "
+                            f"{latencies[int(len(latencies) * 0.99) - 1] * 1e3:>8.2f}"
+                        )
+    finally:
+        app.dependency_overrides.clear()
+        await gateway_client.aclose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 20])
+    asyncio.run(main(parser.parse_args()))
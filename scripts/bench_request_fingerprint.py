@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark: idempotency request hashing.
+
+Compares what the payment routes used to do (model_dump(), then
+json.dumps(sort_keys=True) + SHA-256 once for the check and again for the
+store) with fingerprint_request over the raw body, for purchase payloads with
+growing numbers of line items.
+
+    uv run python scripts/bench_request_fingerprint.py --requests 5000
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.api.v1.schemas.payment import PurchaseRequestSchema  # noqa: E402
+from app.services.idempotency_service import fingerprint_request  # noqa: E402
+
+PATH = "/api/v1/payments/purchase"
+
+
+def payload(line_items: int) -> bytes:
+    return json.dumps(
+        {
+            "amount": "10.00",
+            "credit_card": {"card_number": "4111111111111111", "expiration_date": "2035-12"},
+            "customer_address": {
+                "first_name": "Bench",
+                "last_name": "Mark",
+                "address": "1 Main St",
+                "city": "Austin",
+                "state": "TX",
+                "zip": "78701",
+            },
+            "customer_id": "bench",
+            "customer_email": "bench@example.com",
+            "line_items": [
+                {
+                    "item_id": f"sku-{i}",
+                    "name": f"Widget {i}",
+                    "description": "A widget with a reasonably long description " * 3,
+                    "quantity": "2",
+                    "unit_price": "5.00",
+                }
+                for i in range(line_items)
+            ],
+        }
+    ).encode()
+
+
+def dump_and_hash_twice(body: bytes, model: PurchaseRequestSchema) -> str:
+    request_body = model.model_dump()
+    for _ in range(2):
+        request_str = json.dumps(request_body, sort_keys=True, default=str)
+        request_hash = hashlib.sha256(request_str.encode()).hexdigest()
+    return request_hash
+
+
+def fingerprint_once(body: bytes, model: PurchaseRequestSchema) -> str:
+    return fingerprint_request("POST", PATH, body)
+
+
+def timed(fn, body: bytes, model: PurchaseRequestSchema, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        fn(body, model)
+    return (time.perf_counter() - started) / requests
+
+
+def main(args) -> None:
+    print(f"{'line items':>10} {'body KB':>8} {'dump+hash x2 us':>16} {'fingerprint us':>15} {'speedup':>8}")
+    for line_items in args.line_items:
+        body = payload(line_items)
+        model = PurchaseRequestSchema.model_validate_json(body)
+        before = timed(dump_and_hash_twice, body, model, args.requests)
+        after = timed(fingerprint_once, body, model, args.requests)
+        print(
+            f"{line_items:>10} {len(body) / 1024:>8.1f} {before * 1e6:>16.1f} "
+            f"{after * 1e6:>15.1f} {before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--line-items", type=int, nargs="+", default=[0, 30, 100, 500])
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark: PyXB object graph + SDK serialization vs precompiled templates.
+
+For each createTransactionRequest flavour, times building the PyXB contract
+objects and serializing them (what AuthorizeNetClient used to post) against
+rendering the same document from TransactionTemplates.
+
+    uv run python scripts/bench_request_serialization.py --requests 2000
+"""
+import argparse
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.authorize_net.client import (  # noqa: E402
+    AuthorizeNetClient,
+    CREATE_TRANSACTION_REQUEST,
+)
+from app.adapters.authorize_net.models import (  # noqa: E402
+    PurchaseRequest,
+    CaptureRequest,
+    VoidRequest,
+    RefundRequest,
+    CreditCard,
+    CustomerAddress,
+    CustomerData,
+    LineItem,
+)
+
+PURCHASE = PurchaseRequest(
+    amount=Decimal("10.00"),
+    credit_card=CreditCard(card_number="4111111111111111", expiration_date="2035-12"),
+    customer_address=CustomerAddress(
+        first_name="Bench",
+        last_name="Mark",
+        address="1 Main St",
+        city="Austin",
+        state="TX",
+        zip="78701",
+    ),
+    customer_data=CustomerData(customer_id="bench", email="bench@example.com"),
+    invoice_number="INV-1",
+    description="Benchmark order",
+    line_items=[LineItem("sku-1", "Widget", "A widget", "2", "5.00")],
+    ref_id="bench",
+)
+
+CASES = [
+    ("purchase", PURCHASE),
+    ("capture", CaptureRequest(amount=Decimal("10.00"), transaction_id="1", ref_id="bench")),
+    ("void", VoidRequest(transaction_id="1", ref_id="bench")),
+    (
+        "refund",
+        RefundRequest(
+            amount=Decimal("10.00"), transaction_id="1", card_number_last4="1111", ref_id="bench"
+        ),
+    ),
+]
+
+
+def per_call_us(func, total: int) -> float:
+    started = time.perf_counter()
+    for _ in range(total):
+        func()
+    return (time.perf_counter() - started) / total * 1e6
+
+
+def main(args) -> None:
+    client = AuthorizeNetClient()
+    print(f"{args.requests} renders per case")
+    print(f"{'case':<10} {'pyxb':>10} {'template':>10} {'speedup':>8}")
+    for name, request in CASES:
+        build = getattr(client, f"build_{name}_request")
+        render = getattr(client, f"render_{name}_request")
+        # Warm caches (transaction settings) on both paths
+        client.serialize(build(request), CREATE_TRANSACTION_REQUEST)
+        render(request)
+
+        pyxb = per_call_us(
+            lambda: client.serialize(build(request), CREATE_TRANSACTION_REQUEST),
+            args.requests,
+        )
+        template = per_call_us(lambda: render(request), args.requests)
+        print(f"{name:<10} {pyxb:>8.1f}us {template:>8.1f}us {pyxb / template:>7.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark: response parsing cost per recorded gateway response.
+
+For every fixture in tests/fixtures/authorize_net/, times:
+- "sdk": what the SDK controllers did with every response (PyXB
+  CreateFromDocument, re-serialize, lxml.objectify) followed by hasattr probing;
+  sampled with 1/100 of the iterations since it is orders of magnitude slower
+- "objectify": lxml.objectify straight from the raw bytes plus hasattr probing
+  (the previous _parse_response)
+- "pull": a streaming read of the same leaf fields with lxml's
+  XMLPullParser (tag-filtered "end" events, no XPath); the tree is still
+  built incrementally but never walked
+- "target": a parser target (start/data/end callbacks) that builds no tree
+  and ignores every event, the floor for any tree-free parser
+- "reader": app.adapters.authorize_net.responses, which only looks up the
+  fields the outcome needs
+
+    uv run python scripts/bench_response_parsing.py --iterations 2000
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from authorizenet import apicontractsv1, constants  # noqa: E402
+from lxml import etree, objectify  # noqa: E402
+
+from app.adapters.authorize_net.responses import (  # noqa: E402
+    NAMESPACE,
+    read_transaction_response,
+    read_subscription_response,
+    read_settled_batch_list_response,
+    read_transaction_list_response,
+    read_transaction_details_response,
+)
+
+FIXTURES = project_root / "tests" / "fixtures" / "authorize_net"
+
+# Leaf elements the readers return, for the streaming variants
+PULL_TAGS = [
+    f"{{{NAMESPACE}}}{name}"
+    for name in (
+        "resultCode",
+        "code",
+        "text",
+        "subscriptionId",
+        "responseCode",
+        "transId",
+        "description",
+        "errorCode",
+        "errorText",
+        "batchId",
+        "settlementTimeUTC",
+        "settlementState",
+        "submitTimeUTC",
+        "transactionStatus",
+        "invoiceNumber",
+        "settleAmount",
+        "authAmount",
+        "refTransId",
+        "transactionType",
+        "totalNumInResultSet",
+    )
+]
+
+# Fixture name prefix -> reader; everything else is a createTransactionResponse
+READERS = {
+    "subscription": read_subscription_response,
+    "settled_batch_list": read_settled_batch_list_response,
+    "transaction_list": read_transaction_list_response,
+    "transaction_details": read_transaction_details_response,
+}
+
+
+def sdk_tree(content: bytes):
+    """Mirror of APIOperationBase.execute's response handling"""
+    text = content.decode("utf-8")[1:]  # strip BOM
+    try:
+        response = apicontractsv1.CreateFromDocument(text)
+        xml = response.toxml(encoding=constants.constants.xml_encoding)
+        xml = xml.replace(constants.constants.nsNamespace1, b"")
+        return objectify.fromstring(xml.replace(constants.constants.nsNamespace2, b""))
+    except Exception:
+        return objectify.fromstring(text.replace('encoding="utf-8"', ""))
+
+
+def probe(response):
+    result = {"result_code": response.messages.resultCode}
+    trans = response.transactionResponse if hasattr(response, "transactionResponse") else None
+    if trans is not None and hasattr(trans, "messages"):
+        message = trans.messages.message[0]
+        result.update(
+            response_code=str(trans.responseCode) if hasattr(trans, "responseCode") else None,
+            transaction_id=str(trans.transId) if hasattr(trans, "transId") else None,
+            message_code=str(message.code),
+            message_description=message.description,
+        )
+    elif trans is not None and hasattr(trans, "errors"):
+        error = trans.errors.error[0]
+        result.update(error_code=str(error.errorCode), error_text=error.errorText)
+    else:
+        message = response.messages.message[0]
+        result.update(error_code=str(message.code), error_text=message.text)
+    if hasattr(response, "subscriptionId"):
+        result["subscription_id"] = str(response.subscriptionId)
+    return result
+
+
+def sdk(content: bytes):
+    return probe(sdk_tree(content))
+
+
+def objectify_probe(content: bytes):
+    return probe(objectify.fromstring(content))
+
+
+def pull(content: bytes) -> dict:
+    parser = etree.XMLPullParser(events=("end",), tag=PULL_TAGS)
+    parser.feed(content)
+    parser.close()
+    fields = {}
+    for _, element in parser.read_events():
+        fields.setdefault(etree.QName(element).localname, element.text)
+    return fields
+
+
+class NullTarget:
+    def start(self, tag, attrib):
+        pass
+
+    def data(self, data):
+        pass
+
+    def end(self, tag):
+        pass
+
+    def close(self):
+        return None
+
+
+def target(content: bytes) -> None:
+    etree.fromstring(content, etree.XMLParser(target=NullTarget()))
+
+
+def per_call_us(func, content: bytes, total: int, rounds: int = 5) -> float:
+    """Best of several rounds, to keep scheduler noise out of the comparison"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(total):
+            func(content)
+        best = min(best, time.perf_counter() - started)
+    return best / total * 1e6
+
+
+def main(args) -> None:
+    # PyXB logs every binding it cannot map (newer elements, error documents)
+    logging.getLogger("pyxb").setLevel(logging.CRITICAL)
+    logging.getLogger("authorizenet.sdk").setLevel(logging.CRITICAL)
+
+    print(f"{args.iterations} parses per fixture (us/response)")
+    print(
+        f"{'fixture':<34} {'bytes':>6} {'sdk':>8} {'objectify':>10} {'pull':>8} {'target':>8} "
+        f"{'reader':>8}"
+    )
+    for path in sorted(FIXTURES.glob("*.xml")):
+        content = path.read_bytes()
+        reader = next(
+            (r for prefix, r in READERS.items() if path.name.startswith(prefix)),
+            read_transaction_response,
+        )
+        sdk_us = per_call_us(sdk, content, max(args.iterations // 100, 1))
+        objectify_us = per_call_us(objectify_probe, content, args.iterations)
+        pull_us = per_call_us(pull, content, args.iterations)
+        target_us = per_call_us(target, content, args.iterations)
+        reader_us = per_call_us(reader, content, args.iterations)
+        print(
+            f"{path.name:<34} {len(content):>6} {sdk_us:>8.1f} {objectify_us:>10.1f} "
+            f"{pull_us:>8.1f} {target_us:>8.1f} {reader_us:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Benchmark: streaming transaction export throughput and peak memory.
+
+Seeds --rows transactions under a throwaway customer, streams them through
+TransactionExportService twice (timed, then under tracemalloc, which slows
+it down) and reports rows/s and the peak traced memory, then deletes the
+seeded rows. Peak memory should track --batch-size, not --rows.
+
+    uv run python scripts/bench_transaction_export.py --rows 100000 --format csv
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.models.payment import Payment  # noqa: E402
+from app.models.transaction import Transaction, TransactionStatus, TransactionType  # noqa: E402
+from app.services.export_service import TransactionExportService  # noqa: E402
+
+
+async def seed(session, customer_id: str, rows: int) -> uuid.UUID:
+    payment_id = uuid.uuid4()
+    await session.execute(insert(Payment).values(id=payment_id, customer_id=customer_id))
+    started = datetime(2024, 5, 1)
+    for offset in range(0, rows, 5000):
+        await session.execute(
+            insert(Transaction),
+            [
+                dict(
+                    id=uuid.uuid4(),
+                    payment_id=payment_id,
+                    transaction_type=TransactionType.PURCHASE,
+                    status=TransactionStatus.CAPTURED,
+                    amount=10,
+                    currency="USD",
+                    customer_id=customer_id,
+                    created_at=started + timedelta(seconds=i),
+                    updated_at=started + timedelta(seconds=i),
+                )
+                for i in range(offset, min(offset + 5000, rows))
+            ],
+        )
+    await session.commit()
+    return payment_id
+
+
+async def export(service: TransactionExportService, export_format: str, customer_id: str) -> int:
+    size = 0
+    async for chunk in service.stream(export_format, customer_id=customer_id):
+        size += len(chunk)
+    return size
+
+
+async def main(args) -> None:
+    customer_id = f"bench-export-{uuid.uuid4().hex[:8]}"
+    async with AsyncSessionLocal() as session:
+        payment_id = await seed(session, customer_id, args.rows)
+        try:
+            service = TransactionExportService(session, batch_size=args.batch_size)
+            started = time.perf_counter()
+            size = await export(service, args.format, customer_id)
+            elapsed = time.perf_counter() - started
+
+            tracemalloc.start()
+            await export(service, args.format, customer_id)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            await session.rollback()
+            await session.execute(delete(Transaction).where(Transaction.payment_id == payment_id))
+            await session.execute(delete(Payment).where(Payment.id == payment_id))
+            await session.commit()
+
+    print(
+        f"{args.rows} rows ({args.format}, batch {args.batch_size}): "
+        f"{args.rows / elapsed:,.0f} rows/s, {size / 1e6:.1f} MB out, "
+        f"peak traced memory {peak / 1e6:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Benchmark: webhook processing throughput, RQ worker vs stream consumer.
+
+Seeds --events authorized transactions with one capture webhook event each,
+then times draining them with the forking RQ Worker that
+scripts/rq_worker.py runs (fork, fresh event loop and new database
+connection per job) and with WebhookStreamConsumer (one loop, one pool,
+--concurrency batches of --batch-size events at a time; a batch of 1 is the
+old per-event processing). --fake-redis uses in-memory fakeredis; the
+forked RQ children then lose their job bookkeeping, but the database work
+being timed is unaffected.
+
+    uv run python scripts/bench_webhook_consumer.py --events 500 --fake-redis
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import sys
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import structlog  # noqa: E402
+from fakeredis import FakeAsyncRedis, FakeRedis  # noqa: E402
+from redis import Redis  # noqa: E402
+from redis.asyncio import Redis as AsyncRedis  # noqa: E402
+from rq import Queue, Worker  # noqa: E402
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models.payment import Payment  # noqa: E402
+from app.models.transaction import Transaction, TransactionStatus, TransactionType  # noqa: E402
+from app.models.webhook_event import WebhookEvent  # noqa: E402
+from app.tasks.webhook_consumer import WebhookStreamConsumer  # noqa: E402
+
+EVENT_TYPE = "net.authorize.payment.authcapture.created"
+
+
+async def seed(events: int) -> tuple[Payment, list[str]]:
+    async with AsyncSessionLocal() as session:
+        payment = Payment(customer_id=f"bench-consumer-{uuid.uuid4().hex[:8]}")
+        session.add(payment)
+        await session.flush()
+        event_ids = []
+        for _ in range(events):
+            trans_id = str(uuid.uuid4().int % 10**11)
+            session.add(
+                Transaction(
+                    payment_id=payment.id,
+                    transaction_type=TransactionType.AUTHORIZE,
+                    status=TransactionStatus.AUTHORIZED,
+                    authorize_net_transaction_id=trans_id,
+                    amount=Decimal("10.00"),
+                    currency="USD",
+                )
+            )
+            event = WebhookEvent(
+                event_type=EVENT_TYPE,
+                authorize_net_transaction_id=trans_id,
+                raw_payload={"eventType": EVENT_TYPE, "payload": {"id": trans_id}},
+            )
+            session.add(event)
+            await session.flush()
+            event_ids.append(str(event.id))
+        await session.commit()
+    return payment, event_ids
+
+
+async def processed(event_ids: list[str]) -> int:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(func.count()).where(WebhookEvent.id.in_(event_ids), WebhookEvent.processed)
+        )
+        return result.scalar_one()
+
+
+async def cleanup(payments: list[Payment], event_ids: list[str]) -> None:
+    async with AsyncSessionLocal() as session:
+        ids = [p.id for p in payments]
+        await session.execute(delete(WebhookEvent).where(WebhookEvent.id.in_(event_ids)))
+        await session.execute(delete(Transaction).where(Transaction.payment_id.in_(ids)))
+        await session.execute(delete(Payment).where(Payment.id.in_(ids)))
+        await session.commit()
+
+
+def run_async(coro):
+    """Run one step on a fresh loop, leaving no pooled connections behind for forked workers"""
+
+    async def step():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(step())
+
+
+def rq_worker(redis, event_ids: list[str]) -> float:
+    """What scripts/rq_worker.py runs: a forking Worker, one job per event"""
+    queue = Queue("webhooks", connection=redis)
+    queue.enqueue_many(
+        [
+            Queue.prepare_data("app.tasks.webhook_tasks.process_webhook_event", args=(event_id,))
+            for event_id in event_ids
+        ]
+    )
+    started = time.perf_counter()
+    Worker([queue], connection=redis).work(burst=True)
+    return time.perf_counter() - started
+
+
+async def stream_consumer(
+    redis, event_ids: list[str], concurrency: int, batch_size: int
+) -> float:
+    pipeline = redis.pipeline(transaction=False)
+    for event_id in event_ids:
+        pipeline.xadd(settings.WEBHOOK_STREAM, {"event_id": event_id})
+    await pipeline.execute()
+    consumer = WebhookStreamConsumer(
+        redis, AsyncSessionLocal, concurrency=concurrency, batch_size=batch_size
+    )
+    started = time.perf_counter()
+    await consumer.run(burst=True)
+    return time.perf_counter() - started
+
+
+def main(args) -> None:
+    # Per-job log lines (and RQ's own) would dominate the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    logging.getLogger("rq").setLevel(logging.CRITICAL)
+    if args.fake_redis:
+        redis, async_redis = FakeRedis(), FakeAsyncRedis()
+    else:
+        redis, async_redis = Redis.from_url(settings.REDIS_URL), AsyncRedis.from_url(settings.REDIS_URL)
+
+    payments, all_event_ids = [], []
+    print(f"{args.events} webhook events")
+    print(f"{'worker':<24} {'seconds':>8} {'events/s':>9} {'processed':>10}")
+    try:
+        payment, event_ids = run_async(seed(args.events))
+        payments.append(payment)
+        all_event_ids += event_ids
+        elapsed = rq_worker(redis, event_ids)
+        print(
+            f"{'rq_worker.py':<24} {elapsed:>8.1f} {args.events / elapsed:>9.0f} "
+            f"{run_async(processed(event_ids)):>10}"
+        )
+
+        for concurrency, batch_size in itertools.product(args.concurrency, args.batch_size):
+            payment, event_ids = run_async(seed(args.events))
+            payments.append(payment)
+            all_event_ids += event_ids
+            elapsed = run_async(stream_consumer(async_redis, event_ids, concurrency, batch_size))
+            name = f"consumer x{concurrency} batch {batch_size}"
+            print(
+                f"{name:<24} {elapsed:>8.1f} {args.events / elapsed:>9.0f} "
+                f"{run_async(processed(event_ids)):>10}"
+            )
+    finally:
+        run_async(cleanup(payments, all_event_ids))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--fake-redis", action="store_true", help="no Redis server needed")
+    main(parser.parse_args())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark: webhook signature verification.
+
+Compares what the webhook route used to do (decode the hex key and build a
+new HMAC per webhook, then compare hex digests) with WebhookSignatureVerifier
+(pre-keyed HMAC copied per webhook), for Authorize.Net-shaped payloads of
+growing size. "rotating" verifies a webhook signed with the previous key
+while a second, current key is configured: the worst case during a rotation.
+
+    uv run python scripts/bench_webhook_signature.py --webhooks 20000
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.authorize_net_webhook import (  # noqa: E402
+    WebhookSignatureVerifier,
+    compute_signature,
+)
+
+# Authorize.Net signature keys are 128 hex characters
+CURRENT_KEY = hashlib.sha512(b"current").hexdigest().upper()
+PREVIOUS_KEY = hashlib.sha512(b"previous").hexdigest().upper()
+
+
+def payload(size_kb: int) -> bytes:
+    """A payment notification padded with line items to about size_kb KB"""
+    body = {
+        "notificationId": str(uuid.uuid4()),
+        "eventType": "net.authorize.payment.authcapture.created",
+        "eventDate": "2026-05-01T12:00:00.000Z",
+        "webhookId": str(uuid.uuid4()),
+        "payload": {
+            "responseCode": 1,
+            "authCode": "ABC123",
+            "avsResponse": "Y",
+            "authAmount": 10.0,
+            "entityName": "transaction",
+            "id": "60123456789",
+            "lineItems": [],
+        },
+    }
+    while len(json.dumps(body)) < size_kb * 1024:
+        i = len(body["payload"]["lineItems"])
+        body["payload"]["lineItems"].append(
+            {"itemId": f"sku-{i}", "name": f"Widget {i}", "quantity": 2, "unitPrice": 5.0}
+        )
+    return json.dumps(body).encode()
+
+
+def verify_per_call(signature_header: str, body: bytes, signature_key_hex: str) -> bool:
+    """The route's previous code path"""
+    parts = signature_header.split("=", 1)
+    if len(parts) != 2 or parts[0].lower() != "sha512":
+        return False
+    key = bytes.fromhex(signature_key_hex)
+    expected = hmac.new(key, body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected, parts[1].strip().lower())
+
+
+def timed(fn, webhooks: int, repeat: int) -> float:
+    """Verifications per second, best of repeat runs"""
+    assert fn()
+    return webhooks / min(timeit.repeat(fn, number=webhooks, repeat=repeat))
+
+
+def main(args) -> None:
+    single = WebhookSignatureVerifier([CURRENT_KEY])
+    rotating = WebhookSignatureVerifier([CURRENT_KEY, PREVIOUS_KEY])
+    print(f"{args.webhooks} verifications per run, best of {args.repeat}")
+    print(f"{'KB':>4} {'per-call /s':>12} {'verifier /s':>12} {'speedup':>8} {'rotating /s':>12}")
+    for size_kb in args.size_kb:
+        body = payload(size_kb)
+        header = compute_signature(body, CURRENT_KEY)
+        previous_header = compute_signature(body, PREVIOUS_KEY)
+        before = timed(
+            lambda: verify_per_call(header, body, CURRENT_KEY), args.webhooks, args.repeat
+        )
+        after = timed(lambda: single.verify(header, body), args.webhooks, args.repeat)
+        during_rotation = timed(
+            lambda: rotating.verify(previous_header, body), args.webhooks, args.repeat
+        )
+        print(
+            f"{size_kb:>4} {before:>12.0f} {after:>12.0f} {after / before:>7.2f}x "
+            f"{during_rotation:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--webhooks", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size-kb", type=int, nargs="+", default=[2, 4, 10])
+    main(parser.parse_args())
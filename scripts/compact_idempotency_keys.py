@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+Delete expired idempotency keys in bounded batches.
+
+Meant to run periodically (cron, a scheduled container); each run removes
+every key that had expired when it started, or --max-batches batches.
+
+    uv run python scripts/compact_idempotency_keys.py --batch-size 5000
+"""
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.services.idempotency_compaction_service import (  # noqa: E402
+    IdempotencyCompactionService,
+)
+
+
+async def main(args) -> None:
+    async with AsyncSessionLocal() as session:
+        service = IdempotencyCompactionService(
+            session, batch_size=args.batch_size, pause_seconds=args.pause
+        )
+        report = await service.compact(max_batches=args.max_batches)
+    print(json.dumps(asdict(report), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=None, help="seconds between batches")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Reconcile local transactions against Authorize.Net settled batches.
+
+Pages through every batch settled in the date range (Transaction Reporting
+API), diffs it against the transactions table and corrects statuses that
+disagree with the gateway.
+
+    uv run python scripts/reconcile.py --from 2024-05-01 --to 2024-05-07 --dry-run
+"""
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict
+from datetime import date, datetime, time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.services.reconciliation_service import ReconciliationService  # noqa: E402
+
+
+async def main(args) -> None:
+    client = AsyncAuthorizeNetClient()
+    try:
+        async with AsyncSessionLocal() as session:
+            service = ReconciliationService(
+                session,
+                client,
+                max_concurrency=args.concurrency,
+                page_size=args.page_size,
+            )
+            report = await service.reconcile(
+                datetime.combine(args.first, time.min),
+                datetime.combine(args.last, time.max),
+                dry_run=args.dry_run,
+                include_details=args.details,
+            )
+    finally:
+        await client.aclose()
+    print(json.dumps(asdict(report), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--from", dest="first", type=date.fromisoformat, required=True)
+    parser.add_argument("--to", dest="last", type=date.fromisoformat, required=True)
+    parser.add_argument("--dry-run", action="store_true", help="report corrections only")
+    parser.add_argument(
+        "--details", action="store_true", help="fetch details for transactions missing locally"
+    )
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--page-size", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
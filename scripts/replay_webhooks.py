@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Replay webhook events that were never processed or whose processing failed.
+
+Re-dispatches due events oldest first, throttled (--rate events/s, paused
+while the live stream backlog is high) so live processing keeps priority,
+and prints a JSON report with throughput. Failures back off exponentially
+and are dead-lettered after WEBHOOK_RETRY_MAX_ATTEMPTS attempts; meant to
+run periodically (cron, a scheduled container).
+
+    uv run python scripts/replay_webhooks.py --concurrency 2 --rate 200
+    uv run python scripts/replay_webhooks.py --since 2026-10-18T09:00 --min-age 0
+"""
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.core.redis import get_async_redis_client  # noqa: E402
+from app.services.webhook_replay_service import WebhookReplayService  # noqa: E402
+from app.utils.logging import setup_logging  # noqa: E402
+
+
+async def main(args) -> None:
+    setup_logging()
+    redis = get_async_redis_client()
+    service = WebhookReplayService(
+        AsyncSessionLocal,
+        redis,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        rate_limit=args.rate,
+        min_age_seconds=args.min_age,
+    )
+    try:
+        report = await service.replay(since=args.since, max_events=args.max_events)
+    finally:
+        await redis.aclose()
+        await engine.dispose()
+    print(json.dumps(asdict(report), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None, help="batches at once")
+    parser.add_argument("--rate", type=float, default=None, help="max events per second")
+    parser.add_argument(
+        "--min-age", type=float, default=None, help="seconds before never-attempted events qualify"
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        help="only events created from this time on (UTC unless an offset is given), "
+        "e.g. 2026-10-18T09:00 or 2026-10-18T11:00+02:00",
+    )
+    parser.add_argument("--max-events", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -1,6 +1,14 @@
 #!/usr/bin/env python
-"""RQ worker entrypoint"""
+"""
+RQ worker entrypoint.
+
+Webhook events now go to the Redis stream consumed by
+scripts/webhook_consumer.py; this worker drains jobs still queued in RQ.
+--burst exits once the queues are empty.
+"""
 import os
+import sys
+
 from rq import Worker, Queue
 
 from app.core.redis import get_redis_client
@@ -10,7 +18,7 @@ def main():
     redis_conn = get_redis_client()
     queues = [Queue(name, connection=redis_conn) for name in os.getenv("RQ_QUEUES", "webhooks").split(",")]
     worker = Worker(queues, connection=redis_conn)
-    worker.work()
+    worker.work(burst="--burst" in sys.argv[1:])
 
 
 if __name__ == "__main__":
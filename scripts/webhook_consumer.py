@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Webhook consumer entrypoint.
+
+Runs one long-lived WebhookStreamConsumer (one event loop, one database
+pool) until SIGINT/SIGTERM; run several processes for more throughput.
+
+    uv run python scripts/webhook_consumer.py --concurrency 20
+"""
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from redis.asyncio import Redis  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.tasks.webhook_consumer import WebhookStreamConsumer  # noqa: E402
+from app.utils.logging import setup_logging  # noqa: E402
+
+
+async def main(args) -> None:
+    setup_logging()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    # No request-path socket timeout here: XREADGROUP blocks for up to block_ms
+    redis = Redis.from_url(settings.REDIS_URL)
+    consumer = WebhookStreamConsumer(
+        redis, AsyncSessionLocal, consumer_name=args.name, concurrency=args.concurrency
+    )
+    try:
+        await consumer.run(stop, burst=args.burst)
+    finally:
+        await redis.aclose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--name", default=None, help="consumer name (default host-pid)")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--burst", action="store_true", help="exit once the stream is drained")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Load generator: signed Authorize.Net webhooks.
+
+Posts --webhooks signed net.authorize.payment.* notifications, --concurrency
+at a time, and reports throughput, p50/p99 latency and status codes. With
+--url it targets a running API (signing with AUTHORIZE_NET_WEBHOOK_SECRET);
+without it the app runs in-process against the configured database with an
+in-memory Redis stream, once per --window-ms value, so batching windows can be
+compared (0 = one INSERT and enqueue per concurrent arrival). --duplicates
+then redelivers every webhook, as Authorize.Net retries do, to time the
+notificationId dedup path.
+
+    uv run python scripts/webhook_load_generator.py --webhooks 5000 --concurrency 200
+    uv run python scripts/webhook_load_generator.py --url http://localhost:8000/api/v1/webhooks/authorize-net
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx  # noqa: E402
+import structlog  # noqa: E402
+from sqlalchemy import delete, event  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.utils.authorize_net_webhook import compute_signature  # noqa: E402
+
+PATH = "/api/v1/webhooks/authorize-net"
+EVENT_TYPES = [
+    "net.authorize.payment.authcapture.created",
+    "net.authorize.payment.authorization.created",
+    "net.authorize.payment.void.created",
+    "net.authorize.payment.refund.created",
+]
+
+
+def signed_webhook(ref_id: str) -> tuple[bytes, dict]:
+    body = json.dumps(
+        {
+            "notificationId": str(uuid.uuid4()),
+            "eventType": random.choice(EVENT_TYPES),
+            "eventDate": "2024-05-01T12:00:00.000Z",
+            "webhookId": str(uuid.uuid4()),
+            "payload": {
+                "responseCode": 1,
+                "authCode": "ABC123",
+                "avsResponse": "Y",
+                "authAmount": 10.0,
+                "entityName": "transaction",
+                "id": str(random.randrange(10**10, 10**11)),
+            },
+            "refId": ref_id,
+        }
+    ).encode()
+    headers = {
+        "X-ANET-Signature": compute_signature(body, settings.AUTHORIZE_NET_WEBHOOK_SECRET),
+        "Content-Type": "application/json",
+    }
+    return body, headers
+
+
+async def run(
+    client: httpx.AsyncClient,
+    url: str,
+    webhooks: int,
+    concurrency: int,
+    ref_id: str,
+    sent: list | None = None,
+):
+    """Post webhooks signed_webhook() deliveries, or replay the ones in sent"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], Counter()
+    deliveries = iter(sent) if sent else None
+
+    async def one() -> None:
+        body, headers = next(deliveries) if deliveries else signed_webhook(ref_id)
+        if sent is not None and deliveries is None:
+            sent.append((body, headers))
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(url, content=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(len(sent) if deliveries else webhooks)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return webhooks / elapsed, latencies, statuses
+
+
+def summary(name: str, rate: float, latencies: list[float], statuses: Counter, extra: str = ""):
+    print(
+        f"{name:<12} {rate:>8.0f} {statistics.median(latencies) * 1e3:>8.2f} "
+        f"{latencies[int(len(latencies) * 0.99) - 1] * 1e3:>8.2f} {extra:>8} "
+        f"{dict(statuses)}"
+    )
+
+
+async def in_process(args) -> None:
+    from fakeredis import FakeAsyncRedis
+
+    from app.api.v1.dependencies import get_webhook_ingestor, get_webhook_verifier
+    from app.core.database import AsyncSessionLocal, Base, engine
+    from app.main import app
+    from app.models.webhook_event import WebhookEvent
+    from app.services.webhook_ingestion_service import WebhookIngestor
+    from app.utils.authorize_net_webhook import WebhookSignatureVerifier
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    inserts = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *a: statement.startswith("INSERT") and inserts.append(1),
+    )
+    ref_id = f"load-{uuid.uuid4().hex[:8]}"
+    verifier = WebhookSignatureVerifier([settings.AUTHORIZE_NET_WEBHOOK_SECRET])
+    app.dependency_overrides[get_webhook_verifier] = lambda: verifier
+    transport = httpx.ASGITransport(app=app)
+    print(f"{args.webhooks} webhooks, concurrency {args.concurrency} (in-process)")
+    print(f"{'window ms':<12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'INSERTs':>8} statuses")
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for window_ms in args.window_ms:
+                ingestor = WebhookIngestor(AsyncSessionLocal, FakeAsyncRedis(), window_ms=window_ms)
+                app.dependency_overrides[get_webhook_ingestor] = lambda: ingestor
+                # Warm the connection pool
+                await run(client, PATH, args.concurrency, args.concurrency, ref_id)
+                inserts.clear()
+                sent = [] if args.duplicates else None
+                rate, latencies, statuses = await run(
+                    client, PATH, args.webhooks, args.concurrency, ref_id, sent
+                )
+                await ingestor.aclose()
+                summary(str(window_ms), rate, latencies, statuses, str(len(inserts)))
+                if sent:
+                    inserts.clear()
+                    rate, latencies, statuses = await run(
+                        client, PATH, len(sent), args.concurrency, ref_id, sent
+                    )
+                    summary(f"{window_ms} retry", rate, latencies, statuses, str(len(inserts)))
+    finally:
+        app.dependency_overrides.clear()
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(WebhookEvent).where(WebhookEvent.correlation_id == ref_id))
+            await session.commit()
+        await engine.dispose()
+
+
+async def remote(args) -> None:
+    print(f"{args.webhooks} webhooks, concurrency {args.concurrency} -> {args.url}")
+    print(f"{'target':<12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'':>8} statuses")
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        rate, latencies, statuses = await run(
+            client, args.url, args.webhooks, args.concurrency, f"load-{uuid.uuid4().hex[:8]}"
+        )
+    summary("remote", rate, latencies, statuses)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--webhooks", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--url", default=None, help="running API endpoint (default: in-process)")
+    parser.add_argument("--window-ms", type=float, nargs="+", default=[0, 5])
+    parser.add_argument(
+        "--duplicates",
+        action="store_true",
+        help="redeliver every webhook once more (same notificationId), as gateway retries",
+    )
+    args = parser.parse_args()
+    # Per-request log lines would dominate the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(remote(args) if args.url else in_process(args))
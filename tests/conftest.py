@@ -1,9 +1,16 @@
 """Pytest configuration and fixtures"""
+from contextlib import contextmanager
+
 import pytest
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.main import app
+from app.core.database import Base, build_engine
+from app.core.query_stats import track_queries
 
 
 @pytest.fixture
@@ -18,3 +25,90 @@ async def async_client():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
 
+
+@pytest.fixture
+async def db_engine():
+    """
+    Engine bound to the running test's event loop (the application engine
+    keeps pooled connections from whichever loop used it first). Skips the
+    test when the database is unreachable.
+    """
+    engine = build_engine(poolclass=NullPool)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    except (OSError, ConnectionError) as e:
+        await engine.dispose()
+        pytest.skip(f"Database not available: {e}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db_session(db_engine):
+    """Async session on db_engine"""
+    session_factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+
+
+class QueryCounter:
+    """Round trips an engine makes: statements (first keyword of each), BEGINs and COMMITs"""
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.begins = 0
+        self.commits = 0
+
+    @property
+    def round_trips(self) -> int:
+        return self.begins + len(self.statements) + self.commits
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.begins = self.commits = 0
+
+
+@pytest.fixture
+def query_counter(db_engine):
+    """QueryCounter recording db_engine's round trips for the rest of the test"""
+    counter = QueryCounter()
+
+    def on_statement(conn, cursor, statement, *args):
+        counter.statements.append(statement.split()[0])
+
+    def on_begin(conn):
+        counter.begins += 1
+
+    def on_commit(conn):
+        counter.commits += 1
+
+    listeners = [
+        ("before_cursor_execute", on_statement),
+        ("begin", on_begin),
+        ("commit", on_commit),
+    ]
+    for name, listener in listeners:
+        event.listen(db_engine.sync_engine, name, listener)
+    yield counter
+    for name, listener in listeners:
+        event.remove(db_engine.sync_engine, name, listener)
+
+
+@pytest.fixture
+def max_queries():
+    """
+    max_queries(n): context manager failing the test when the block runs more
+    than n SQL statements on any engine from build_engine (catches N+1 loads)
+    """
+
+    @contextmanager
+    def assert_max_queries(limit: int):
+        with track_queries(record_statements=True) as queries:
+            yield queries
+        assert queries.count <= limit, (
+            f"{queries.count} SQL statements, expected at most {limit}:\n"
+            + "\n".join(queries.statements)
+        )
+
+    return assert_max_queries
@@ -0,0 +1,94 @@
+"""Integration tests for the configurable database engine and its pool metrics"""
+import asyncio
+import uuid
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc, text
+
+from app.core.config import settings
+from app.core.database import InstrumentedAsyncQueuePool, build_engine
+
+
+def _sample(name: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+
+@pytest.fixture
+async def pool_name(db_engine):
+    """Metrics label unique to the test (db_engine skips it without a database)"""
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+async def test_engine_applies_pool_and_driver_settings(pool_name, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT_SECONDS", 7.0)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    engine = build_engine(name=pool_name)
+    try:
+        pool = engine.sync_engine.pool
+        assert isinstance(pool, InstrumentedAsyncQueuePool)
+        assert (pool.size(), pool._max_overflow, pool._timeout) == (3, 2, 7.0)
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SHOW statement_timeout"))).scalar() == "1500ms"
+    finally:
+        await engine.dispose()
+
+
+async def test_statement_timeout_cancels_slow_statements(pool_name, monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 100)
+    engine = build_engine(name=pool_name)
+    try:
+        async with engine.connect() as conn:
+            with pytest.raises(exc.DBAPIError, match="statement timeout"):
+                await conn.execute(text("SELECT pg_sleep(1)"))
+    finally:
+        await engine.dispose()
+
+
+async def test_pgbouncer_mode_disables_prepared_statement_caching(pool_name, monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    engine = build_engine(name=pool_name)
+    try:
+        async with engine.connect() as conn:
+            for _ in range(3):
+                assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+            # Not sent as a startup parameter, which PgBouncer would reject
+            assert (await conn.execute(text("SHOW statement_timeout"))).scalar() == "0"
+            driver = (await conn.get_raw_connection()).driver_connection
+            assert driver._stmt_cache.get_max_size() == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_pool_exports_checkout_wait_and_saturation(pool_name):
+    engine = build_engine(name=pool_name, pool_size=1, max_overflow=0, pool_timeout=0.2)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert _sample("db_pool_checked_out_connections", pool_name) == 1
+            assert _sample("db_pool_utilization_ratio", pool_name) == 1.0
+            # The only connection is in use: the next checkout waits, then times out
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        assert _sample("db_pool_checked_out_connections", pool_name) == 0
+        assert _sample("db_pool_utilization_ratio", pool_name) == 0.0
+        assert _sample("db_pool_checkout_timeouts_total", pool_name) == 1
+        assert _sample("db_pool_checkout_wait_seconds_count", pool_name) == 2
+        assert _sample("db_pool_checkout_wait_seconds_sum", pool_name) >= 0.2
+
+        # dispose() replaces the pool; the new one reports under the same name
+        await engine.dispose()
+        await asyncio.gather(*(_select_one(engine) for _ in range(3)))
+        assert _sample("db_pool_checkout_wait_seconds_count", pool_name) == 5
+        assert _sample("db_pool_checked_out_connections", pool_name) == 0
+    finally:
+        await engine.dispose()
+
+
+async def _select_one(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
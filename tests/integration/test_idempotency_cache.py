@@ -0,0 +1,200 @@
+"""Integration tests for the two-tier (Redis + Postgres) idempotency store"""
+import json
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient, TRANSPORT_HTTPX
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.connection_pool import AsyncGatewayConnectionPool
+from app.api.v1.dependencies import get_authorize_net_client, get_current_user, get_redis
+from app.core.database import get_db
+from app.core.metrics import IDEMPOTENCY_CACHE_LOOKUPS
+from app.main import app
+from app.models.idempotency import IdempotencyKey
+from app.services.idempotency_service import (
+    IdempotencyService,
+    REDIS_KEY_PREFIX,
+    fingerprint_request,
+)
+from tests.stub_gateway import StubGateway
+
+PATH = "/api/v1/payments/purchase"
+REQUEST = fingerprint_request("POST", PATH, b'{"amount":"10.00","customer_id":"cust-1"}')
+RESPONSE = {"transaction_id": "t-1", "status": "captured", "amount": Decimal("10.00")}
+REPLAYED = {
+    "response_body": {"transaction_id": "t-1", "status": "captured", "amount": "10.00"},
+    "status_code": 200,
+}
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis()
+
+
+@pytest.fixture
+def statements(db_engine):
+    """First keyword of every SQL statement sent to the database"""
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        seen.append(statement.split()[0])
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _key() -> str:
+    return f"idem-{uuid.uuid4().hex}"
+
+
+def _lookups(result: str) -> float:
+    return IDEMPOTENCY_CACHE_LOOKUPS.labels(result=result)._value.get()
+
+
+async def test_store_writes_through_and_duplicates_skip_postgres(db_session, redis, statements):
+    service = IdempotencyService(db_session, redis)
+    key = _key()
+    await service.store_idempotency(key, REQUEST, RESPONSE, 200)
+
+    ttl_ms = await redis.pttl(REDIS_KEY_PREFIX + key)
+    assert timedelta(hours=23, minutes=59) < timedelta(milliseconds=ttl_ms) <= timedelta(hours=24)
+
+    statements.clear()
+    hits = _lookups("hit")
+    for _ in range(5):
+        assert await service.check_idempotency(key, REQUEST) == REPLAYED
+    assert statements == []
+    assert _lookups("hit") == hits + 5
+
+
+async def test_miss_reads_through_postgres_and_refills(db_session, redis, statements):
+    key = _key()
+    await IdempotencyService(db_session).store_idempotency(key, REQUEST, RESPONSE, 200)
+    service = IdempotencyService(db_session, redis)
+
+    statements.clear()
+    misses = _lookups("miss")
+    assert await service.check_idempotency(key, REQUEST) == REPLAYED
+    assert statements == ["SELECT"]
+    assert _lookups("miss") == misses + 1
+
+    assert await service.check_idempotency(key, REQUEST) == REPLAYED
+    assert statements == ["SELECT"]
+    assert await redis.exists(REDIS_KEY_PREFIX + key)
+
+
+async def test_mismatched_request_is_rejected_from_cache(db_session, redis):
+    service = IdempotencyService(db_session, redis)
+    key = _key()
+    await service.store_idempotency(key, REQUEST, RESPONSE, 200)
+
+    with pytest.raises(ValueError):
+        await service.check_idempotency(
+            key, fingerprint_request("POST", PATH, b'{"amount":"11.00","customer_id":"cust-1"}')
+        )
+
+
+async def test_unknown_key_is_a_miss(db_session, redis):
+    assert await IdempotencyService(db_session, redis).check_idempotency(_key(), REQUEST) is None
+
+
+async def test_expired_row_is_not_cached(db_session, redis):
+    key = _key()
+    db_session.add(
+        IdempotencyKey(
+            idempotency_key=key,
+            request_hash="x",
+            response_body={},
+            status_code=200,
+            expires_at=datetime.utcnow() - timedelta(minutes=1),
+        )
+    )
+    await db_session.commit()
+
+    assert await IdempotencyService(db_session, redis).check_idempotency(key, REQUEST) is None
+    assert not await redis.exists(REDIS_KEY_PREFIX + key)
+
+
+async def test_redis_failure_falls_back_to_postgres(db_session):
+    class BrokenRedis:
+        async def get(self, name):
+            raise RedisConnectionError("redis is down")
+
+        async def set(self, name, value, px=None):
+            raise RedisConnectionError("redis is down")
+
+    service = IdempotencyService(db_session, BrokenRedis())
+    key = _key()
+    errors = _lookups("error")
+    await service.store_idempotency(key, REQUEST, RESPONSE, 200)
+
+    assert await service.check_idempotency(key, REQUEST) == REPLAYED
+    assert _lookups("error") == errors + 1
+
+
+async def test_cached_entry_is_plain_json(db_session, redis):
+    key = _key()
+    await IdempotencyService(db_session, redis).store_idempotency(key, REQUEST, RESPONSE, 201)
+
+    entry = json.loads(await redis.get(REDIS_KEY_PREFIX + key))
+    assert entry["status_code"] == 201
+    assert entry["response_body"] == REPLAYED["response_body"]
+
+
+async def test_duplicate_purchase_is_replayed_without_a_second_charge(db_session, redis):
+    gateway = StubGateway()
+    gateway_client = AsyncAuthorizeNetClient(
+        client=AuthorizeNetClient(),
+        transport=TRANSPORT_HTTPX,
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(gateway.ahandle)),
+    )
+
+    async def override_db():
+        yield db_session
+
+    app.dependency_overrides.update(
+        {
+            get_db: override_db,
+            get_current_user: lambda: {"sub": "test"},
+            get_authorize_net_client: lambda: gateway_client,
+            get_redis: lambda: redis,
+        }
+    )
+    body = {
+        "amount": "10.00",
+        "credit_card": {"card_number": "4111111111111111", "expiration_date": "2035-12"},
+        "customer_address": {
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "address": "1 Main St",
+            "city": "Austin",
+            "state": "TX",
+            "zip": "78701",
+        },
+        "customer_id": "cust-1",
+        "customer_email": "ada@example.com",
+    }
+    headers = {"X-Idempotency-Key": _key()}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/api/v1/payments/purchase", json=body, headers=headers)
+            second = await client.post("/api/v1/payments/purchase", json=body, headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+        await gateway_client.aclose()
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert len(gateway.requests) == 1
+    assert await redis.exists(REDIS_KEY_PREFIX + headers["X-Idempotency-Key"])
@@ -0,0 +1,59 @@
+"""Integration tests for expired idempotency key compaction"""
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.idempotency import IdempotencyKey
+from app.services.idempotency_compaction_service import IdempotencyCompactionService
+
+
+async def _seed(session, expired: int, live: int) -> str:
+    prefix = f"compact-{uuid.uuid4().hex[:8]}-"
+    now = datetime.utcnow()
+    for i in range(expired + live):
+        expires_at = now - timedelta(minutes=i + 1) if i < expired else now + timedelta(hours=1)
+        session.add(
+            IdempotencyKey(
+                idempotency_key=f"{prefix}{i}",
+                request_hash="x",
+                response_body={},
+                status_code=200,
+                expires_at=expires_at,
+            )
+        )
+    await session.commit()
+    return prefix
+
+
+async def _remaining(session, prefix: str) -> int:
+    result = await session.execute(
+        select(IdempotencyKey.id).where(IdempotencyKey.idempotency_key.startswith(prefix))
+    )
+    return len(result.all())
+
+
+async def test_expired_keys_are_deleted_in_batches(db_session):
+    prefix = await _seed(db_session, expired=7, live=3)
+
+    report = await IdempotencyCompactionService(
+        db_session, batch_size=3, pause_seconds=0
+    ).compact()
+
+    assert report.rows_reclaimed >= 7
+    assert report.batches >= 3
+    assert report.table_bytes > 0
+    assert report.index_bytes > 0
+    assert await _remaining(db_session, prefix) == 3
+
+
+async def test_max_batches_bounds_a_run(db_session):
+    await IdempotencyCompactionService(db_session, pause_seconds=0).compact()
+    prefix = await _seed(db_session, expired=5, live=0)
+
+    report = await IdempotencyCompactionService(
+        db_session, batch_size=2, pause_seconds=0
+    ).compact(max_batches=1)
+
+    assert (report.batches, report.rows_reclaimed) == (1, 2)
+    assert await _remaining(db_session, prefix) == 3
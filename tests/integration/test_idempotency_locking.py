@@ -0,0 +1,339 @@
+"""Integration tests for in-flight idempotency reservations (concurrent duplicates)"""
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient, TRANSPORT_HTTPX
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.connection_pool import AsyncGatewayConnectionPool
+from app.api.v1.dependencies import get_authorize_net_client, get_current_user, get_redis
+from app.api.v1.schemas.payment import PurchaseRequestSchema
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.models.idempotency import IdempotencyKey
+from app.services.idempotency_service import (
+    IdempotencyInProgressError,
+    IdempotencyService,
+    fingerprint_request,
+    legacy_request_hash,
+)
+from tests.stub_gateway import StubGateway
+
+DUPLICATES = 12
+PATH = "/api/v1/payments/purchase"
+REQUEST = fingerprint_request("POST", PATH, b'{"amount":"10.00","customer_id":"cust-1"}')
+RESPONSE = {"transaction_id": "t-1", "status": "captured"}
+
+
+@pytest.fixture
+def sessions(db_engine):
+    """Factory for independent sessions, one per concurrent request"""
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _key() -> str:
+    return f"idem-{uuid.uuid4().hex}"
+
+
+def _outcomes() -> dict[str, float]:
+    return {
+        outcome: REGISTRY.get_sample_value("idempotency_requests_total", {"outcome": outcome})
+        for outcome in ("claimed", "replayed", "conflict", "in_progress")
+    }
+
+
+async def _row(session, key):
+    result = await session.execute(
+        select(IdempotencyKey.status_code, IdempotencyKey.locked_until).where(
+            IdempotencyKey.idempotency_key == key
+        )
+    )
+    return result.one_or_none()
+
+
+async def test_parallel_duplicates_run_once_and_share_the_response(sessions):
+    key = _key()
+    executions = 0
+    before = _outcomes()
+
+    async def handle():
+        nonlocal executions
+        async with sessions() as session:
+            service = IdempotencyService(session)
+            replayed = await service.reserve_idempotency(key, REQUEST)
+            if replayed is not None:
+                return replayed
+            executions += 1
+            await asyncio.sleep(0.2)
+            await service.store_idempotency(key, REQUEST, RESPONSE, 200)
+            return {"response_body": RESPONSE, "status_code": 200}
+
+    results = await asyncio.gather(*(handle() for _ in range(DUPLICATES)))
+
+    assert executions == 1
+    assert results == [{"response_body": RESPONSE, "status_code": 200}] * DUPLICATES
+    after = _outcomes()
+    assert after["claimed"] - before["claimed"] == 1
+    assert after["replayed"] - before["replayed"] == DUPLICATES - 1
+
+
+async def test_lapsed_lease_is_taken_over(db_session):
+    key = _key()
+    db_session.add(
+        IdempotencyKey(
+            idempotency_key=key,
+            request_hash=REQUEST,
+            expires_at=datetime.utcnow() + timedelta(hours=24),
+            locked_until=datetime.utcnow() - timedelta(seconds=1),
+        )
+    )
+    await db_session.commit()
+
+    assert await IdempotencyService(db_session).reserve_idempotency(key, REQUEST) is None
+    row = await _row(db_session, key)
+    assert row.status_code is None
+    assert row.locked_until > datetime.utcnow()
+
+
+async def test_expired_response_is_taken_over(db_session):
+    key = _key()
+    service = IdempotencyService(db_session)
+    await service.store_idempotency(key, REQUEST, RESPONSE, 200)
+    await db_session.execute(
+        IdempotencyKey.__table__.update()
+        .where(IdempotencyKey.idempotency_key == key)
+        .values(expires_at=datetime.utcnow() - timedelta(minutes=1))
+    )
+    await db_session.commit()
+
+    assert await service.reserve_idempotency(key, REQUEST) is None
+    await service.store_idempotency(key, REQUEST, {"transaction_id": "t-2"}, 200)
+    assert await service.check_idempotency(key, REQUEST) == {
+        "response_body": {"transaction_id": "t-2"},
+        "status_code": 200,
+    }
+
+
+async def test_waiting_duplicate_times_out(db_session, sessions, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT_SECONDS", 0.2)
+    key = _key()
+    assert await IdempotencyService(db_session).reserve_idempotency(key, REQUEST) is None
+
+    before = _outcomes()
+
+    async with sessions() as session:
+        with pytest.raises(IdempotencyInProgressError):
+            await IdempotencyService(session).reserve_idempotency(key, REQUEST)
+    assert _outcomes()["in_progress"] == before["in_progress"] + 1
+
+
+async def test_in_flight_key_rejects_a_different_request(db_session, sessions):
+    key = _key()
+    assert await IdempotencyService(db_session).reserve_idempotency(key, REQUEST) is None
+
+    before = _outcomes()
+
+    async with sessions() as session:
+        with pytest.raises(ValueError):
+            await IdempotencyService(session).reserve_idempotency(
+                key, fingerprint_request("POST", PATH, b'{"amount":"11.00","customer_id":"cust-1"}')
+            )
+    assert _outcomes()["conflict"] == before["conflict"] + 1
+
+
+async def test_released_key_can_be_claimed_again(db_session):
+    key = _key()
+    service = IdempotencyService(db_session)
+    assert await service.reserve_idempotency(key, REQUEST) is None
+
+    await service.release_idempotency(key)
+
+    assert await _row(db_session, key) is None
+    assert await service.reserve_idempotency(key, REQUEST) is None
+
+
+PURCHASE = {
+    "amount": "10.00",
+    "credit_card": {"card_number": "4111111111111111", "expiration_date": "2035-12"},
+    "customer_address": {
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "address": "1 Main St",
+        "city": "Austin",
+        "state": "TX",
+        "zip": "78701",
+    },
+    "customer_id": "cust-1",
+    "customer_email": "ada@example.com",
+}
+
+
+@asynccontextmanager
+async def _api(sessions, handler):
+    """API client whose gateway calls go to handler (an httpx MockTransport handler)"""
+    gateway_client = AsyncAuthorizeNetClient(
+        client=AuthorizeNetClient(),
+        transport=TRANSPORT_HTTPX,
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(handler)),
+    )
+    redis = FakeAsyncRedis()
+
+    async def override_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides.update(
+        {
+            get_db: override_db,
+            get_current_user: lambda: {"sub": "test"},
+            get_authorize_net_client: lambda: gateway_client,
+            get_redis: lambda: redis,
+        }
+    )
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        await gateway_client.aclose()
+
+
+async def test_parallel_duplicate_purchases_charge_once(sessions):
+    gateway = StubGateway()
+    gateway.latency = 0.2
+    headers = {"X-Idempotency-Key": _key()}
+    async with _api(sessions, gateway.ahandle) as client:
+        responses = await asyncio.gather(
+            *(
+                client.post("/api/v1/payments/purchase", json=PURCHASE, headers=headers)
+                for _ in range(DUPLICATES)
+            )
+        )
+
+    assert [r.status_code for r in responses] == [200] * DUPLICATES, responses[0].text
+    assert all(r.json() == responses[0].json() for r in responses)
+    assert len(gateway.requests) == 1
+
+
+async def test_key_stored_under_the_legacy_hash_is_replayed(sessions):
+    gateway = StubGateway()
+    key = _key()
+    async with sessions() as session:
+        await IdempotencyService(session).store_idempotency(
+            key,
+            legacy_request_hash(PurchaseRequestSchema(**PURCHASE).model_dump()),
+            {"transaction_id": "t-legacy"},
+            200,
+        )
+    async with _api(sessions, gateway.ahandle) as client:
+        headers = {"X-Idempotency-Key": key}
+        replayed = await client.post("/api/v1/payments/purchase", json=PURCHASE, headers=headers)
+        other = await client.post(
+            "/api/v1/payments/purchase", json={**PURCHASE, "amount": "11.00"}, headers=headers
+        )
+
+    assert replayed.status_code == 200
+    assert replayed.json() == {"transaction_id": "t-legacy"}
+    assert other.status_code == 409
+    assert gateway.requests == []
+
+
+async def test_gateway_timeout_keeps_the_key(sessions):
+    """The charge may have gone through: the retry replays the failure instead of charging"""
+    sent = []
+
+    def time_out(request):
+        sent.append(request)
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    headers = {"X-Idempotency-Key": _key()}
+    async with _api(sessions, time_out) as client:
+        first = await client.post("/api/v1/payments/purchase", json=PURCHASE, headers=headers)
+        retry = await client.post("/api/v1/payments/purchase", json=PURCHASE, headers=headers)
+
+    assert first.status_code == retry.status_code == 500
+    assert retry.json() == first.json()
+    assert len(sent) == 1
+
+
+async def test_failure_before_the_gateway_releases_the_key(sessions):
+    gateway = StubGateway()
+    key = _key()
+    async with _api(sessions, gateway.ahandle) as client:
+        response = await client.post(
+            f"/api/v1/payments/capture/{uuid.uuid4()}", json={}, headers={"X-Idempotency-Key": key}
+        )
+
+    assert response.status_code == 400
+    assert gateway.requests == []
+    async with sessions() as session:
+        assert await _row(session, key) is None
+
+
+async def test_request_that_lost_its_lease_does_not_overwrite_the_response(db_session, sessions):
+    key = _key()
+    slow = IdempotencyService(db_session)
+    assert await slow.reserve_idempotency(key, REQUEST) is None
+    await db_session.execute(
+        IdempotencyKey.__table__.update()
+        .where(IdempotencyKey.idempotency_key == key)
+        .values(locked_until=datetime.utcnow() - timedelta(seconds=1))
+    )
+    await db_session.commit()
+
+    async with sessions() as session:
+        retry = IdempotencyService(session)
+        assert await retry.reserve_idempotency(key, REQUEST) is None
+        assert await slow.store_idempotency(key, REQUEST, RESPONSE, 200) is False
+        assert await retry.store_idempotency(key, REQUEST, {"transaction_id": "t-2"}, 200)
+
+    assert (await slow.check_idempotency(key, REQUEST))["response_body"] == {
+        "transaction_id": "t-2"
+    }
+
+
+async def test_lease_is_renewed_while_the_operation_runs(db_session, sessions, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LEASE_SECONDS", 0.3)
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT_SECONDS", 0.1)
+    key = _key()
+    service = IdempotencyService(db_session)
+    assert await service.reserve_idempotency(key, REQUEST) is None
+
+    async with service.hold_lease(key):
+        await asyncio.sleep(0.6)
+        # Twice the lease length later, a duplicate still waits instead of taking over
+        async with sessions() as session:
+            with pytest.raises(IdempotencyInProgressError):
+                await IdempotencyService(session).reserve_idempotency(key, REQUEST)
+
+
+async def test_key_released_while_waiting_backs_off_until_the_deadline(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT_SECONDS", 0.2)
+    service = IdempotencyService(db_session)
+    polls = 0
+
+    async def lose_the_race(idempotency_key, request_hash):
+        nonlocal polls
+        polls += 1
+        return False
+
+    async def released(idempotency_key):
+        return None
+
+    monkeypatch.setattr(service, "_claim", lose_the_race)
+    monkeypatch.setattr(service, "_load", released)
+
+    with pytest.raises(IdempotencyInProgressError):
+        await service.reserve_idempotency(_key(), REQUEST)
+    # Backing off from 50ms: a handful of polls, not a tight loop
+    assert polls <= 5
@@ -0,0 +1,131 @@
+"""Integration tests for GET /metrics: formats, queue depths and multi-process aggregation"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+from prometheus_client import REGISTRY
+
+from app.api.v1.dependencies import get_redis
+from app.core.config import settings
+from app.core.exposition import RQ_WEBHOOK_QUEUE_KEY
+from app.main import app
+
+
+@pytest.fixture
+async def api():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_requests_are_timed_by_route_name(api):
+    health = {"endpoint": "health_check", "method": "GET", "status": "200"}
+    unmatched = {"endpoint": "unmatched", "method": "GET", "status": "404"}
+    health_before = _sample("http_request_duration_seconds_count", **health)
+    unmatched_before = _sample("http_request_duration_seconds_count", **unmatched)
+
+    assert (await api.get("/health")).status_code == 200
+    assert (await api.get("/no/such/path")).status_code == 404
+
+    assert _sample("http_request_duration_seconds_count", **health) == health_before + 1
+    assert _sample("http_request_duration_seconds_count", **unmatched) == unmatched_before + 1
+
+
+async def test_scrape_negotiates_openmetrics(api):
+    app.dependency_overrides[get_redis] = lambda: None
+
+    text = await api.get("/metrics")
+    openmetrics = await api.get(
+        "/metrics", headers={"Accept": "application/openmetrics-text; version=1.0.0"}
+    )
+
+    assert text.headers["content-type"].startswith("text/plain")
+    assert "# EOF" not in text.text
+    assert openmetrics.headers["content-type"].startswith("application/openmetrics-text")
+    assert openmetrics.text.endswith("# EOF\n")
+    assert "authorize_net_request_duration_seconds" in openmetrics.text
+
+
+async def test_scrape_reads_webhook_queue_depths(api):
+    redis = FakeAsyncRedis()
+    for i in range(3):
+        await redis.xadd(settings.WEBHOOK_STREAM, {"event": str(i)})
+    await redis.xgroup_create(settings.WEBHOOK_STREAM, settings.WEBHOOK_CONSUMER_GROUP, id="0")
+    # Delivered to a consumer, not acknowledged yet
+    await redis.xreadgroup(
+        settings.WEBHOOK_CONSUMER_GROUP, "c1", {settings.WEBHOOK_STREAM: ">"}, count=1
+    )
+    await redis.rpush(RQ_WEBHOOK_QUEUE_KEY, "job-1", "job-2")
+    app.dependency_overrides[get_redis] = lambda: redis
+
+    response = await api.get("/metrics")
+
+    assert response.status_code == 200
+    assert _sample("webhook_queue_depth", queue="stream") == 3
+    assert _sample("webhook_queue_depth", queue="pending") == 1
+    assert _sample("webhook_queue_depth", queue="rq") == 2
+    await redis.aclose()
+
+
+async def test_queue_depths_without_a_consumer_group(api):
+    redis = FakeAsyncRedis()
+    await redis.xadd(settings.WEBHOOK_STREAM, {"event": "0"})
+    app.dependency_overrides[get_redis] = lambda: redis
+
+    assert (await api.get("/metrics")).status_code == 200
+    assert _sample("webhook_queue_depth", queue="stream") == 1
+    assert _sample("webhook_queue_depth", queue="pending") == 0
+    await redis.aclose()
+
+
+WORKER = textwrap.dedent(
+    """
+    import sys
+    from app.core.exposition import mark_process_dead
+    from app.core.metrics import DB_POOL_CHECKED_OUT, IDEMPOTENCY_REQUESTS
+
+    IDEMPOTENCY_REQUESTS.labels(outcome="claimed").inc(int(sys.argv[1]))
+    DB_POOL_CHECKED_OUT.labels(pool="primary").set(4)
+    if sys.argv[2] == "exit":
+        mark_process_dead()
+    """
+)
+
+SCRAPE = textwrap.dedent(
+    """
+    import asyncio
+    from app.core.exposition import render_metrics
+
+    body, _ = asyncio.run(render_metrics(None, None))
+    print(body.decode())
+    """
+)
+
+
+def _run(source: str, *args: str, env: dict) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", source, *args], env=env, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+def test_workers_are_aggregated_in_multiprocess_mode(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    _run(WORKER, "2", "stay", env=env)
+    _run(WORKER, "3", "exit", env=env)
+
+    body = _run(SCRAPE, env=env)
+
+    # Counters add up across workers, dead or alive
+    assert 'idempotency_requests_total{outcome="claimed"} 5.0' in body
+    # livesum: the worker marked dead no longer counts
+    assert 'db_pool_checked_out_connections{pool="primary"} 4.0' in body
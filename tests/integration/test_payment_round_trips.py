@@ -0,0 +1,123 @@
+"""Integration tests for the database round trips of capture, void and refund (stub gateway)"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient, TRANSPORT_HTTPX
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.connection_pool import AsyncGatewayConnectionPool
+from app.api.v1.schemas.payment import CaptureRequestSchema, RefundRequestSchema
+from app.models.payment import Payment
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.repositories.payment_repository import PaymentRepository
+from app.services.payment_service import PaymentService
+from tests.stub_gateway import StubGateway
+
+AUTHORIZED, CAPTURED = TransactionStatus.AUTHORIZED, TransactionStatus.CAPTURED
+
+
+@pytest.fixture
+async def service(db_session):
+    client = AsyncAuthorizeNetClient(
+        client=AuthorizeNetClient(),
+        transport=TRANSPORT_HTTPX,
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(StubGateway().ahandle)),
+    )
+    yield PaymentService(db_session, client)
+    await client.aclose()
+
+
+async def _transaction(session, status: TransactionStatus) -> Transaction:
+    payment = Payment(customer_id=f"round-trips-{uuid.uuid4().hex[:8]}")
+    session.add(payment)
+    await session.flush()
+    transaction = Transaction(
+        payment_id=payment.id,
+        transaction_type=TransactionType.AUTHORIZE,
+        status=status,
+        authorize_net_transaction_id=str(uuid.uuid4().int % 10**11),
+        amount=Decimal("10.00"),
+        currency="USD",
+    )
+    session.add(transaction)
+    await session.commit()
+    # A fresh request: nothing in the identity map
+    session.expunge_all()
+    return transaction
+
+
+async def _operate(service, name: str, transaction_id: str) -> dict:
+    if name == "capture":
+        return await service.process_capture(transaction_id, CaptureRequestSchema(), "corr")
+    if name == "void":
+        return await service.process_void(transaction_id, "corr")
+    return await service.process_refund(
+        transaction_id,
+        RefundRequestSchema(transaction_id=transaction_id, card_number_last4="1111"),
+        "corr",
+    )
+
+
+@pytest.mark.parametrize(
+    "operation, from_status, to_status, reference_key",
+    [
+        ("capture", AUTHORIZED, TransactionStatus.CAPTURED, "auth_transaction_id"),
+        ("void", AUTHORIZED, TransactionStatus.VOIDED, "voided_auth_transaction_id"),
+        ("refund", CAPTURED, TransactionStatus.REFUNDED, "refunded_transaction_id"),
+    ],
+)
+async def test_operation_reads_once_and_writes_once(
+    db_session, query_counter, service, operation, from_status, to_status, reference_key
+):
+    transaction = await _transaction(db_session, from_status)
+    query_counter.reset()
+
+    result = await _operate(service, operation, str(transaction.id))
+
+    # BEGIN, the transaction's SELECT (no payment load), one UPDATE ... RETURNING, COMMIT
+    assert query_counter.statements == ["SELECT", "UPDATE"]
+    assert query_counter.round_trips == 4
+
+    updated = await PaymentRepository(db_session).get_transaction_by_id(transaction.id)
+    assert updated.status == to_status
+    assert updated.status_version == 1
+    assert updated.authorize_net_transaction_id == result["authorize_net_transaction_id"]
+    assert updated.extra_data == {
+        reference_key: transaction.authorize_net_transaction_id,
+        **({"refund_amount": "10.00"} if operation == "refund" else {}),
+    }
+
+
+async def test_update_refreshes_a_loaded_instance(db_session, query_counter):
+    repository = PaymentRepository(db_session)
+    transaction = await repository.get_transaction_by_id(
+        (await _transaction(db_session, AUTHORIZED)).id
+    )
+    query_counter.reset()
+
+    updated = await repository.update_transaction_status(
+        transaction, TransactionStatus.CAPTURED, extra_data={"note": "first"}
+    )
+    again = await repository.update_transaction_status(
+        transaction.id, TransactionStatus.CAPTURED, extra_data={"other": "second"}
+    )
+
+    assert query_counter.statements == ["UPDATE", "UPDATE"]
+    assert updated is again is transaction
+    assert transaction.status == TransactionStatus.CAPTURED
+    # Only a status change bumps the version
+    assert transaction.status_version == 1
+    assert transaction.extra_data == {"note": "first", "other": "second"}
+    # Set by the database clock, in UTC like created_at
+    assert transaction.created_at <= transaction.updated_at
+    assert abs(transaction.updated_at - datetime.utcnow()) < timedelta(minutes=1)
+
+
+async def test_update_of_a_missing_transaction_returns_none(db_session):
+    repository = PaymentRepository(db_session)
+    missing = await repository.update_transaction_status(uuid.uuid4(), TransactionStatus.FAILED)
+
+    assert missing is None
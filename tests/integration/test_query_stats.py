@@ -0,0 +1,98 @@
+"""Integration tests for SQL statement instrumentation (Postgres)"""
+import httpx
+import pytest
+import structlog
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from structlog.testing import capture_logs
+
+from app.api.v1.dependencies import get_current_user
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.query_stats import track_queries
+from app.main import app
+
+
+
+@pytest.fixture
+async def api(db_session):
+    async def override_db():
+        yield db_session
+
+    app.dependency_overrides[get_read_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "test"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_request_logs_and_exports_its_queries(api):
+    before = _sample("db_request_queries_sum", endpoint="list_transactions")
+    requests_before = _sample("db_request_queries_count", endpoint="list_transactions")
+
+    with capture_logs() as logs:
+        response = await api.get(
+            "/api/v1/transactions", params={"limit": 1}, headers={"X-Correlation-ID": "corr-queries"}
+        )
+
+    assert response.status_code == 200
+    [completed] = [log for log in logs if log["event"] == "Request completed"]
+    assert completed["correlation_id"] == "corr-queries"
+    assert completed["db_queries"] == 1
+    assert completed["db_time_ms"] >= completed["db_slowest_ms"] > 0
+    assert _sample("db_request_queries_count", endpoint="list_transactions") == requests_before + 1
+    assert _sample("db_request_queries_sum", endpoint="list_transactions") == before + 1
+
+    metrics = await api.get("/metrics")
+    assert metrics.status_code == 200
+    assert 'db_request_queries_count{endpoint="list_transactions"}' in metrics.text
+
+
+async def test_slow_queries_are_logged_with_the_correlation_id(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 50)
+    slow_before = _sample("db_slow_queries_total", pool="primary")
+    structlog.contextvars.bind_contextvars(correlation_id="corr-slow")
+
+    try:
+        with capture_logs() as logs, track_queries() as queries:
+            async with db_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT pg_sleep(0.06)"))
+    finally:
+        structlog.contextvars.unbind_contextvars("correlation_id")
+
+    [slow] = [log for log in logs if log["event"] == "Slow query"]
+    assert slow["correlation_id"] == "corr-slow"
+    assert slow["statement"] == "SELECT pg_sleep(0.06)"
+    assert slow["duration_ms"] >= 50
+    assert _sample("db_slow_queries_total", pool="primary") == slow_before + 1
+    assert queries.count == 2
+    assert queries.slowest_statement == "SELECT pg_sleep(0.06)"
+    assert queries.slowest_seconds >= 0.05
+
+
+async def test_trackers_nest_and_survive_failed_statements(db_engine):
+    with track_queries(record_statements=True) as outer:
+        async with db_engine.connect() as conn:
+            with pytest.raises(ProgrammingError):
+                await conn.execute(text("SELECT missing_column FROM payments"))
+            await conn.rollback()
+            with track_queries() as inner:
+                await conn.execute(text("SELECT 1"))
+            assert conn.sync_connection.info["query_started"] == []
+
+    assert inner.count == 1
+    assert outer.statements == ["SELECT 1"]
+
+
+def test_max_queries_fails_past_the_limit(max_queries):
+    with pytest.raises(AssertionError, match="2 SQL statements, expected at most 1"):
+        with max_queries(1) as queries:
+            queries.add("SELECT 1", 0.001)
+            queries.add("SELECT 2", 0.001)
@@ -0,0 +1,223 @@
+"""Integration tests for settlement reconciliation (Postgres + local stub gateway)"""
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import event, select
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient, TRANSPORT_HTTPX
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.connection_pool import AsyncGatewayConnectionPool
+from app.adapters.authorize_net.exceptions import AuthorizeNetAPIError
+from app.models.payment import Payment
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.services.reconciliation_service import ReconciliationService
+from tests.stub_gateway import SettledTransaction, StubGateway
+
+FIRST = datetime(2024, 5, 1)
+LAST = datetime(2024, 5, 31, 23, 59, 59)
+
+
+def _trans_id() -> str:
+    return str(uuid.uuid4().int % 10**11)
+
+
+@pytest.fixture
+def gateway():
+    return StubGateway()
+
+
+@pytest.fixture
+async def gateway_client(gateway):
+    client = AsyncAuthorizeNetClient(
+        client=AuthorizeNetClient(),
+        transport=TRANSPORT_HTTPX,
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(gateway.ahandle)),
+    )
+    yield client
+    await client.aclose()
+
+
+async def _create_transactions(session, rows) -> dict[str, Transaction]:
+    """rows: (authorize_net_transaction_id, status, amount)"""
+    payment = Payment(customer_id=f"reconcile-{uuid.uuid4().hex[:8]}")
+    session.add(payment)
+    await session.flush()
+    created = {}
+    for trans_id, status, amount in rows:
+        transaction = Transaction(
+            payment_id=payment.id,
+            transaction_type=TransactionType.PURCHASE,
+            status=status,
+            authorize_net_transaction_id=trans_id,
+            amount=amount,
+            currency="USD",
+        )
+        session.add(transaction)
+        created[trans_id] = transaction
+    await session.commit()
+    return created
+
+
+async def _statuses(session, transactions) -> dict[str, TransactionStatus]:
+    result = await session.execute(
+        select(Transaction.authorize_net_transaction_id, Transaction.status).where(
+            Transaction.id.in_([t.id for t in transactions.values()])
+        )
+    )
+    return dict(result.all())
+
+
+async def test_reconcile_corrects_statuses_in_bulk(db_engine, db_session, gateway, gateway_client):
+    settled, refunded, voided, matched = (_trans_id() for _ in range(4))
+    unknown, under_review = _trans_id(), _trans_id()
+    transactions = await _create_transactions(
+        db_session,
+        [
+            (settled, TransactionStatus.AUTHORIZED, Decimal("10.00")),
+            (refunded, TransactionStatus.CAPTURED, Decimal("4.50")),
+            (voided, TransactionStatus.PENDING, Decimal("10.00")),
+            (matched, TransactionStatus.CAPTURED, Decimal("12.00")),
+            (under_review, TransactionStatus.AUTHORIZED, Decimal("10.00")),
+        ],
+    )
+    gateway.settle(
+        "1001",
+        [
+            SettledTransaction(settled),
+            SettledTransaction(
+                refunded, status="refundSettledSuccessfully", amount=Decimal("4.50")
+            ),
+            SettledTransaction(voided, status="voided"),
+            SettledTransaction(matched, amount=Decimal("11.00")),
+            SettledTransaction(under_review, status="underReview"),
+            SettledTransaction(unknown),
+        ],
+    )
+
+    statements = []
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement.split()[0]),
+    )
+    service = ReconciliationService(db_session, gateway_client, max_concurrency=2)
+    report = await service.reconcile(FIRST, LAST, include_details=True)
+
+    assert report.batches == 1
+    assert report.gateway_transactions == 6
+    assert report.matched == 1
+    assert report.corrected == 3
+    assert report.missing_locally == [unknown]
+    assert [d.transaction_id for d in report.details] == [unknown]
+    assert report.unmapped_statuses == {"underReview": 1}
+    assert [
+        (m.authorize_net_transaction_id, m.settle_amount) for m in report.amount_mismatches
+    ] == [(matched, Decimal("11.00"))]
+    # One SELECT for the page, one UPDATE per transition
+    assert statements.count("SELECT") == 1
+    assert statements.count("UPDATE") == 3
+
+    assert await _statuses(db_session, transactions) == {
+        settled: TransactionStatus.CAPTURED,
+        refunded: TransactionStatus.REFUNDED,
+        voided: TransactionStatus.VOIDED,
+        matched: TransactionStatus.CAPTURED,
+        under_review: TransactionStatus.AUTHORIZED,
+    }
+    row = (
+        await db_session.execute(
+            select(Transaction.extra_data).where(Transaction.id == transactions[settled].id)
+        )
+    ).scalar_one()
+    assert row["reconciled_gateway_status"] == "settledSuccessfully"
+
+
+async def test_reconcile_pages_batches_within_concurrency_limit(
+    db_session, gateway, gateway_client
+):
+    gateway.latency = 0.01
+    trans_ids = []
+    for batch in range(6):
+        batch_ids = [_trans_id() for _ in range(7)]
+        trans_ids.extend(batch_ids)
+        gateway.settle(f"20{batch}", [SettledTransaction(t) for t in batch_ids])
+    transactions = await _create_transactions(
+        db_session, [(t, TransactionStatus.AUTHORIZED, Decimal("10.00")) for t in trans_ids]
+    )
+
+    service = ReconciliationService(db_session, gateway_client, max_concurrency=3, page_size=2)
+    report = await service.reconcile(FIRST, LAST)
+
+    assert report.batches == 6
+    assert report.pages == 6 * 4
+    assert report.gateway_transactions == len(trans_ids)
+    assert report.corrected == len(trans_ids)
+    assert 1 < gateway.peak_in_flight <= 3
+    assert set((await _statuses(db_session, transactions)).values()) == {
+        TransactionStatus.CAPTURED
+    }
+
+
+async def test_dry_run_leaves_rows_untouched(db_session, gateway, gateway_client):
+    trans_id = _trans_id()
+    transactions = await _create_transactions(
+        db_session, [(trans_id, TransactionStatus.AUTHORIZED, Decimal("10.00"))]
+    )
+    gateway.settle("3001", [SettledTransaction(trans_id, status="voided")])
+
+    report = await ReconciliationService(db_session, gateway_client).reconcile(
+        FIRST, LAST, dry_run=True
+    )
+
+    assert [(c.from_status, c.to_status) for c in report.corrections] == [
+        (TransactionStatus.AUTHORIZED, TransactionStatus.VOIDED)
+    ]
+    assert report.corrected == 0
+    assert await _statuses(db_session, transactions) == {trans_id: TransactionStatus.AUTHORIZED}
+
+
+async def test_rows_changed_since_the_diff_are_not_overwritten(db_session, gateway, gateway_client):
+    trans_id = _trans_id()
+    transactions = await _create_transactions(
+        db_session, [(trans_id, TransactionStatus.AUTHORIZED, Decimal("10.00"))]
+    )
+    gateway.settle("4001", [SettledTransaction(trans_id)])
+    service = ReconciliationService(db_session, gateway_client)
+    report = await service.reconcile(FIRST, LAST, dry_run=True)
+
+    # A webhook moves the row on before the corrections are written
+    await service.repository.update_transaction_status(
+        transactions[trans_id].id, TransactionStatus.REFUNDED
+    )
+    await db_session.commit()
+
+    assert await service._apply(report.corrections) == 0
+    assert await _statuses(db_session, transactions) == {trans_id: TransactionStatus.REFUNDED}
+
+
+async def test_reporting_error_is_raised(db_session):
+    def reject(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            content=(
+                b'<getSettledBatchListResponse xmlns="AnetApi/xml/v1/schema/AnetApiSchema.xsd">'
+                b"<messages><resultCode>Error</resultCode><message><code>E00007</code>"
+                b"<text>User authentication failed.</text></message></messages>"
+                b"</getSettledBatchListResponse>"
+            ),
+        )
+
+    client = AsyncAuthorizeNetClient(
+        client=AuthorizeNetClient(),
+        transport=TRANSPORT_HTTPX,
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(reject)),
+    )
+    try:
+        with pytest.raises(AuthorizeNetAPIError) as exc_info:
+            await ReconciliationService(db_session, client).reconcile(FIRST, LAST)
+    finally:
+        await client.aclose()
+    assert exc_info.value.error_code == "E00007"
@@ -0,0 +1,137 @@
+"""Integration tests for the streaming transaction export (Postgres)"""
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.v1.dependencies import get_current_user
+from app.core import database
+from app.core.database import RoutingSession
+from app.main import app
+from app.models.payment import Payment
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.services.export_service import EXPORT_FIELDS, TransactionExportService
+
+BASE_TIME = datetime(2024, 5, 1, 12, 0, 0)
+
+
+@pytest.fixture
+async def api(db_engine, monkeypatch):
+    """
+    Client on the real read session path (no dependency override): the export
+    opens its session inside the streamed body, which outlives the endpoint
+    """
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(
+            db_engine, class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
+        ),
+    )
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "test"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def customer(db_session):
+    """A customer with 25 transactions, two of them sharing a created_at"""
+    customer_id = f"export-{uuid.uuid4().hex[:8]}"
+    payment = Payment(customer_id=customer_id)
+    db_session.add(payment)
+    await db_session.flush()
+    for i in range(25):
+        db_session.add(
+            Transaction(
+                payment_id=payment.id,
+                transaction_type=TransactionType.PURCHASE,
+                status=TransactionStatus.CAPTURED if i % 3 else TransactionStatus.FAILED,
+                amount=Decimal("1.00") + i,
+                currency="USD",
+                customer_id=customer_id,
+                customer_email="finance@example.com",
+                error_message='declined, "insufficient funds"' if i % 3 == 0 else None,
+                created_at=BASE_TIME + timedelta(minutes=min(i, 23)),
+            )
+        )
+    await db_session.commit()
+    return customer_id
+
+
+async def test_ndjson_export_is_ordered_and_complete(api, customer):
+    response = await api.get("/api/v1/transactions/export", params={"customer_id": customer})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 25
+    assert list(rows[0]) == list(EXPORT_FIELDS)
+    keys = [(row["created_at"], row["id"]) for row in rows]
+    assert keys == sorted(keys)
+    assert rows[0]["amount"] == "1.00"
+    assert rows[0]["error_message"] == 'declined, "insufficient funds"'
+
+
+async def test_csv_export(api, customer):
+    response = await api.get(
+        "/api/v1/transactions/export",
+        params={"customer_id": customer, "format": "csv", "status": "failed"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert 'filename="transactions.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 9
+    assert {row["status"] for row in rows} == {"failed"}
+    assert rows[0]["error_message"] == 'declined, "insufficient funds"'
+
+
+async def test_export_resumes_after_cursor(api, customer):
+    full = (
+        await api.get("/api/v1/transactions/export", params={"customer_id": customer})
+    ).text.splitlines()
+    resume_from = json.loads(full[11])["cursor"]
+
+    resumed = (
+        await api.get(
+            "/api/v1/transactions/export",
+            params={"customer_id": customer, "cursor": resume_from},
+        )
+    ).text.splitlines()
+
+    assert resumed == full[12:]
+
+
+async def test_export_streams_one_chunk_per_batch(db_session, customer):
+    service = TransactionExportService(db_session, batch_size=10)
+    chunks = [chunk async for chunk in service.stream("csv", customer_id=customer)]
+
+    # Header, then batches of 10, 10 and 5 rows
+    assert [chunk.count(b"\n") for chunk in chunks] == [1, 10, 10, 5]
+
+
+async def test_export_reads_on_a_session_of_its_own(api, customer):
+    def read_sessions():
+        return REGISTRY.get_sample_value("db_read_sessions_total", {"target": "primary"})
+
+    before = read_sessions()
+    response = await api.get("/api/v1/transactions/export", params={"customer_id": customer})
+
+    assert len(response.text.splitlines()) == 25
+    # Opened by the streamed body itself, not by a request dependency
+    assert read_sessions() == before + 1
+
+
+async def test_export_invalid_cursor_is_bad_request(api):
+    response = await api.get("/api/v1/transactions/export", params={"cursor": "garbage"})
+    assert response.status_code == 400
@@ -0,0 +1,123 @@
+"""Integration tests for the transaction listing endpoints (Postgres)"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from app.api.v1.dependencies import get_current_user
+from app.core.database import get_read_db
+from app.main import app
+from app.models.payment import Payment
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+
+BASE_TIME = datetime(2024, 5, 1, 12, 0, 0)
+
+
+@pytest.fixture
+async def api(db_session):
+    async def override_db():
+        yield db_session
+
+    app.dependency_overrides[get_read_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "test"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def customer(db_session):
+    """A customer with 25 transactions; every fifth shares created_at with the one before"""
+    customer_id = f"listing-{uuid.uuid4().hex[:8]}"
+    payment = Payment(customer_id=customer_id)
+    db_session.add(payment)
+    await db_session.flush()
+    for i in range(25):
+        db_session.add(
+            Transaction(
+                payment_id=payment.id,
+                transaction_type=TransactionType.PURCHASE if i % 2 else TransactionType.AUTHORIZE,
+                status=TransactionStatus.CAPTURED if i % 3 else TransactionStatus.FAILED,
+                amount=Decimal("1.00") + i,
+                currency="USD",
+                customer_id=customer_id,
+                created_at=BASE_TIME + timedelta(minutes=i - i % 5 // 4),
+            )
+        )
+    await db_session.commit()
+    return customer_id
+
+
+async def _all_pages(api, **params) -> tuple[list[dict], int]:
+    items, pages, cursor = [], 0, None
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        response = await api.get("/api/v1/transactions", params=query)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        items.extend(body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            return items, pages
+
+
+async def test_keyset_pages_cover_every_row_once_in_order(api, customer):
+    items, pages = await _all_pages(api, customer_id=customer, limit=7)
+
+    assert pages == 4
+    assert len(items) == 25
+    assert len({item["id"] for item in items}) == 25
+    keys = [(item["created_at"], item["id"]) for item in items]
+    assert keys == sorted(keys, reverse=True)
+
+
+async def test_filters(api, customer):
+    items, _ = await _all_pages(
+        api,
+        customer_id=customer,
+        status="failed",
+        transaction_type="authorize",
+        created_from=(BASE_TIME + timedelta(minutes=5)).isoformat(),
+        created_to=(BASE_TIME + timedelta(minutes=20)).isoformat() + "Z",
+        limit=2,
+    )
+    assert items
+    for item in items:
+        assert item["status"] == "failed"
+        assert item["transaction_type"] == "authorize"
+        assert "2024-05-01T12:05:00" <= item["created_at"] < "2024-05-01T12:20:00"
+
+
+async def test_last_page_has_no_cursor(api, customer):
+    response = await api.get("/api/v1/transactions", params={"customer_id": customer, "limit": 25})
+    body = response.json()
+    assert len(body["items"]) == 25
+    assert body["next_cursor"] is None
+
+
+async def test_invalid_cursor_is_bad_request(api):
+    response = await api.get("/api/v1/transactions", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+async def test_get_transaction(api, customer):
+    listed = (await api.get("/api/v1/transactions", params={"customer_id": customer})).json()
+    first = listed["items"][0]
+
+    response = await api.get(f"/api/v1/transactions/{first['id']}")
+    assert response.status_code == 200
+    assert response.json() == first
+
+    missing = await api.get(f"/api/v1/transactions/{uuid.uuid4()}")
+    assert missing.status_code == 404
+
+
+async def test_endpoints_run_one_query(api, customer, max_queries):
+    with max_queries(1):
+        listed = await api.get("/api/v1/transactions", params={"customer_id": customer})
+    with max_queries(1):
+        await api.get(f"/api/v1/transactions/{listed.json()['items'][0]['id']}")
@@ -0,0 +1,153 @@
+"""Integration tests for the webhook stream consumer"""
+import asyncio
+import uuid
+from decimal import Decimal
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.payment import Payment
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.models.webhook_event import WebhookEvent
+from app.tasks.webhook_consumer import WebhookStreamConsumer
+
+EVENTS = 20
+
+
+@pytest.fixture
+def sessions(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis()
+
+
+async def _seed(session, redis, count: int) -> tuple[list[Transaction], list[WebhookEvent]]:
+    """Authorized transactions, one captured webhook event each, added to the stream"""
+    payment = Payment(customer_id=f"consumer-{uuid.uuid4().hex[:8]}")
+    session.add(payment)
+    await session.flush()
+    transactions, events = [], []
+    for _ in range(count):
+        trans_id = str(uuid.uuid4().int % 10**11)
+        transaction = Transaction(
+            payment_id=payment.id,
+            transaction_type=TransactionType.AUTHORIZE,
+            status=TransactionStatus.AUTHORIZED,
+            authorize_net_transaction_id=trans_id,
+            amount=Decimal("10.00"),
+            currency="USD",
+        )
+        event = WebhookEvent(
+            event_type="net.authorize.payment.authcapture.created",
+            authorize_net_transaction_id=trans_id,
+            raw_payload={
+                "eventType": "net.authorize.payment.authcapture.created",
+                "payload": {"id": trans_id},
+            },
+        )
+        session.add_all([transaction, event])
+        transactions.append(transaction)
+        events.append(event)
+    await session.commit()
+    for event in events:
+        await redis.xadd(settings.WEBHOOK_STREAM, {"event_id": str(event.id)})
+    return transactions, events
+
+
+async def _statuses(session, transactions) -> set[TransactionStatus]:
+    result = await session.execute(
+        select(Transaction.status).where(Transaction.id.in_([t.id for t in transactions]))
+    )
+    return set(result.scalars())
+
+
+async def test_burst_processes_every_event_and_drains_the_stream(db_session, sessions, redis):
+    transactions, events = await _seed(db_session, redis, EVENTS)
+    consumer = WebhookStreamConsumer(redis, sessions, consumer_name="c1", concurrency=5)
+    lags_before = REGISTRY.get_sample_value("webhook_processing_lag_seconds_count")
+
+    await consumer.run(burst=True)
+
+    assert consumer.processed == EVENTS
+    assert REGISTRY.get_sample_value("webhook_processing_lag_seconds_count") == lags_before + EVENTS
+    assert await _statuses(db_session, transactions) == {TransactionStatus.CAPTURED}
+    result = await db_session.execute(
+        select(WebhookEvent.processed).where(WebhookEvent.id.in_([e.id for e in events]))
+    )
+    assert set(result.scalars()) == {True}
+    assert await redis.xlen(settings.WEBHOOK_STREAM) == 0
+    pending = await redis.xpending(settings.WEBHOOK_STREAM, settings.WEBHOOK_CONSUMER_GROUP)
+    assert pending["pending"] == 0
+
+
+async def test_entries_are_processed_in_batches(db_session, sessions, redis, monkeypatch):
+    await _seed(db_session, redis, EVENTS)
+    batches = []
+
+    async def record_process_events(self, event_ids):
+        batches.append(len(event_ids))
+
+    monkeypatch.setattr(
+        "app.services.webhook_service.WebhookService.process_events", record_process_events
+    )
+    consumer = WebhookStreamConsumer(
+        redis, sessions, consumer_name="c1", concurrency=1, batch_size=8
+    )
+
+    await consumer.run(burst=True)
+
+    assert consumer.processed == EVENTS
+    assert batches == [8, 8, 4]
+    assert await redis.xlen(settings.WEBHOOK_STREAM) == 0
+
+
+async def test_batches_run_concurrently_up_to_the_limit(db_session, sessions, redis, monkeypatch):
+    await _seed(db_session, redis, EVENTS)
+    in_flight, peak = 0, 0
+
+    async def slow_process_events(self, event_ids):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    monkeypatch.setattr(
+        "app.services.webhook_service.WebhookService.process_events", slow_process_events
+    )
+    consumer = WebhookStreamConsumer(
+        redis, sessions, consumer_name="c1", concurrency=4, batch_size=2
+    )
+
+    await consumer.run(burst=True)
+
+    assert consumer.processed == EVENTS
+    assert peak == 4
+
+
+async def test_failed_entries_are_reclaimed_and_retried(db_session, sessions, redis):
+    transactions, _ = await _seed(db_session, redis, 3)
+
+    def unavailable():
+        raise ConnectionRefusedError("database is down")
+
+    crashed = WebhookStreamConsumer(redis, unavailable, consumer_name="crashed")
+    await crashed.run(burst=True)
+    assert crashed.processed == 0
+    pending = await redis.xpending(settings.WEBHOOK_STREAM, settings.WEBHOOK_CONSUMER_GROUP)
+    assert pending["pending"] == 3
+
+    survivor = WebhookStreamConsumer(redis, sessions, consumer_name="survivor", claim_idle_ms=1)
+    await asyncio.sleep(0.01)
+    await survivor.run(burst=True)
+
+    assert survivor.processed == 3
+    assert await _statuses(db_session, transactions) == {TransactionStatus.CAPTURED}
+    assert await redis.xlen(settings.WEBHOOK_STREAM) == 0
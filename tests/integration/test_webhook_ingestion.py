@@ -0,0 +1,257 @@
+"""Integration tests for micro-batched webhook ingestion"""
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+from prometheus_client import REGISTRY
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.v1.dependencies import get_webhook_ingestor, get_webhook_verifier
+from app.core.config import settings
+from app.main import app
+from app.models.webhook_event import WebhookEvent
+from app.repositories.webhook_repository import WebhookRepository
+from app.services.webhook_ingestion_service import WebhookIngestor
+from app.utils.authorize_net_webhook import WebhookSignatureVerifier, compute_signature
+
+URL = "/api/v1/webhooks/authorize-net"
+WEBHOOKS = 25
+
+
+class BrokenRedis:
+    async def exists(self, *names):
+        raise RedisConnectionError("redis is down")
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def xadd(self, name, fields, **kwargs):
+        pass
+
+    def set(self, name, value, ex=None):
+        pass
+
+    async def execute(self):
+        raise RedisConnectionError("redis is down")
+
+
+@pytest.fixture
+def sessions(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis()
+
+
+async def _stream_event_ids(redis) -> list[str]:
+    entries = await redis.xrange(settings.WEBHOOK_STREAM)
+    return [fields[b"event_id"].decode() for _, fields in entries]
+
+
+@pytest.fixture
+def inserts(db_engine):
+    """INSERT statements sent to the database"""
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.startswith("INSERT"):
+            seen.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def statements(db_engine):
+    """Statements sent to the database"""
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _duplicates(source: str) -> float:
+    return REGISTRY.get_sample_value(
+        "webhook_duplicate_deliveries_total", {"source": source}
+    ) or 0.0
+
+
+def _webhook(ref_id: str, trans_id: str, notification_id: str | None = None) -> tuple[bytes, dict]:
+    body = json.dumps(
+        {
+            "notificationId": notification_id or str(uuid.uuid4()),
+            "eventType": "net.authorize.payment.authcapture.created",
+            "payload": {"id": trans_id, "responseCode": 1},
+            "refId": ref_id,
+        }
+    ).encode()
+    signature = compute_signature(body, settings.AUTHORIZE_NET_WEBHOOK_SECRET)
+    return body, {"X-ANET-Signature": signature, "Content-Type": "application/json"}
+
+
+async def _post_all(ingestor, webhooks):
+    verifier = WebhookSignatureVerifier([settings.AUTHORIZE_NET_WEBHOOK_SECRET])
+    app.dependency_overrides[get_webhook_ingestor] = lambda: ingestor
+    app.dependency_overrides[get_webhook_verifier] = lambda: verifier
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(client.post(URL, content=body, headers=headers) for body, headers in webhooks)
+            )
+    finally:
+        app.dependency_overrides.clear()
+        await ingestor.aclose()
+
+
+async def _stored(session, ref_id: str) -> list[WebhookEvent]:
+    result = await session.execute(
+        select(WebhookEvent).where(WebhookEvent.correlation_id == ref_id)
+    )
+    return list(result.scalars())
+
+
+async def test_burst_is_stored_and_enqueued_in_one_batch(db_session, sessions, redis, inserts):
+    ingestor = WebhookIngestor(sessions, redis, window_ms=50)
+    ref_id = f"burst-{uuid.uuid4().hex[:8]}"
+
+    responses = await _post_all(ingestor, [_webhook(ref_id, str(i)) for i in range(WEBHOOKS)])
+
+    assert [r.status_code for r in responses] == [200] * WEBHOOKS
+    events = await _stored(db_session, ref_id)
+    assert len(events) == WEBHOOKS
+    assert len(inserts) == 1
+    assert sorted(await _stream_event_ids(redis)) == sorted(str(e.id) for e in events)
+
+
+async def test_stream_is_capped(sessions, redis, monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_STREAM_MAXLEN", 1000)
+    xadds = []
+    xadd = Pipeline.xadd
+
+    def record(self, name, fields, *args, **kwargs):
+        xadds.append(kwargs)
+        return xadd(self, name, fields, *args, **kwargs)
+
+    monkeypatch.setattr(Pipeline, "xadd", record)
+
+    await _post_all(WebhookIngestor(sessions, redis), [_webhook("capped", "1")])
+
+    assert xadds == [{"maxlen": 1000, "approximate": True}]
+
+
+async def test_batches_are_capped(db_session, sessions, redis, inserts):
+    ingestor = WebhookIngestor(sessions, redis, window_ms=50, max_batch_size=10)
+    ref_id = f"capped-{uuid.uuid4().hex[:8]}"
+
+    responses = await _post_all(ingestor, [_webhook(ref_id, str(i)) for i in range(WEBHOOKS)])
+
+    assert [r.status_code for r in responses] == [200] * WEBHOOKS
+    assert len(await _stored(db_session, ref_id)) == WEBHOOKS
+    assert len(inserts) == 3
+    assert await redis.xlen(settings.WEBHOOK_STREAM) == WEBHOOKS
+
+
+async def test_enqueue_failure_fails_the_batch_and_records_the_error(db_session, sessions):
+    ingestor = WebhookIngestor(sessions, BrokenRedis())
+    ref_id = f"broken-{uuid.uuid4().hex[:8]}"
+
+    responses = await _post_all(ingestor, [_webhook(ref_id, str(i)) for i in range(3)])
+
+    assert [r.status_code for r in responses] == [500] * 3
+    events = await _stored(db_session, ref_id)
+    assert len(events) == 3
+    assert all(not e.processed and e.error_message == "redis is down" for e in events)
+
+
+async def test_bad_signature_is_rejected_before_ingestion(sessions, redis):
+    body, headers = _webhook("unsigned", "1")
+    headers["X-ANET-Signature"] = "SHA512=00"
+
+    [response] = await _post_all(WebhookIngestor(sessions, redis), [(body, headers)])
+
+    assert response.status_code == 401
+    assert await redis.xlen(settings.WEBHOOK_STREAM) == 0
+
+
+async def test_retried_delivery_is_acknowledged_from_redis(db_session, sessions, redis, statements):
+    ref_id = f"retry-{uuid.uuid4().hex[:8]}"
+    webhook = _webhook(ref_id, "1")
+    await _post_all(WebhookIngestor(sessions, redis), [webhook])
+    statements.clear()
+    before = _duplicates("redis")
+
+    responses = await _post_all(WebhookIngestor(sessions, redis), [webhook, webhook])
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert statements == []
+    assert _duplicates("redis") == before + 2
+    assert len(await _stored(db_session, ref_id)) == 1
+    assert await redis.xlen(settings.WEBHOOK_STREAM) == 1
+
+
+async def test_concurrent_duplicates_are_stored_once(db_session, sessions, redis):
+    ref_id = f"dupes-{uuid.uuid4().hex[:8]}"
+    notification_id = str(uuid.uuid4())
+    before = _duplicates("postgres")
+
+    responses = await _post_all(
+        WebhookIngestor(sessions, redis, window_ms=50),
+        [_webhook(ref_id, "1", notification_id) for _ in range(5)],
+    )
+
+    assert [r.status_code for r in responses] == [200] * 5
+    [stored] = await _stored(db_session, ref_id)
+    assert stored.notification_id == notification_id
+    assert await _stream_event_ids(redis) == [str(stored.id)]
+    assert _duplicates("postgres") == before + 4
+
+
+async def test_unique_index_catches_duplicates_redis_does_not_know(db_session, sessions, redis):
+    ref_id = f"cold-{uuid.uuid4().hex[:8]}"
+    webhook = _webhook(ref_id, "1")
+    await _post_all(WebhookIngestor(sessions, redis), [webhook])
+    await redis.flushall()
+
+    [response] = await _post_all(WebhookIngestor(sessions, redis), [webhook])
+
+    assert response.status_code == 200
+    assert len(await _stored(db_session, ref_id)) == 1
+    assert await redis.xlen(settings.WEBHOOK_STREAM) == 0
+    # Remembered again for the next retry
+    assert await WebhookIngestor(sessions, redis).is_duplicate(json.loads(webhook[0])["notificationId"])
+
+
+async def test_delivery_that_failed_to_enqueue_is_stored_again_on_retry(db_session, sessions, redis):
+    ref_id = f"requeue-{uuid.uuid4().hex[:8]}"
+    webhook = _webhook(ref_id, "1")
+    [failed] = await _post_all(WebhookIngestor(sessions, BrokenRedis()), [webhook])
+
+    [retried] = await _post_all(WebhookIngestor(sessions, redis), [webhook])
+
+    assert (failed.status_code, retried.status_code) == (500, 200)
+    events = await _stored(db_session, ref_id)
+    assert len(events) == 2
+    [enqueued] = [e for e in events if e.error_message is None]
+    assert await _stream_event_ids(redis) == [str(enqueued.id)]
+    # The failed copy is retired, so replay cannot process the delivery a second time
+    [superseded] = [e for e in events if e.error_message is not None]
+    assert superseded.dead_lettered_at is not None
+    replayable = await WebhookRepository(db_session).list_replayable(
+        1000, datetime.utcnow() + timedelta(minutes=1)
+    )
+    assert superseded.id not in {row.id for row in replayable}
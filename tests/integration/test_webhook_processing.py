@@ -0,0 +1,258 @@
+"""Integration tests for batched webhook event processing"""
+import asyncio
+import random
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.payment import Payment
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.models.webhook_event import WebhookEvent
+from app.repositories.payment_repository import PaymentRepository
+from app.services.webhook_service import WebhookService
+
+AUTHORIZED = "net.authorize.payment.authorization.created"
+CAPTURED = "net.authorize.payment.authcapture.created"
+VOIDED = "net.authorize.payment.void.created"
+REFUNDED = "net.authorize.payment.refund.created"
+FINAL_STATUS = {
+    AUTHORIZED: TransactionStatus.AUTHORIZED,
+    CAPTURED: TransactionStatus.CAPTURED,
+    VOIDED: TransactionStatus.VOIDED,
+    REFUNDED: TransactionStatus.REFUNDED,
+}
+LIFECYCLES = [
+    (AUTHORIZED,),
+    (AUTHORIZED, CAPTURED),
+    (AUTHORIZED, VOIDED),
+    (AUTHORIZED, CAPTURED, VOIDED),
+    (AUTHORIZED, CAPTURED, REFUNDED),
+]
+# Gateway event times, one minute apart, in lifecycle order
+EVENT_TIMES = ["2026-05-01T12:00:00.000Z", "2026-05-01T12:01:00.000Z", "2026-05-01T12:02:00.000Z"]
+
+
+@pytest.fixture
+def statements(db_engine):
+    """Statements sent to the database"""
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        seen.append(statement.split(None, 1)[0])
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _payload(event_type: str, trans_id: str, event_date: str) -> dict:
+    return {"eventType": event_type, "eventDate": event_date, "payload": {"id": trans_id}}
+
+
+async def _transaction(
+    session, extra_data=None, status=TransactionStatus.AUTHORIZED
+) -> Transaction:
+    payment = Payment(customer_id=f"processing-{uuid.uuid4().hex[:8]}")
+    session.add(payment)
+    await session.flush()
+    transaction = Transaction(
+        payment_id=payment.id,
+        transaction_type=TransactionType.AUTHORIZE,
+        status=status,
+        authorize_net_transaction_id=str(uuid.uuid4().int % 10**11),
+        amount=Decimal("10.00"),
+        currency="USD",
+        extra_data=extra_data,
+    )
+    session.add(transaction)
+    await session.flush()
+    return transaction
+
+
+async def _event(session, event_type: str, trans_id: str | None, raw_payload=None) -> WebhookEvent:
+    webhook_event = WebhookEvent(
+        event_type=event_type,
+        authorize_net_transaction_id=trans_id,
+        raw_payload=raw_payload
+        if raw_payload is not None
+        else {"eventType": event_type, "payload": {"id": trans_id}},
+    )
+    session.add(webhook_event)
+    await session.flush()
+    return webhook_event
+
+
+async def _refresh(session, *rows):
+    for row in rows:
+        await session.refresh(row)
+
+
+async def test_batch_uses_a_fixed_number_of_statements(db_session, statements):
+    transactions = [await _transaction(db_session) for _ in range(30)]
+    events = [
+        await _event(db_session, CAPTURED, t.authorize_net_transaction_id) for t in transactions
+    ]
+    await db_session.commit()
+    statements.clear()
+
+    report = await WebhookService(db_session).process_events([str(e.id) for e in events])
+
+    assert report.events == 30
+    # lock events, resolve transactions, SAVEPOINT, UPDATE transactions, RELEASE, mark events
+    assert statements == ["SELECT", "SELECT", "SAVEPOINT", "UPDATE", "RELEASE", "UPDATE"]
+    await _refresh(db_session, *transactions, *events)
+    assert {t.status for t in transactions} == {TransactionStatus.CAPTURED}
+    assert all(e.processed and e.error_message is None for e in events)
+    assert {t.extra_data["webhook_event_id"] for t in transactions} == {str(e.id) for e in events}
+
+
+async def test_failures_are_isolated_per_event(db_session, monkeypatch):
+    ok = await _transaction(db_session, extra_data={"source": "api"})
+    broken = await _transaction(db_session)
+    bulk_transition_status = PaymentRepository.bulk_transition_status
+
+    async def failing_for_broken(self, updates):
+        if any(row[0] == broken.id for row in updates):
+            raise DBAPIError("UPDATE transactions", None, Exception("row is locked"))
+        return await bulk_transition_status(self, updates)
+
+    monkeypatch.setattr(PaymentRepository, "bulk_transition_status", failing_for_broken)
+    ok_event = await _event(db_session, CAPTURED, ok.authorize_net_transaction_id)
+    broken_event = await _event(db_session, CAPTURED, broken.authorize_net_transaction_id)
+    unknown_event = await _event(db_session, CAPTURED, "does-not-exist")
+    unhandled_event = await _event(
+        db_session, "net.authorize.customer.created", ok.authorize_net_transaction_id
+    )
+    malformed_event = await _event(db_session, CAPTURED, None, raw_payload=["not", "an", "object"])
+    events = [ok_event, broken_event, unknown_event, unhandled_event, malformed_event]
+    await db_session.commit()
+
+    report = await WebhookService(db_session).process_events([e.id for e in events])
+
+    assert (report.events, report.failed, report.dead_lettered) == (len(events), 2, 0)
+    await _refresh(db_session, ok, broken, *events)
+    assert ok.status == TransactionStatus.CAPTURED
+    assert ok.extra_data == {"source": "api", "webhook_event_id": str(ok_event.id)}
+    assert broken.status == TransactionStatus.AUTHORIZED
+    assert all(e.processed_at is not None for e in events)
+    assert [e.processed for e in events] == [True, False, True, True, False]
+    assert broken_event.error_message
+    assert malformed_event.error_message
+    assert all(e.attempts == 1 for e in events)
+    # Failures are scheduled for a retry after the first backoff step
+    assert broken_event.next_attempt_at > broken_event.processed_at
+    assert ok_event.next_attempt_at is None
+    assert ok_event.error_message is unknown_event.error_message is None
+
+
+async def test_latest_event_for_a_transaction_wins(db_session):
+    transaction = await _transaction(db_session)
+    trans_id = transaction.authorize_net_transaction_id
+    captured = await _event(db_session, CAPTURED, trans_id)
+    voided = await _event(db_session, VOIDED, trans_id)
+    await db_session.commit()
+
+    await WebhookService(db_session).process_events([voided.id, captured.id])
+
+    await _refresh(db_session, transaction, captured, voided)
+    assert transaction.status == TransactionStatus.VOIDED
+    assert transaction.status_version == 1
+    assert transaction.extra_data == {"webhook_event_id": str(voided.id)}
+    assert captured.processed and voided.processed
+
+
+async def test_late_events_do_not_move_a_status_back(db_session):
+    transaction = await _transaction(db_session)
+    trans_id = transaction.authorize_net_transaction_id
+    refunded = await _event(
+        db_session, REFUNDED, trans_id, raw_payload=_payload(REFUNDED, trans_id, EVENT_TIMES[2])
+    )
+    await db_session.commit()
+    service = WebhookService(db_session)
+    await service.process_events([refunded.id])
+
+    late = [
+        await _event(db_session, event_type, trans_id, raw_payload=_payload(event_type, trans_id, at))
+        for event_type, at in [(AUTHORIZED, EVENT_TIMES[0]), (CAPTURED, EVENT_TIMES[1])]
+    ]
+    await db_session.commit()
+    await service.process_events([e.id for e in late])
+
+    await _refresh(db_session, transaction, *late)
+    assert transaction.status == TransactionStatus.REFUNDED
+    assert transaction.status_version == 1
+    assert transaction.status_event_at == datetime(2026, 5, 1, 12, 2)
+    assert transaction.extra_data == {"webhook_event_id": str(refunded.id)}
+    assert all(e.processed and e.error_message is None for e in late)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+async def test_randomly_ordered_events_from_parallel_workers_converge(
+    db_session, db_engine, seed
+):
+    """Every lifecycle ends in its final status whatever the delivery order and batching"""
+    rng = random.Random(seed)
+    transactions, events = [], []
+    for lifecycle in LIFECYCLES * 10:
+        transaction = await _transaction(db_session, status=TransactionStatus.PENDING)
+        trans_id = transaction.authorize_net_transaction_id
+        transactions.append((transaction, lifecycle))
+        for event_type, at in zip(lifecycle, EVENT_TIMES):
+            events.append(
+                await _event(
+                    db_session, event_type, trans_id, raw_payload=_payload(event_type, trans_id, at)
+                )
+            )
+    await db_session.commit()
+
+    ids = [e.id for e in events]
+    rng.shuffle(ids)
+    batches = asyncio.Queue()
+    while ids:
+        size = rng.randint(1, 8)
+        batches.put_nowait(ids[:size])
+        ids = ids[size:]
+    sessions = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def worker():
+        while not batches.empty():
+            batch = batches.get_nowait()
+            async with sessions() as session:
+                await WebhookService(session).process_events(batch)
+
+    await asyncio.gather(*(worker() for _ in range(4)))
+
+    for transaction, lifecycle in transactions:
+        await db_session.refresh(transaction)
+        assert transaction.status == FINAL_STATUS[lifecycle[-1]]
+        assert 1 <= transaction.status_version <= len(lifecycle)
+        assert transaction.status_event_at == datetime(2026, 5, 1, 12, len(lifecycle) - 1)
+    result = await db_session.execute(
+        select(WebhookEvent.processed, WebhookEvent.error_message).where(
+            WebhookEvent.id.in_([e.id for e in events])
+        )
+    )
+    assert set(result.all()) == {(True, None)}
+
+
+async def test_processed_and_unknown_events_are_skipped(db_session, statements):
+    transaction = await _transaction(db_session)
+    webhook_event = await _event(db_session, CAPTURED, transaction.authorize_net_transaction_id)
+    await db_session.commit()
+    service = WebhookService(db_session)
+    await service.process_event(str(webhook_event.id))
+    statements.clear()
+
+    report = await service.process_events([webhook_event.id, uuid.uuid4()])
+
+    assert report.events == 0
+    assert statements == ["SELECT"]
+    result = await db_session.execute(
+        select(Transaction.status).where(Transaction.id == transaction.id)
+    )
+    assert result.scalar_one() == TransactionStatus.CAPTURED
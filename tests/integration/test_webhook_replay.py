@@ -0,0 +1,161 @@
+"""Integration tests for the webhook replay pipeline"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.payment import Payment
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+from app.models.webhook_event import WebhookEvent
+from app.services import webhook_replay_service
+from app.services.webhook_replay_service import WebhookReplayService
+
+CAPTURED = "net.authorize.payment.authcapture.created"
+
+
+@pytest.fixture
+def sessions(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def since():
+    """Replays only see the events created by the running test"""
+    return datetime.utcnow()
+
+
+async def _events(session, count: int, **fields) -> tuple[list[Transaction], list[WebhookEvent]]:
+    """Authorized transactions, one capture event each, in the given processing state"""
+    payment = Payment(customer_id=f"replay-{uuid.uuid4().hex[:8]}")
+    session.add(payment)
+    await session.flush()
+    transactions, events = [], []
+    for _ in range(count):
+        trans_id = str(uuid.uuid4().int % 10**11)
+        transaction = Transaction(
+            payment_id=payment.id,
+            transaction_type=TransactionType.AUTHORIZE,
+            status=TransactionStatus.AUTHORIZED,
+            authorize_net_transaction_id=trans_id,
+            amount=Decimal("10.00"),
+            currency="USD",
+        )
+        event = WebhookEvent(
+            event_type=CAPTURED,
+            authorize_net_transaction_id=trans_id,
+            raw_payload=fields.pop("raw_payload", None)
+            or {"eventType": CAPTURED, "payload": {"id": trans_id}},
+            **fields,
+        )
+        session.add_all([transaction, event])
+        transactions.append(transaction)
+        events.append(event)
+    await session.commit()
+    return transactions, events
+
+
+async def _refresh(session, rows):
+    for row in rows:
+        await session.refresh(row)
+
+
+async def test_failed_and_never_attempted_events_are_replayed(db_session, sessions, since):
+    now = datetime.utcnow()
+    failed_txns, failed = await _events(
+        db_session, 3, error_message="database is down", processed_at=now, attempts=1
+    )
+    lost_txns, lost = await _events(db_session, 2)
+    _, done = await _events(db_session, 1, processed=True, processed_at=now, attempts=1)
+    _, dead = await _events(
+        db_session, 1, error_message="boom", attempts=8, processed_at=now, dead_lettered_at=now
+    )
+    _, backing_off = await _events(
+        db_session, 1, error_message="boom", attempts=1, next_attempt_at=now + timedelta(hours=1)
+    )
+
+    report = await WebhookReplayService(sessions, batch_size=2, min_age_seconds=0).replay(
+        since=since
+    )
+
+    assert (report.events, report.processed, report.failed, report.batches) == (5, 5, 0, 3)
+    await _refresh(db_session, failed_txns + lost_txns + failed + lost + done + dead + backing_off)
+    assert {t.status for t in failed_txns + lost_txns} == {TransactionStatus.CAPTURED}
+    assert all(e.processed and e.error_message is None for e in failed + lost)
+    assert [e.attempts for e in failed + lost] == [2, 2, 2, 1, 1]
+    assert done[0].attempts == 1
+    assert not dead[0].processed and not backing_off[0].processed
+
+
+async def test_failures_back_off_then_dead_letter(db_session, sessions, since):
+    malformed = {"raw_payload": ["not", "an", "object"]}
+    _, [retried] = await _events(db_session, 1, **malformed)
+    _, [exhausted] = await _events(
+        db_session, 1, attempts=settings.WEBHOOK_RETRY_MAX_ATTEMPTS - 1, **malformed
+    )
+    service = WebhookReplayService(sessions, min_age_seconds=0)
+
+    report = await service.replay(since=since)
+
+    assert (report.events, report.failed, report.dead_lettered) == (2, 1, 1)
+    await _refresh(db_session, [retried, exhausted])
+    assert retried.attempts == 1 and retried.dead_lettered_at is None
+    assert retried.next_attempt_at - retried.processed_at == timedelta(
+        seconds=settings.WEBHOOK_RETRY_BACKOFF_SECONDS
+    )
+    assert exhausted.dead_lettered_at is not None and exhausted.next_attempt_at is None
+    # Neither is due again: one is backing off, the other dead-lettered
+    assert (await service.replay(since=since)).events == 0
+
+
+async def test_young_events_are_left_to_live_consumers(db_session, sessions, since):
+    await _events(db_session, 2)
+
+    report = await WebhookReplayService(sessions, min_age_seconds=60).replay(since=since)
+
+    assert report.events == 0
+
+
+async def test_since_with_an_offset_is_compared_in_utc(db_session, sessions, since):
+    await _events(db_session, 2)
+    service = WebhookReplayService(sessions, min_age_seconds=0)
+    # The same instant as since, written in UTC+02:00
+    aware = since.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+
+    # An hour later in UTC: nothing created since then
+    assert (await service.replay(since=aware + timedelta(hours=1))).events == 0
+    assert (await service.replay(since=aware)).events == 2
+
+
+async def test_replay_is_rate_limited(db_session, sessions, since):
+    await _events(db_session, 20)
+    service = WebhookReplayService(sessions, batch_size=5, rate_limit=50, min_age_seconds=0)
+
+    report = await service.replay(since=since)
+
+    # 4 batches of 5 at 50 events/s: the last one starts 0.3 s after the first
+    assert report.processed == 20
+    assert report.seconds >= 0.3
+
+
+async def test_replay_waits_for_the_live_backlog_to_drain(
+    db_session, sessions, since, monkeypatch
+):
+    monkeypatch.setattr(webhook_replay_service, "BACKLOG_POLL_SECONDS", 0.01)
+    redis = FakeAsyncRedis()
+    for _ in range(3):
+        await redis.xadd(settings.WEBHOOK_STREAM, {"event_id": str(uuid.uuid4())})
+    await _events(db_session, 2)
+    service = WebhookReplayService(sessions, redis, max_live_backlog=2, min_age_seconds=0)
+
+    replay = asyncio.create_task(service.replay(since=since))
+    await asyncio.sleep(0.1)
+    assert not replay.done()
+    await redis.delete(settings.WEBHOOK_STREAM)
+    report = await asyncio.wait_for(replay, timeout=5)
+
+    assert report.processed == 2
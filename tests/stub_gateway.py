@@ -0,0 +1,342 @@
+"""Local stand-in for the Authorize.Net XML API, used by tests and benchmarks"""
+import asyncio
+import itertools
+import re
+import ssl
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+import httpx
+
+# The live gateway prefixes every response with a UTF-8 BOM (the SDK strips it)
+BOM = b"\xef\xbb\xbf"
+
+RESPONSE_NAMESPACES = (
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+    'xmlns="AnetApi/xml/v1/schema/AnetApiSchema.xsd"'
+)
+
+TRANSACTION_APPROVED = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<createTransactionResponse {ns}>"
+    "<refId>{ref_id}</refId>"
+    "<messages><resultCode>Ok</resultCode>"
+    "<message><code>I00001</code><text>Successful.</text></message></messages>"
+    "<transactionResponse>"
+    "<responseCode>1</responseCode><authCode>ABC123</authCode>"
+    "<avsResultCode>Y</avsResultCode><cvvResultCode>P</cvvResultCode>"
+    "<cavvResultCode>2</cavvResultCode><transId>{trans_id}</transId>"
+    "<refTransID>{ref_trans_id}</refTransID><transHash />"
+    "<testRequest>0</testRequest><accountNumber>XXXX1111</accountNumber>"
+    "<accountType>Visa</accountType>"
+    "<messages><message><code>1</code>"
+    "<description>This transaction has been approved.</description>"
+    "</message></messages>"
+    "<transHashSha2 />"
+    "</transactionResponse>"
+    "</createTransactionResponse>"
+)
+
+SUBSCRIPTION_CREATED = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<ARBCreateSubscriptionResponse {ns}>"
+    "<refId>{ref_id}</refId>"
+    "<messages><resultCode>Ok</resultCode>"
+    "<message><code>I00001</code><text>Successful.</text></message></messages>"
+    "<subscriptionId>{subscription_id}</subscriptionId>"
+    "</ARBCreateSubscriptionResponse>"
+)
+
+SETTLED_BATCH_LIST = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<getSettledBatchListResponse {ns}>{messages}{batch_list}</getSettledBatchListResponse>"
+)
+
+SETTLED_BATCH = (
+    "<batch><batchId>{batch_id}</batchId>"
+    "<settlementTimeUTC>{settlement_time_utc}</settlementTimeUTC>"
+    "<settlementTimeLocal>{settlement_time_utc}</settlementTimeLocal>"
+    "<settlementState>settledSuccessfully</settlementState>"
+    "<paymentMethod>creditCard</paymentMethod><marketType>eCommerce</marketType>"
+    "<product>Card Not Present</product></batch>"
+)
+
+TRANSACTION_LIST = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<getTransactionListResponse {ns}>{messages}"
+    "<transactions>{transactions}</transactions>"
+    "<totalNumInResultSet>{total}</totalNumInResultSet>"
+    "</getTransactionListResponse>"
+)
+
+TRANSACTION_SUMMARY = (
+    "<transaction><transId>{trans_id}</transId>"
+    "<submitTimeUTC>{submit_time_utc}</submitTimeUTC>"
+    "<submitTimeLocal>{submit_time_utc}</submitTimeLocal>"
+    "<transactionStatus>{status}</transactionStatus>"
+    "<firstName>Ada</firstName><lastName>Lovelace</lastName>"
+    "<accountType>Visa</accountType><accountNumber>XXXX1111</accountNumber>"
+    "<settleAmount>{amount}</settleAmount>"
+    "<marketType>eCommerce</marketType><product>Card Not Present</product>"
+    "</transaction>"
+)
+
+TRANSACTION_DETAILS = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<getTransactionDetailsResponse {ns}>{messages}"
+    "<transaction><transId>{trans_id}</transId>{ref_trans_id}"
+    "<submitTimeUTC>{submit_time_utc}</submitTimeUTC>"
+    "<submitTimeLocal>{submit_time_utc}</submitTimeLocal>"
+    "<transactionType>{transaction_type}</transactionType>"
+    "<transactionStatus>{status}</transactionStatus>"
+    "<responseCode>1</responseCode><responseReasonCode>1</responseReasonCode>"
+    "<batch><batchId>{batch_id}</batchId>"
+    "<settlementTimeUTC>{settlement_time_utc}</settlementTimeUTC>"
+    "<settlementState>settledSuccessfully</settlementState></batch>"
+    "<authAmount>{amount}</authAmount><settleAmount>{amount}</settleAmount>"
+    "</transaction></getTransactionDetailsResponse>"
+)
+
+MESSAGES_OK = (
+    "<messages><resultCode>Ok</resultCode>"
+    "<message><code>I00001</code><text>Successful.</text></message></messages>"
+)
+MESSAGES_NO_RECORDS = (
+    "<messages><resultCode>Ok</resultCode>"
+    "<message><code>I00004</code><text>No records found.</text></message></messages>"
+)
+
+RECORD_NOT_FOUND = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<{root} {ns}>"
+    "<messages><resultCode>Error</resultCode>"
+    "<message><code>E00040</code><text>The record cannot be found.</text></message>"
+    "</messages></{root}>"
+)
+
+UNSUPPORTED_REQUEST = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<ErrorResponse {ns}>"
+    "<messages><resultCode>Error</resultCode>"
+    "<message><code>E00003</code><text>Unsupported request: {root}</text></message>"
+    "</messages></ErrorResponse>"
+)
+
+_ROOT_RE = re.compile(rb"<([A-Za-z]+)[\s>]")
+
+
+class SettledTransaction(NamedTuple):
+    """A transaction the stub reports as part of a settled batch"""
+
+    trans_id: str
+    status: str = "settledSuccessfully"
+    amount: Decimal = Decimal("10.00")
+    transaction_type: str = "authCaptureTransaction"
+    ref_trans_id: str | None = None
+    submit_time_utc: str = "2024-05-01T12:00:00Z"
+
+
+def _element_text(body: bytes, name: str) -> str:
+    match = re.search(rb"<%s>([^<]*)</%s>" % (name.encode(), name.encode()), body)
+    return match.group(1).decode() if match else ""
+
+
+def _root_element(body: bytes) -> str:
+    for match in _ROOT_RE.finditer(body):
+        if match.group(1) != b"xml":
+            return match.group(1).decode()
+    return ""
+
+
+class StubGateway:
+    """
+    Answers createTransactionRequest and ARBCreateSubscriptionRequest posts
+    with canned approvals after a configurable latency.
+
+    Use ``start()`` for a real HTTP server (SDK / keep-alive paths) or pass
+    ``handle`` / ``ahandle`` to ``httpx.MockTransport`` for in-process tests.
+
+    Batches registered with ``settle()`` are served through the Transaction
+    Reporting API (getSettledBatchList, paged getTransactionList and
+    getTransactionDetails). ``peak_in_flight`` records the highest number of
+    requests handled at once.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests: list[bytes] = []
+        self._ids = itertools.count(60000000001)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self.batches: dict[str, tuple[str, list[SettledTransaction]]] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def settle(
+        self,
+        batch_id: str,
+        transactions: list[SettledTransaction],
+        settlement_time_utc: str = "2024-05-02T08:00:00Z",
+    ) -> None:
+        """Register a settled batch for the reporting API"""
+        self.batches[batch_id] = (settlement_time_utc, list(transactions))
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _settled_batch_list(self, body: bytes) -> str:
+        first = _element_text(body, "firstSettlementDate")
+        last = _element_text(body, "lastSettlementDate")
+        batches = "".join(
+            SETTLED_BATCH.format(batch_id=batch_id, settlement_time_utc=settled_at)
+            for batch_id, (settled_at, _) in self.batches.items()
+            if first <= settled_at <= last
+        )
+        return SETTLED_BATCH_LIST.format(
+            ns=RESPONSE_NAMESPACES,
+            messages=MESSAGES_OK if batches else MESSAGES_NO_RECORDS,
+            batch_list=f"<batchList>{batches}</batchList>" if batches else "",
+        )
+
+    def _transaction_list(self, body: bytes) -> str:
+        _, transactions = self.batches.get(_element_text(body, "batchId"), ("", []))
+        limit = int(_element_text(body, "limit") or 1000)
+        offset = int(_element_text(body, "offset") or 1)
+        page = transactions[(offset - 1) * limit : offset * limit]
+        return TRANSACTION_LIST.format(
+            ns=RESPONSE_NAMESPACES,
+            messages=MESSAGES_OK if page else MESSAGES_NO_RECORDS,
+            transactions="".join(
+                TRANSACTION_SUMMARY.format(
+                    trans_id=t.trans_id,
+                    submit_time_utc=t.submit_time_utc,
+                    status=t.status,
+                    amount=t.amount,
+                )
+                for t in page
+            ),
+            total=len(transactions),
+        )
+
+    def _transaction_details(self, body: bytes) -> str:
+        trans_id = _element_text(body, "transId")
+        for batch_id, (settled_at, transactions) in self.batches.items():
+            for t in transactions:
+                if t.trans_id == trans_id:
+                    return TRANSACTION_DETAILS.format(
+                        ns=RESPONSE_NAMESPACES,
+                        messages=MESSAGES_OK,
+                        trans_id=t.trans_id,
+                        ref_trans_id=(
+                            f"<refTransId>{t.ref_trans_id}</refTransId>" if t.ref_trans_id else ""
+                        ),
+                        submit_time_utc=t.submit_time_utc,
+                        transaction_type=t.transaction_type,
+                        status=t.status,
+                        batch_id=batch_id,
+                        settlement_time_utc=settled_at,
+                        amount=t.amount,
+                    )
+        return RECORD_NOT_FOUND.format(ns=RESPONSE_NAMESPACES, root="getTransactionDetailsResponse")
+
+    def respond(self, body: bytes) -> bytes:
+        """Build the gateway reply for a raw request body"""
+        with self._lock:
+            self.requests.append(body)
+            next_id = next(self._ids)
+        root = _root_element(body)
+        ref_id = _element_text(body, "refId")
+        if root == "createTransactionRequest":
+            xml = TRANSACTION_APPROVED.format(
+                ns=RESPONSE_NAMESPACES,
+                ref_id=ref_id,
+                trans_id=next_id,
+                ref_trans_id=_element_text(body, "refTransId"),
+            )
+        elif root == "ARBCreateSubscriptionRequest":
+            xml = SUBSCRIPTION_CREATED.format(
+                ns=RESPONSE_NAMESPACES, ref_id=ref_id, subscription_id=next_id
+            )
+        elif root == "getSettledBatchListRequest":
+            xml = self._settled_batch_list(body)
+        elif root == "getTransactionListRequest":
+            xml = self._transaction_list(body)
+        elif root == "getTransactionDetailsRequest":
+            xml = self._transaction_details(body)
+        else:
+            xml = UNSUPPORTED_REQUEST.format(ns=RESPONSE_NAMESPACES, root=root)
+        return BOM + xml.encode("utf-8")
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Synchronous httpx.MockTransport handler"""
+        self._enter()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return httpx.Response(200, content=self.respond(request.read()))
+        finally:
+            self._exit()
+
+    async def ahandle(self, request: httpx.Request) -> httpx.Response:
+        """Asynchronous httpx.MockTransport handler"""
+        self._enter()
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return httpx.Response(200, content=self.respond(await request.aread()))
+        finally:
+            self._exit()
+
+    def start(
+        self, host: str = "127.0.0.1", port: int = 0, ssl_context: ssl.SSLContext | None = None
+    ) -> str:
+        """Serve over HTTP/1.1 (keep-alive) on a background thread; returns the URL"""
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                gateway._enter()
+                try:
+                    if gateway.latency:
+                        time.sleep(gateway.latency)
+                    reply = gateway.respond(body)
+                finally:
+                    gateway._exit()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        scheme = "http"
+        if ssl_context:
+            self._server.socket = ssl_context.wrap_socket(self._server.socket, server_side=True)
+            scheme = "https"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        bound_host, bound_port = self._server.server_address[:2]
+        return f"{scheme}://{bound_host}:{bound_port}/xml/v1/request.api"
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,201 @@
+"""Unit tests for the non-blocking Authorize.Net client"""
+import asyncio
+import time
+from decimal import Decimal
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.adapters.authorize_net.async_client import AsyncAuthorizeNetClient
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.connection_pool import (
+    AsyncGatewayConnectionPool,
+    get_connection_pool,
+)
+from app.adapters.authorize_net.exceptions import (
+    AuthorizeNetConnectionError,
+    AuthorizeNetValidationError,
+)
+from app.adapters.authorize_net.models import (
+    PurchaseRequest,
+    CaptureRequest,
+    CreditCard,
+    CustomerAddress,
+    CustomerData,
+    TransactionResponse,
+)
+from tests.stub_gateway import StubGateway
+
+
+def _purchase_request() -> PurchaseRequest:
+    return PurchaseRequest(
+        amount=Decimal("10.00"),
+        credit_card=CreditCard(card_number="4111111111111111", expiration_date="2035-12"),
+        customer_address=CustomerAddress(
+            first_name="Ada",
+            last_name="Lovelace",
+            address="1 Main St",
+            city="Austin",
+            state="TX",
+            zip="78701",
+        ),
+        customer_data=CustomerData(customer_id="cust-1", email="ada@example.com"),
+        ref_id="ref-1",
+    )
+
+
+async def test_httpx_transport_posts_sdk_payload():
+    gateway = StubGateway()
+    client = AsyncAuthorizeNetClient(
+        transport="httpx",
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(gateway.ahandle)),
+    )
+
+    response = await client.purchase(_purchase_request())
+    await client.aclose()
+
+    assert response.success is True
+    assert response.transaction_id == "60000000001"
+    assert response.result_code == "Ok"
+    assert response.response_code == "1"
+    sync_client = AuthorizeNetClient()
+    assert gateway.requests == [sync_client.render_purchase_request(_purchase_request())]
+
+
+async def test_default_client_shares_the_process_wide_pool():
+    client = AsyncAuthorizeNetClient(transport="executor")
+    await client.aclose()
+
+    assert client.client.pool is get_connection_pool()
+    # Still open for every other client in the process
+    assert not get_connection_pool()._client.is_closed
+
+
+async def test_httpx_transport_translates_connection_errors():
+    def refuse(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = AsyncAuthorizeNetClient(
+        transport="httpx",
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(refuse)),
+    )
+
+    with pytest.raises(AuthorizeNetConnectionError):
+        await client.capture(CaptureRequest(amount=Decimal("1.00"), transaction_id="123"))
+    await client.aclose()
+
+
+async def test_httpx_transport_treats_error_status_as_null_response():
+    client = AsyncAuthorizeNetClient(
+        transport="httpx",
+        pool=AsyncGatewayConnectionPool(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        ),
+    )
+
+    response = await client.capture(CaptureRequest(amount=Decimal("1.00"), transaction_id="123"))
+    await client.aclose()
+
+    assert response.success is False
+    assert response.error_text == "Null response from Authorize.Net"
+
+
+async def test_executor_transport_does_not_block_event_loop():
+    sync_client = AuthorizeNetClient()
+
+    def slow_purchase(request):
+        time.sleep(0.2)
+        return TransactionResponse(success=True, transaction_id="1")
+
+    sync_client.purchase = slow_purchase
+    client = AsyncAuthorizeNetClient(client=sync_client, transport="executor", max_concurrency=4)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    results = await asyncio.gather(*(client.purchase(_purchase_request()) for _ in range(4)))
+    elapsed = time.perf_counter() - started
+    ticker_task.cancel()
+    await client.aclose()
+
+    assert all(r.success for r in results)
+    assert elapsed < 0.6  # four 200ms calls ran in parallel
+    assert ticks >= 10  # the loop kept running while the gateway was slow
+
+
+async def test_executor_transport_is_bounded():
+    sync_client = AuthorizeNetClient()
+    in_flight = 0
+    peak = 0
+
+    def slow_capture(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        time.sleep(0.05)
+        in_flight -= 1
+        return TransactionResponse(success=True)
+
+    sync_client.capture = slow_capture
+    client = AsyncAuthorizeNetClient(client=sync_client, transport="executor", max_concurrency=2)
+
+    request = CaptureRequest(amount=Decimal("1.00"), transaction_id="123")
+    await asyncio.gather(*(client.capture(request) for _ in range(6)))
+    await client.aclose()
+
+    assert peak <= 2
+
+
+async def test_executor_transport_against_stub_gateway():
+    gateway = StubGateway()
+    url = gateway.start()
+    client = AsyncAuthorizeNetClient(client=AuthorizeNetClient(endpoint_url=url), transport="executor")
+
+    try:
+        response = await client.purchase(_purchase_request())
+    finally:
+        await client.aclose()
+        gateway.stop()
+
+    assert response.success is True
+    assert response.transaction_id == "60000000001"
+
+
+def test_unsupported_transport_rejected():
+    with pytest.raises(AuthorizeNetValidationError):
+        AsyncAuthorizeNetClient(transport="carrier-pigeon")
+
+
+async def test_gateway_calls_are_timed_by_operation_and_result_code():
+    def refuse(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    def count(operation: str, result_code: str) -> float:
+        labels = {"operation": operation, "result_code": result_code}
+        return REGISTRY.get_sample_value("authorize_net_request_duration_seconds_count", labels)
+
+    ok, failed = count("purchase", "Ok"), count("capture", "exception")
+    client = AsyncAuthorizeNetClient(
+        transport="httpx",
+        pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(StubGateway().ahandle)),
+    )
+    refused = AsyncAuthorizeNetClient(
+        transport="httpx", pool=AsyncGatewayConnectionPool(transport=httpx.MockTransport(refuse))
+    )
+
+    await client.purchase(_purchase_request())
+    with pytest.raises(AuthorizeNetConnectionError):
+        await refused.capture(CaptureRequest(amount=Decimal("1.00"), transaction_id="123"))
+    await client.aclose()
+    await refused.aclose()
+
+    assert count("purchase", "Ok") == ok + 1
+    assert count("capture", "exception") == failed + 1
@@ -0,0 +1,71 @@
+"""Unit tests for the Authorize.Net client request building"""
+from decimal import Decimal
+
+import pytest
+
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.exceptions import AuthorizeNetValidationError
+from app.adapters.authorize_net.models import (
+    PurchaseRequest,
+    CreditCard,
+    CustomerAddress,
+    CustomerData,
+    VoidRequest,
+)
+from app.core.config import settings
+
+
+def _purchase_request(duplicate_window: int = 600) -> PurchaseRequest:
+    return PurchaseRequest(
+        amount=Decimal("5.00"),
+        credit_card=CreditCard(card_number="4111 1111 1111 1111", expiration_date="2035-12"),
+        customer_address=CustomerAddress(
+            first_name="Ada",
+            last_name="Lovelace",
+            address="1 Main St",
+            city="Austin",
+            state="TX",
+            zip="78701",
+        ),
+        customer_data=CustomerData(customer_id="cust-1", email="ada@example.com"),
+        duplicate_window=duplicate_window,
+    )
+
+
+def test_static_request_parts_are_built_once():
+    client = AuthorizeNetClient()
+
+    first = client.build_purchase_request(_purchase_request())
+    second = client.build_authorize_request(_purchase_request())
+    void = client.build_void_request(VoidRequest(transaction_id="1"))
+
+    assert first.merchantAuthentication is second.merchantAuthentication
+    assert void.merchantAuthentication is first.merchantAuthentication
+    assert (
+        first.transactionRequest.transactionSettings
+        is second.transactionRequest.transactionSettings
+    )
+
+
+def test_transaction_settings_cached_per_duplicate_window():
+    client = AuthorizeNetClient()
+
+    default = client.build_purchase_request(_purchase_request(600))
+    custom = client.build_purchase_request(_purchase_request(120))
+
+    settings_xml = client.serialize(custom, "createTransactionRequest")
+    assert b"<settingValue>120</settingValue>" in settings_xml
+    assert (
+        default.transactionRequest.transactionSettings
+        is not custom.transactionRequest.transactionSettings
+    )
+
+
+def test_endpoint_resolved_at_construction(monkeypatch):
+    monkeypatch.setattr(settings, "AUTHORIZE_NET_ENDPOINT_URL", None)
+    monkeypatch.setattr(settings, "AUTHORIZE_NET_ENVIRONMENT", "Production")
+    assert AuthorizeNetClient().endpoint == "https://api2.authorize.net/xml/v1/request.api"
+
+    monkeypatch.setattr(settings, "AUTHORIZE_NET_ENVIRONMENT", "staging")
+    with pytest.raises(AuthorizeNetValidationError):
+        AuthorizeNetClient()
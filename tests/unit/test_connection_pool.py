@@ -0,0 +1,82 @@
+"""Unit tests for the Authorize.Net keep-alive connection pools"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.adapters.authorize_net.client import AuthorizeNetClient
+from app.adapters.authorize_net.connection_pool import (
+    GatewayConnectionPool,
+    AsyncGatewayConnectionPool,
+)
+from app.adapters.authorize_net.models import VoidRequest
+from tests.stub_gateway import StubGateway
+
+
+def test_sync_pool_reuses_connection_across_requests():
+    gateway = StubGateway()
+    url = gateway.start()
+    pool = GatewayConnectionPool(pool_size=4)
+    client = AuthorizeNetClient(endpoint_url=url, pool=pool)
+
+    try:
+        responses = [
+            client.void(VoidRequest(transaction_id=str(i), ref_id="pool-test")) for i in range(5)
+        ]
+    finally:
+        pool.close()
+        gateway.stop()
+
+    assert all(r.success for r in responses)
+    stats = pool.stats.snapshot()
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_sync_pool_is_shared_between_threads():
+    gateway = StubGateway(latency=0.05)
+    url = gateway.start()
+    pool = GatewayConnectionPool(pool_size=2)
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            bodies = list(executor.map(lambda _: pool.post(url, b"<voidRequest/>"), range(8)))
+    finally:
+        pool.close()
+        gateway.stop()
+
+    stats = pool.stats.snapshot()
+    assert all(bodies)
+    assert stats["requests"] == 8
+    assert stats["connections_opened"] <= 2
+    assert stats["peak_in_flight"] <= 4
+    assert stats["utilization"] == 0
+
+
+async def test_async_pool_reuses_connection_and_reports_utilization():
+    gateway = StubGateway(latency=0.02)
+    url = gateway.start()
+    pool = AsyncGatewayConnectionPool(pool_size=3)
+
+    try:
+        await asyncio.gather(*(pool.post(url, b"<voidRequest/>") for _ in range(6)))
+        await pool.post(url, b"<voidRequest/>")
+    finally:
+        await pool.aclose()
+        gateway.stop()
+
+    stats = pool.stats.snapshot()
+    assert stats["requests"] == 7
+    assert stats["connections_opened"] <= 3
+    assert stats["peak_in_flight"] == 6  # in flight counts requests waiting on the pool too
+    assert stats["in_flight"] == 0
+
+
+def test_sync_pool_returns_none_on_error_status():
+    pool = GatewayConnectionPool(
+        transport=httpx.MockTransport(lambda request: httpx.Response(500))
+    )
+    assert pool.post("http://gateway.test/xml/v1/request.api", b"<x/>") is None
+    pool.close()
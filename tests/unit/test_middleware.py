@@ -0,0 +1,119 @@
+"""Unit tests for the correlation ID and error handler middleware"""
+import asyncio
+
+import httpx
+import pytest
+import structlog
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.middleware.correlation import CorrelationIdMiddleware
+from app.middleware.error_handler import ErrorHandlerMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CorrelationIdMiddleware)
+    app.add_middleware(ErrorHandlerMiddleware)
+
+    @app.get("/echo")
+    async def echo(request: Request):
+        return {
+            "state": request.state.correlation_id,
+            "logged": structlog.contextvars.get_contextvars().get("correlation_id"),
+        }
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+async def _get(app, path: str, **kwargs) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, **kwargs)
+
+
+async def test_correlation_id_is_propagated():
+    app = _app()
+
+    passed = await _get(app, "/echo", headers={"X-Correlation-ID": "corr-123"})
+    generated = await _get(app, "/echo")
+
+    assert passed.headers["X-Correlation-ID"] == "corr-123"
+    assert passed.json() == {"state": "corr-123", "logged": "corr-123"}
+    correlation_id = generated.headers["X-Correlation-ID"]
+    assert correlation_id and generated.json() == {"state": correlation_id, "logged": correlation_id}
+
+
+async def test_unhandled_exception_returns_error_envelope():
+    response = await _get(_app(), "/boom", headers={"X-Correlation-ID": "corr-500"})
+
+    assert response.status_code == 500
+    assert response.json() == {"error": "Internal server error", "correlation_id": "corr-500"}
+
+
+async def test_streaming_response_is_not_buffered():
+    app = _app()
+    messages = []
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"first"
+            # The first chunk reached the server before the second is produced
+            assert messages[-1]["body"] == b"first"
+            yield b"second"
+
+        return StreamingResponse(chunks())
+
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # StreamingResponse listens for a disconnect while it streams
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"x-correlation-id", b"corr-stream")],
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+
+    assert messages[0]["status"] == 200
+    assert (b"x-correlation-id", b"corr-stream") in messages[0]["headers"]
+    assert [m.get("body") for m in messages[1:] if m.get("body")] == [b"first", b"second"]
+
+
+async def test_exception_after_response_start_propagates():
+    app = _app()
+
+    @app.get("/broken-stream")
+    async def broken_stream():
+        async def chunks():
+            yield b"partial"
+            raise RuntimeError("stream failed")
+
+        return StreamingResponse(chunks())
+
+    with pytest.raises(RuntimeError, match="stream failed"):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/broken-stream")
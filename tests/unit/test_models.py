@@ -4,7 +4,13 @@ from datetime import datetime
 from uuid import uuid4
 
 from app.models.payment import Payment
-from app.models.transaction import Transaction, TransactionType, TransactionStatus
+from app.models.transaction import (
+    STATUS_PREDECESSORS,
+    Transaction,
+    TransactionType,
+    TransactionStatus,
+    can_transition,
+)
 from app.models.idempotency import IdempotencyKey
 from app.models.webhook_event import WebhookEvent
 
@@ -28,6 +34,20 @@ def test_transaction_status_enum():
     assert TransactionStatus.FAILED == "failed"
 
 
+def test_status_transitions_only_move_forward():
+    """Test a status can never be reached again once left"""
+    assert set(STATUS_PREDECESSORS) == set(TransactionStatus)
+    assert can_transition(TransactionStatus.AUTHORIZED, TransactionStatus.CAPTURED)
+    assert can_transition(TransactionStatus.AUTHORIZED, TransactionStatus.REFUNDED)
+    assert not can_transition(TransactionStatus.CAPTURED, TransactionStatus.AUTHORIZED)
+    assert not can_transition(TransactionStatus.REFUNDED, TransactionStatus.CAPTURED)
+    assert not can_transition(TransactionStatus.VOIDED, TransactionStatus.REFUNDED)
+    assert not can_transition(TransactionStatus.CAPTURED, TransactionStatus.CAPTURED)
+    for status, predecessors in STATUS_PREDECESSORS.items():
+        for previous in predecessors:
+            assert not can_transition(status, previous)
+
+
 def test_idempotency_key_expires_at():
     """Test IdempotencyKey expiration calculation"""
     expires_at = IdempotencyKey.create_expires_at(hours=24)
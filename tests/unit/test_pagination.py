@@ -0,0 +1,23 @@
+"""Unit tests for keyset cursors"""
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    row_id = uuid4()
+    cursor = encode_cursor(created_at, row_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, row_id)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["", "not a cursor", "bm9waXBl", encode_cursor(datetime(2024, 1, 1), uuid4())[:-4]]
+)
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
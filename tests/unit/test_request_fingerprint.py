@@ -0,0 +1,45 @@
+"""Unit tests for idempotency request fingerprints"""
+import json
+
+from starlette.requests import Request
+
+from app.api.v1.dependencies import get_request_fingerprint
+from app.services.idempotency_service import fingerprint_request
+
+PATH = "/api/v1/payments/purchase"
+BODY = b'{"amount":"10.00","customer_id":"cust-1"}'
+
+
+def _request(body: bytes, path: str = PATH) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "path": path, "headers": []}, receive)
+
+
+def test_same_request_same_fingerprint():
+    assert fingerprint_request("POST", PATH, BODY) == fingerprint_request("POST", PATH, BODY)
+
+
+def test_body_and_target_change_the_fingerprint():
+    fingerprint = fingerprint_request("POST", PATH, BODY)
+    other_body = json.dumps({"amount": "11.00", "customer_id": "cust-1"}).encode()
+
+    assert fingerprint_request("POST", PATH, other_body) != fingerprint
+    assert fingerprint_request("POST", "/api/v1/payments/t-1/refund", BODY) != fingerprint
+    assert fingerprint_request("POST", "/api/v1/payments/t-2/refund", BODY) != (
+        fingerprint_request("POST", "/api/v1/payments/t-1/refund", BODY)
+    )
+
+
+async def test_dependency_hashes_the_raw_body():
+    request = _request(BODY)
+    await request.body()  # FastAPI reads the body before resolving dependencies
+
+    fingerprint = await get_request_fingerprint(request, "key-1")
+
+    assert fingerprint == fingerprint_request("POST", PATH, BODY)
+
+
+async def test_dependency_skips_requests_without_a_key():
+    assert await get_request_fingerprint(_request(BODY), None) is None
@@ -0,0 +1,229 @@
+"""Parity tests: template serializer vs the SDK's PyXB serialization"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from xml.etree.ElementTree import canonicalize
+
+import pytest
+from authorizenet import apicontractsv1
+
+from app.adapters.authorize_net.client import AuthorizeNetClient, CREATE_TRANSACTION_REQUEST
+from app.adapters.authorize_net.models import (
+    PurchaseRequest,
+    CaptureRequest,
+    VoidRequest,
+    RefundRequest,
+    CreditCard,
+    CustomerAddress,
+    CustomerData,
+    LineItem,
+    SettledBatchListRequest,
+    TransactionListRequest,
+    TransactionDetailsRequest,
+)
+from app.adapters.authorize_net.templates import decimal_literal
+
+
+def _purchase(**overrides) -> PurchaseRequest:
+    fields = dict(
+        amount=Decimal("10.00"),
+        credit_card=CreditCard(card_number="4111111111111111", expiration_date="2035-12"),
+        customer_address=CustomerAddress(
+            first_name="Ada",
+            last_name="Lovelace",
+            address="1 Main St",
+            city="Austin",
+            state="TX",
+            zip="78701",
+        ),
+        customer_data=CustomerData(customer_id="cust-1", email="ada@example.com"),
+    )
+    fields.update(overrides)
+    return PurchaseRequest(**fields)
+
+
+PURCHASES = {
+    "minimal": _purchase(),
+    "full": _purchase(
+        amount=Decimal("1234.5"),
+        credit_card=CreditCard(
+            card_number="4111 1111-1111 1111", expiration_date="12/35", card_code="123"
+        ),
+        customer_address=CustomerAddress(
+            first_name="Ada",
+            last_name="Lovelace",
+            address="1 Main St",
+            city="Austin",
+            state="TX",
+            zip="78701",
+            country="CAN",
+            company="Analytical Engines",
+        ),
+        customer_data=CustomerData(
+            customer_id="cust-1", email="ada@example.com", customer_type="business"
+        ),
+        invoice_number="INV-42",
+        description="Two engines",
+        line_items=[
+            LineItem("sku-1", "Engine", "Difference engine", "2", "500.25"),
+            LineItem("sku-2", "Cards", "Punched cards", "100", "2.34"),
+        ],
+        duplicate_window=0,
+        ref_id="order-42",
+    ),
+    "escaping": _purchase(
+        customer_address=CustomerAddress(
+            first_name='<Ada & "Co">',
+            last_name="O'Brien",
+            address="1 Main St ]]> <![CDATA[x]]>",
+            city="Zürich",
+            state="ZH",
+            zip="8001",
+            company="A&B",
+        ),
+        description="tab\there\nnewline & ünïcödé ✓",
+        invoice_number="<inv>",
+    ),
+    "empty_strings": _purchase(
+        customer_data=CustomerData(customer_id="", email="ada@example.com"),
+        description="",
+        invoice_number="",
+    ),
+    "only_description": _purchase(description="Just a description"),
+    "long_ref_id": _purchase(ref_id="r" * 40),
+}
+
+AMOUNTS = ["0", "0.01", "1", "1.00", "10.50", "100", "1E+2", "12345.678", "0.0000001"]
+
+
+def _assert_same_document(rendered: bytes, reference: bytes) -> None:
+    assert rendered.startswith(b'<?xml version="1.0" encoding="utf-8"?>')
+    assert canonicalize(rendered) == canonicalize(reference)
+
+
+@pytest.fixture(scope="module")
+def client():
+    return AuthorizeNetClient()
+
+
+@pytest.mark.parametrize("name", PURCHASES)
+@pytest.mark.parametrize("operation", ["purchase", "authorize"])
+def test_card_transactions_match_sdk(client, name, operation):
+    request = PURCHASES[name]
+    rendered = getattr(client, f"render_{operation}_request")(request)
+    reference = client.serialize(
+        getattr(client, f"build_{operation}_request")(request), CREATE_TRANSACTION_REQUEST
+    )
+    _assert_same_document(rendered, reference)
+
+
+@pytest.mark.parametrize("amount", AMOUNTS)
+def test_capture_matches_sdk(client, amount):
+    request = CaptureRequest(amount=Decimal(amount), transaction_id="60000000001", ref_id="cap")
+    _assert_same_document(
+        client.render_capture_request(request),
+        client.serialize(client.build_capture_request(request), CREATE_TRANSACTION_REQUEST),
+    )
+
+
+@pytest.mark.parametrize("ref_id", [None, "void-1", "x" * 25])
+def test_void_matches_sdk(client, ref_id):
+    request = VoidRequest(transaction_id="60000000001", ref_id=ref_id)
+    _assert_same_document(
+        client.render_void_request(request),
+        client.serialize(client.build_void_request(request), CREATE_TRANSACTION_REQUEST),
+    )
+
+
+@pytest.mark.parametrize("amount", AMOUNTS)
+def test_refund_matches_sdk(client, amount):
+    request = RefundRequest(
+        amount=Decimal(amount), transaction_id="60000000001", card_number_last4="1111"
+    )
+    _assert_same_document(
+        client.render_refund_request(request),
+        client.serialize(client.build_refund_request(request), CREATE_TRANSACTION_REQUEST),
+    )
+
+
+def test_plain_requests_are_byte_identical(client):
+    request = PURCHASES["full"]
+    assert client.render_purchase_request(request) == client.serialize(
+        client.build_purchase_request(request), CREATE_TRANSACTION_REQUEST
+    )
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (Decimal("10.00"), "10.0"),
+        (Decimal("1E+2"), "100.0"),
+        (Decimal("0"), "0.0"),
+        (Decimal("-1.50"), "-1.5"),
+        (Decimal("1e-7"), "0.0000001"),
+        ("3", "3.0"),
+    ],
+)
+def test_decimal_literal_matches_pyxb(value, expected):
+    assert decimal_literal(value) == expected
+
+
+@pytest.mark.parametrize("include_statistics", [False, True])
+def test_settled_batch_list_matches_sdk(client, include_statistics):
+    first = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    last = datetime(2024, 5, 31, 23, 59, 59, tzinfo=timezone.utc)
+    reference = apicontractsv1.getSettledBatchListRequest()
+    reference.merchantAuthentication = client._merchant_auth
+    reference.includeStatistics = include_statistics
+    reference.firstSettlementDate = first
+    reference.lastSettlementDate = last
+    request = SettledBatchListRequest(
+        first_settlement_date=first,
+        last_settlement_date=last,
+        include_statistics=include_statistics,
+    )
+    _assert_same_document(
+        client.render_settled_batch_list_request(request),
+        client.serialize(reference, "getSettledBatchListRequest"),
+    )
+
+
+def test_naive_settlement_dates_are_utc(client):
+    request = SettledBatchListRequest(
+        first_settlement_date=datetime(2024, 5, 1),
+        last_settlement_date=datetime(2024, 5, 2, 12, 30),
+    )
+    rendered = client.render_settled_batch_list_request(request)
+    assert b"<firstSettlementDate>2024-05-01T00:00:00Z</firstSettlementDate>" in rendered
+    assert b"<lastSettlementDate>2024-05-02T12:30:00Z</lastSettlementDate>" in rendered
+
+
+def test_transaction_list_matches_sdk(client):
+    sorting = apicontractsv1.TransactionListSorting()
+    sorting.orderBy = apicontractsv1.TransactionListOrderFieldEnum.submitTimeUTC
+    sorting.orderDescending = False
+    paging = apicontractsv1.Paging()
+    paging.limit = 500
+    paging.offset = 3
+    reference = apicontractsv1.getTransactionListRequest()
+    reference.merchantAuthentication = client._merchant_auth
+    reference.batchId = "12345678"
+    reference.sorting = sorting
+    reference.paging = paging
+    _assert_same_document(
+        client.render_transaction_list_request(
+            TransactionListRequest(batch_id="12345678", limit=500, offset=3)
+        ),
+        client.serialize(reference, "getTransactionListRequest"),
+    )
+
+
+def test_transaction_details_matches_sdk(client):
+    reference = apicontractsv1.getTransactionDetailsRequest()
+    reference.merchantAuthentication = client._merchant_auth
+    reference.transId = "60000000001"
+    _assert_same_document(
+        client.render_transaction_details_request(
+            TransactionDetailsRequest(transaction_id="60000000001")
+        ),
+        client.serialize(reference, "getTransactionDetailsRequest"),
+    )
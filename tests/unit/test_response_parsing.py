@@ -0,0 +1,252 @@
+"""Unit tests for reading raw Authorize.Net responses"""
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from app.adapters.authorize_net.models import (
+    SubscriptionResponse,
+    TransactionResponse,
+    SettledBatch,
+    TransactionSummary,
+    TransactionDetails,
+)
+from app.adapters.authorize_net.responses import (
+    read_transaction_response,
+    read_subscription_response,
+    read_settled_batch_list_response,
+    read_transaction_list_response,
+    read_transaction_details_response,
+)
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "authorize_net"
+
+APPROVED = "This transaction has been approved."
+
+
+def _fixture(name: str) -> bytes:
+    return (FIXTURES / name).read_bytes()
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        (
+            "purchase_approved.xml",
+            TransactionResponse(
+                success=True,
+                transaction_id="40000318725",
+                response_code="1",
+                message_code="1",
+                message_description=APPROVED,
+                result_code="Ok",
+            ),
+        ),
+        (
+            "authorize_approved.xml",
+            TransactionResponse(
+                success=True,
+                transaction_id="40000318726",
+                response_code="1",
+                message_code="1",
+                message_description=APPROVED,
+                result_code="Ok",
+            ),
+        ),
+        (
+            "capture_approved.xml",
+            TransactionResponse(
+                success=True,
+                transaction_id="40000318726",
+                response_code="1",
+                message_code="1",
+                message_description=APPROVED,
+                result_code="Ok",
+            ),
+        ),
+        (
+            "void_approved.xml",
+            TransactionResponse(
+                success=True,
+                transaction_id="40000318726",
+                response_code="1",
+                message_code="1",
+                message_description=APPROVED,
+                result_code="Ok",
+            ),
+        ),
+        (
+            "refund_approved.xml",
+            TransactionResponse(
+                success=True,
+                transaction_id="40000318730",
+                response_code="1",
+                message_code="1",
+                message_description=APPROVED,
+                result_code="Ok",
+            ),
+        ),
+        (
+            "purchase_declined.xml",
+            TransactionResponse(
+                success=False,
+                error_code="2",
+                error_text="This transaction has been declined.",
+                result_code="Error",
+            ),
+        ),
+        (
+            "purchase_invalid_card.xml",
+            TransactionResponse(
+                success=False,
+                error_code="6",
+                error_text="The credit card number is invalid.",
+                result_code="Error",
+            ),
+        ),
+        (
+            "refund_unsettled.xml",
+            TransactionResponse(
+                success=False,
+                error_code="54",
+                error_text="The referenced transaction does not meet the criteria for issuing a credit.",
+                result_code="Error",
+            ),
+        ),
+        (
+            "authentication_failed.xml",
+            TransactionResponse(
+                success=False,
+                error_code="E00007",
+                error_text="User authentication failed due to invalid authentication values.",
+                result_code="Error",
+            ),
+        ),
+    ],
+)
+def test_read_transaction_response_fixtures(name, expected):
+    assert read_transaction_response(_fixture(name)) == expected
+
+
+def test_read_subscription_created():
+    assert read_subscription_response(_fixture("subscription_created.xml")) == SubscriptionResponse(
+        success=True,
+        subscription_id="8926781",
+        result_code="Ok",
+        message_code="I00001",
+        message_text="Successful.",
+    )
+
+
+def test_read_subscription_duplicate():
+    response = read_subscription_response(_fixture("subscription_duplicate.xml"))
+    assert response.success is False
+    assert response.error_code == "E00012"
+    assert response.error_text.startswith("You have submitted a duplicate of Subscription 8926781")
+
+
+def test_fields_are_plain_strings():
+    response = read_transaction_response(_fixture("purchase_approved.xml"))
+    assert type(response.transaction_id) is str
+    assert type(response.message_description) is str
+
+
+def test_ok_without_transaction_message_is_not_success():
+    body = _fixture("void_approved.xml").replace(
+        b"<messages><message><code>1</code>"
+        b"<description>This transaction has been approved.</description></message></messages>",
+        b"",
+    )
+    response = read_transaction_response(body)
+    assert response.success is False
+    assert response.error_code == "I00001"
+    assert response.result_code == "Ok"
+
+
+def test_read_settled_batch_list():
+    response = read_settled_batch_list_response(_fixture("settled_batch_list.xml"))
+    assert response.success is True
+    assert response.batches == [
+        SettledBatch(
+            batch_id="9876543",
+            settlement_time_utc="2024-05-02T08:00:00Z",
+            settlement_state="settledSuccessfully",
+        )
+    ]
+
+
+def test_read_settled_batch_list_without_records_is_empty_success():
+    response = read_settled_batch_list_response(_fixture("settled_batch_list_empty.xml"))
+    assert response.success is True
+    assert response.batches == []
+
+
+def test_read_transaction_list():
+    response = read_transaction_list_response(_fixture("transaction_list.xml"))
+    assert response.success is True
+    assert response.total_num_in_result_set == 2
+    assert response.transactions == [
+        TransactionSummary(
+            transaction_id="60000000101",
+            status="settledSuccessfully",
+            settle_amount=Decimal("10.00"),
+            submit_time_utc="2024-05-01T12:00:00Z",
+            invoice_number=None,
+        ),
+        TransactionSummary(
+            transaction_id="60000000102",
+            status="refundSettledSuccessfully",
+            settle_amount=Decimal("4.50"),
+            submit_time_utc="2024-05-01T12:00:00Z",
+            invoice_number=None,
+        ),
+    ]
+
+
+def test_read_transaction_details():
+    response = read_transaction_details_response(_fixture("transaction_details.xml"))
+    assert response.success is True
+    assert response.transaction == TransactionDetails(
+        transaction_id="60000000102",
+        status="refundSettledSuccessfully",
+        transaction_type="refundTransaction",
+        ref_transaction_id="60000000090",
+        batch_id="9876543",
+        auth_amount=Decimal("4.50"),
+        settle_amount=Decimal("4.50"),
+        submit_time_utc="2024-05-01T12:00:00Z",
+    )
+
+
+def test_read_transaction_details_not_found():
+    response = read_transaction_details_response(_fixture("transaction_details_not_found.xml"))
+    assert response.success is False
+    assert response.error_code == "E00040"
+    assert response.transaction is None
+
+
+def test_reporting_authentication_failure():
+    response = read_transaction_list_response(_fixture("authentication_failed.xml"))
+    assert response.success is False
+    assert response.error_code == "E00007"
+
+
+@pytest.mark.parametrize(
+    "reader",
+    [
+        read_transaction_response,
+        read_subscription_response,
+        read_settled_batch_list_response,
+        read_transaction_list_response,
+        read_transaction_details_response,
+    ],
+)
+@pytest.mark.parametrize("content", [None, b""])
+def test_null_response(reader, content):
+    assert reader(content).error_text == "Null response from Authorize.Net"
+
+
+def test_malformed_response_raises():
+    with pytest.raises(etree.XMLSyntaxError):
+        read_transaction_response(b"<createTransactionResponse><messages>")
@@ -2,7 +2,15 @@
 import hmac
 import hashlib
 
-from app.utils.authorize_net_webhook import verify_signature
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.utils.authorize_net_webhook import (
+    WebhookSignatureVerifier,
+    compute_signature,
+    verify_signature,
+)
 
 
 def test_verify_signature_success():
@@ -31,3 +39,56 @@ def test_verify_signature_failure_on_wrong_key():
     header = f"SHA512={signature}"
 
     assert verify_signature(header, payload, key.hex()) is False
+
+
+def test_compute_signature_round_trips():
+    payload = b'{"hello":"world"}'
+    key_hex = b"1234567890abcdef".hex()
+
+    header = compute_signature(payload, key_hex)
+
+    assert header.startswith("SHA512=")
+    assert verify_signature(header, payload, key_hex) is True
+    assert verify_signature(header, payload + b" ", key_hex) is False
+
+
+def test_verifier_accepts_current_and_previous_keys():
+    payload = b'{"hello":"world"}'
+    current, previous = b"new-signature-key".hex(), b"old-signature-key".hex()
+    verifier = WebhookSignatureVerifier([current, "", previous])
+
+    assert verifier.match(compute_signature(payload, current), payload) == 0
+    assert verifier.match(compute_signature(payload, previous), payload) == 1
+    # Templates are copied, not consumed: verifying again gives the same result
+    assert verifier.verify(compute_signature(payload, previous), payload) is True
+    assert verifier.verify(compute_signature(payload, b"other".hex()), payload) is False
+    assert verifier.verify(compute_signature(payload, current), payload + b" ") is False
+
+
+def test_verifier_rejects_malformed_headers():
+    payload = b'{"hello":"world"}'
+    key_hex = b"1234567890abcdef".hex()
+    verifier = WebhookSignatureVerifier([key_hex])
+    digest = compute_signature(payload, key_hex).split("=", 1)[1]
+
+    assert verifier.verify(f"sha512={digest.lower()}", payload) is True
+    for header in [None, "", digest, f"SHA512={digest[:-2]}", f"SHA512={digest[:-1]}Z"]:
+        assert verifier.verify(header, payload) is False
+
+
+def test_verifier_rejects_invalid_keys_up_front():
+    with pytest.raises(ValueError, match="key #2 is not hex"):
+        WebhookSignatureVerifier(["00", "not-hex"])
+    assert WebhookSignatureVerifier([]).verify("SHA512=00", b"") is False
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("AUTHORIZE_NET_WEBHOOK_SECRET", "your-webhook-secret"),
+        ("AUTHORIZE_NET_WEBHOOK_PREVIOUS_SECRETS", "00ff, not-hex"),
+    ],
+)
+def test_settings_reject_signature_keys_that_are_not_hex(field, value):
+    with pytest.raises(ValidationError, match=field):
+        Settings(_env_file=None, **{field: value})